@@ -0,0 +1,133 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+"""
+This module allows the user to write spans and logs as columnar batches,
+for analytics pipelines that load telemetry into columnar stores, with the
+SpanWriter and LogWriter you provide. The only classes and functions that
+should be accessed outside of this module are:
+
+- SpanColumns
+- LogColumns
+- ColumnarSpanExporter
+- ColumnarLogExporter
+- iter_columnar
+- decode_columnar
+
+Please see the class documentation for those classes to learn more.
+"""
+
+import time
+import typing
+
+from opentelemetry.sdk._logs import LogData
+from opentelemetry.sdk._logs.export import LogExportResult, LogExporter
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExportResult, SpanExporter
+from snowflake.telemetry._internal.exporter.columnar._columns import (
+    LogColumns,
+    SpanColumns,
+    decode_columnar,
+    iter_columnar,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto._stats import ExporterStats
+from snowflake.telemetry._internal.exporter.otlp.proto.logs import LogWriter
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import SpanWriter
+
+
+def _encode(
+    columns: typing.Callable[[typing.Sequence], typing.Union[SpanColumns, LogColumns]],
+    batch: typing.Sequence,
+    stats: typing.Optional[ExporterStats],
+) -> bytes:
+    if stats is None:
+        return columns(batch).to_bytes()
+    start = time.perf_counter()
+    encoded = columns(batch)
+    converted = time.perf_counter()
+    payload = encoded.to_bytes()
+    stats.record_encode(converted - start)
+    stats.record_serialize(time.perf_counter() - converted)
+    return payload
+
+
+class ColumnarSpanExporter(SpanExporter):
+    """
+    Implementation of the SpanExporter interface that writes every batch of
+    spans as a columnar payload, see SpanColumns, with the SpanWriter you
+    provide. Read the payloads back with iter_columnar() or
+    decode_columnar().
+
+    Wrap the writer in writers that treat the payloads as TracesData
+    messages, like the CoalescingWriter, at your own risk: they do not know
+    this format.
+
+    If stats are given, the exporter records its latencies, payload sizes
+    and failures in them, see ExporterStats.
+    """
+    def __init__(self, span_writer: SpanWriter, stats: typing.Optional[ExporterStats] = None):
+        self.span_writer = span_writer
+        self.stats = stats
+
+    def export(self, spans: typing.Sequence[ReadableSpan]) -> "SpanExportResult":
+        try:
+            payload = _encode(SpanColumns.from_spans, spans, self.stats)
+            start = time.perf_counter()
+            self.span_writer.write_span(payload)
+            if self.stats is not None:
+                self.stats.record_write(time.perf_counter() - start, len(payload), len(spans))
+            return SpanExportResult.SUCCESS
+        except Exception as exception:  # pylint: disable=broad-exception-caught
+            if self.stats is not None:
+                self.stats.record_failure(exception)
+            return SpanExportResult.FAILURE
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.span_writer.force_flush(timeout_millis)
+
+    def shutdown(self, timeout_millis: float = 30_000) -> None:
+        self.span_writer.shutdown(timeout_millis)
+
+
+class ColumnarLogExporter(LogExporter):
+    """
+    Implementation of the LogExporter interface that writes every batch of
+    log records as a columnar payload, see LogColumns, with the LogWriter
+    you provide.
+
+    If stats are given, the exporter records its latencies, payload sizes
+    and failures in them, see ExporterStats.
+    """
+    def __init__(self, log_writer: LogWriter, stats: typing.Optional[ExporterStats] = None):
+        self.log_writer = log_writer
+        self.stats = stats
+
+    def export(self, batch: typing.Sequence[LogData]) -> "LogExportResult":
+        try:
+            payload = _encode(LogColumns.from_logs, batch, self.stats)
+            start = time.perf_counter()
+            self.log_writer.write_logs(payload)
+            if self.stats is not None:
+                self.stats.record_write(time.perf_counter() - start, len(payload), len(batch))
+            return LogExportResult.SUCCESS
+        except Exception as exception:  # pylint: disable=broad-exception-caught
+            if self.stats is not None:
+                self.stats.record_failure(exception)
+            return LogExportResult.FAILURE
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.log_writer.force_flush(timeout_millis)
+
+    def shutdown(self, timeout_millis: float = 30_000) -> None:
+        self.log_writer.shutdown(timeout_millis)
+
+
+__all__ = [
+    "SpanColumns",
+    "LogColumns",
+    "ColumnarSpanExporter",
+    "ColumnarLogExporter",
+    "iter_columnar",
+    "decode_columnar",
+]
@@ -0,0 +1,411 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+"""
+Struct-of-arrays batches of spans and log records and their binary format.
+
+A batch stores every field in an array.array column with one entry per span
+or log record. Names, attribute keys, string values, resources and scopes
+are interned into tables and referred to by their index. Attributes are
+flattened into key, type and value columns, sliced per row by
+attribute_offsets. Sequences of strings, booleans, integers and floats, the
+array attribute values of OpenTelemetry, are flattened the same way into
+element type and value columns, sliced per sequence by array_offsets.
+
+The binary format is the header
+
+    magic "SFC1", kind (u8, 1 = spans, 2 = logs), length (u32), rows (u32)
+
+where length is the size of the whole payload, followed by the tables, each
+a u32 count, a u32 byte length per entry and the UTF-8 encoded entries, and
+the columns in their declared order, each a u32 byte length and the
+little-endian items. Payloads can be concatenated, see iter_columnar().
+"""
+
+import array
+import base64
+import json
+import struct
+import sys
+import typing
+
+from opentelemetry.sdk._logs import LogData
+from opentelemetry.sdk.trace import ReadableSpan
+from snowflake.telemetry._internal.serialize.wire import Buffer
+
+_MAGIC = b"SFC1"
+_HEADER = struct.Struct("<4sBII")
+_U32 = struct.Struct("<I")
+_SPANS = 1
+_LOGS = 2
+
+# The types of the attribute values and log bodies. Values of other types,
+# e.g. mappings and nested sequences, are stored as JSON.
+TYPE_NONE = 0
+TYPE_STR = 1
+TYPE_BOOL = 2
+TYPE_INT = 3
+TYPE_FLOAT = 4
+TYPE_BYTES = 5
+TYPE_JSON = 6
+TYPE_ARRAY = 7
+
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+
+_TABLES = ("names", "keys", "strings", "resources", "scopes")
+_ATTRIBUTE_COLUMNS = (
+    ("attribute_offsets", "I"),
+    ("attribute_keys", "I"),
+    ("attribute_types", "B"),
+    ("attribute_values", "q"),
+    ("floats", "d"),
+    ("array_offsets", "I"),
+    ("array_types", "B"),
+    ("array_values", "q"),
+)
+
+
+class _Tables:
+    """The interning tables of a batch that is being built."""
+
+    def __init__(self):
+        self.names: typing.Dict[str, int] = {}
+        self.keys: typing.Dict[str, int] = {}
+        self.strings: typing.Dict[str, int] = {}
+        self.resources: typing.Dict[str, int] = {}
+        self.scopes: typing.Dict[str, int] = {}
+        # Resources and scopes are shared by the rows of a tracer or
+        # logger, their JSON is computed once per object.
+        self._resource_indexes: typing.Dict[int, typing.Tuple[typing.Any, int]] = {}
+        self._scope_indexes: typing.Dict[int, typing.Tuple[typing.Any, int]] = {}
+
+    def resource(self, resource) -> int:
+        cached = self._resource_indexes.get(id(resource))
+        if cached is not None and cached[0] is resource:
+            return cached[1]
+        attributes = dict(resource.attributes) if resource is not None else {}
+        encoded = json.dumps(attributes, sort_keys=True, default=str)
+        index = self.resources.setdefault(encoded, len(self.resources))
+        self._resource_indexes[id(resource)] = (resource, index)
+        return index
+
+    def scope(self, scope) -> int:
+        cached = self._scope_indexes.get(id(scope))
+        if cached is not None and cached[0] is scope:
+            return cached[1]
+        encoded = json.dumps({"name": scope.name, "version": scope.version} if scope is not None else {})
+        index = self.scopes.setdefault(encoded, len(self.scopes))
+        self._scope_indexes[id(scope)] = (scope, index)
+        return index
+
+
+class _Columns:
+    _KIND = 0
+    _COLUMNS: typing.Tuple[typing.Tuple[str, str], ...] = ()
+
+    def __init__(self):
+        for column, typecode in self._COLUMNS:
+            setattr(self, column, array.array(typecode))
+        self.array_offsets.append(0)  # pylint: disable=no-member
+        self.names: typing.List[str] = []
+        self.keys: typing.List[str] = []
+        self.strings: typing.List[str] = []
+        self.resources: typing.List[str] = []
+        self.scopes: typing.List[str] = []
+
+    def __len__(self) -> int:
+        return max(len(self.attribute_offsets) - 1, 0)  # pylint: disable=no-member
+
+    def _finish(self, tables: _Tables) -> None:
+        for table in _TABLES:
+            setattr(self, table, list(getattr(tables, table)))
+
+    def _append_value(self, tables: _Tables, value: typing.Any, types: array.array, values: array.array) -> None:
+        cls = type(value)
+        if cls is str:
+            types.append(TYPE_STR)
+            values.append(tables.strings.setdefault(value, len(tables.strings)))
+        elif cls is bool:
+            types.append(TYPE_BOOL)
+            values.append(value)
+        elif cls is int and _INT64_MIN <= value <= _INT64_MAX:
+            types.append(TYPE_INT)
+            values.append(value)
+        elif cls is float:
+            types.append(TYPE_FLOAT)
+            values.append(len(self.floats))  # pylint: disable=no-member
+            self.floats.append(value)  # pylint: disable=no-member
+        elif value is None:
+            types.append(TYPE_NONE)
+            values.append(0)
+        elif isinstance(value, (bytes, bytearray)):
+            encoded = base64.b64encode(value).decode("ascii")
+            types.append(TYPE_BYTES)
+            values.append(tables.strings.setdefault(encoded, len(tables.strings)))
+        elif cls in (tuple, list) and all(_is_scalar(item) for item in value):
+            # pylint: disable=no-member
+            array_types, array_values = self.array_types, self.array_values
+            for item in value:
+                self._append_value(tables, item, array_types, array_values)
+            types.append(TYPE_ARRAY)
+            values.append(len(self.array_offsets) - 1)
+            self.array_offsets.append(len(array_types))
+        else:
+            encoded = json.dumps(value, default=str)
+            types.append(TYPE_JSON)
+            values.append(tables.strings.setdefault(encoded, len(tables.strings)))
+
+    def _append_attributes(self, tables: _Tables, attributes: typing.Optional[typing.Mapping[str, typing.Any]]) -> None:
+        # pylint: disable=no-member
+        if attributes:
+            keys = tables.keys
+            attribute_keys = self.attribute_keys
+            types, values = self.attribute_types, self.attribute_values
+            for key, value in attributes.items():
+                attribute_keys.append(keys.setdefault(key, len(keys)))
+                self._append_value(tables, value, types, values)
+        self.attribute_offsets.append(len(self.attribute_keys))
+
+    def _value(self, value_type: int, value: int) -> typing.Any:
+        if value_type == TYPE_STR:
+            return self.strings[value]
+        if value_type == TYPE_INT:
+            return value
+        if value_type == TYPE_FLOAT:
+            return self.floats[value]  # pylint: disable=no-member
+        if value_type == TYPE_BOOL:
+            return bool(value)
+        if value_type == TYPE_NONE:
+            return None
+        if value_type == TYPE_BYTES:
+            return base64.b64decode(self.strings[value])
+        if value_type == TYPE_ARRAY:
+            # pylint: disable=no-member
+            array_types, array_values = self.array_types, self.array_values
+            return tuple(
+                self._value(array_types[i], array_values[i])
+                for i in range(self.array_offsets[value], self.array_offsets[value + 1])
+            )
+        return json.loads(self.strings[value])
+
+    def attributes(self, row: int) -> typing.Dict[str, typing.Any]:
+        # pylint: disable=no-member
+        keys, types, values = self.attribute_keys, self.attribute_types, self.attribute_values
+        return {
+            self.keys[keys[i]]: self._value(types[i], values[i])
+            for i in range(self.attribute_offsets[row], self.attribute_offsets[row + 1])
+        }
+
+    def resource(self, row: int) -> typing.Dict[str, typing.Any]:
+        return json.loads(self.resources[self.resource_index[row]])  # pylint: disable=no-member
+
+    def scope(self, row: int) -> typing.Dict[str, typing.Any]:
+        return json.loads(self.scopes[self.scope_index[row]])  # pylint: disable=no-member
+
+    def to_bytes(self) -> bytes:
+        parts = [b""]
+        for table in _TABLES:
+            encoded = [entry.encode("utf-8") for entry in getattr(self, table)]
+            lengths = array.array("I", map(len, encoded))
+            parts.append(_U32.pack(len(encoded)))
+            parts.append(_little_endian(lengths))
+            parts.extend(encoded)
+        for column, _ in self._COLUMNS:
+            data = _little_endian(getattr(self, column))
+            parts.append(_U32.pack(len(data)))
+            parts.append(data)
+        length = _HEADER.size + sum(map(len, parts))
+        parts[0] = _HEADER.pack(_MAGIC, self._KIND, length, len(self))
+        return b"".join(parts)
+
+    @classmethod
+    def _from_bytes(cls, data: memoryview, pos: int, end: int) -> "_Columns":
+        columns = cls()
+        for table in _TABLES:
+            (count,), pos = _U32.unpack_from(data, pos), pos + 4
+            lengths, pos = _read_array("I", data, pos, count * 4)
+            entries = []
+            for length in lengths:
+                entries.append(str(data[pos:pos + length], "utf-8"))
+                pos += length
+            setattr(columns, table, entries)
+        for column, typecode in cls._COLUMNS:
+            (size,), pos = _U32.unpack_from(data, pos), pos + 4
+            values, pos = _read_array(typecode, data, pos, size)
+            setattr(columns, column, values)
+        if pos != end:
+            raise ValueError("corrupt columnar payload")
+        return columns
+
+
+def _is_scalar(value: typing.Any) -> bool:
+    cls = type(value)
+    return cls in (str, bool, float) or (cls is int and _INT64_MIN <= value <= _INT64_MAX)
+
+
+def _little_endian(values: array.array) -> bytes:
+    if sys.byteorder == "little":
+        return values.tobytes()
+    swapped = array.array(values.typecode, values)
+    swapped.byteswap()
+    return swapped.tobytes()
+
+
+def _read_array(typecode: str, data: memoryview, pos: int, size: int) -> typing.Tuple[array.array, int]:
+    if pos + size > len(data):
+        raise ValueError("truncated columnar payload")
+    values = array.array(typecode)
+    values.frombytes(data[pos:pos + size])
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values, pos + size
+
+
+class SpanColumns(_Columns):
+    """
+    A batch of spans as columns. trace_id_high and trace_id_low hold the
+    upper and lower 64 bits of the trace ids, parent_span_id is 0 for root
+    spans and status_message -1 for statuses without a description. name,
+    resource_index and scope_index refer to the names, resources and scopes
+    tables, which hold the resource attributes and scopes as JSON.
+
+    Sequence attribute values are read back as tuples, like the
+    attributes of a span hold them. Events and links are not part of the
+    columns.
+    """
+    _KIND = _SPANS
+    _COLUMNS = (
+        ("trace_id_high", "Q"),
+        ("trace_id_low", "Q"),
+        ("span_id", "Q"),
+        ("parent_span_id", "Q"),
+        ("start_time", "Q"),
+        ("end_time", "Q"),
+        ("kind", "B"),
+        ("status_code", "B"),
+        ("status_message", "i"),
+        ("name", "I"),
+        ("resource_index", "I"),
+        ("scope_index", "I"),
+    ) + _ATTRIBUTE_COLUMNS
+
+    @classmethod
+    def from_spans(cls, spans: typing.Sequence[ReadableSpan]) -> "SpanColumns":
+        # pylint: disable=no-member
+        columns = cls()
+        tables = _Tables()
+        names, strings = tables.names, tables.strings
+        columns.attribute_offsets.append(0)
+        for span in spans:
+            context = span.context
+            columns.trace_id_high.append(context.trace_id >> 64)
+            columns.trace_id_low.append(context.trace_id & 0xFFFFFFFFFFFFFFFF)
+            columns.span_id.append(context.span_id)
+            columns.parent_span_id.append(span.parent.span_id if span.parent is not None else 0)
+            columns.start_time.append(span.start_time or 0)
+            columns.end_time.append(span.end_time or 0)
+            columns.kind.append(span.kind.value)
+            columns.status_code.append(span.status.status_code.value)
+            description = span.status.description
+            columns.status_message.append(
+                strings.setdefault(description, len(strings)) if description else -1
+            )
+            columns.name.append(names.setdefault(span.name, len(names)))
+            columns.resource_index.append(tables.resource(span.resource))
+            columns.scope_index.append(tables.scope(span.instrumentation_scope))
+            columns._append_attributes(tables, span.attributes)
+        columns._finish(tables)
+        return columns
+
+    def trace_id(self, row: int) -> int:
+        return (self.trace_id_high[row] << 64) | self.trace_id_low[row]  # pylint: disable=no-member
+
+    def span_name(self, row: int) -> str:
+        return self.names[self.name[row]]  # pylint: disable=no-member
+
+
+class LogColumns(_Columns):
+    """
+    A batch of log records as columns. Records without a trace have 0 trace
+    and span ids, severity_text is -1 for records without one. The body of
+    a record is stored like an attribute value, in body_type and body_value.
+    """
+    _KIND = _LOGS
+    _COLUMNS = (
+        ("timestamp", "Q"),
+        ("observed_timestamp", "Q"),
+        ("trace_id_high", "Q"),
+        ("trace_id_low", "Q"),
+        ("span_id", "Q"),
+        ("severity_number", "B"),
+        ("severity_text", "i"),
+        ("body_type", "B"),
+        ("body_value", "q"),
+        ("resource_index", "I"),
+        ("scope_index", "I"),
+    ) + _ATTRIBUTE_COLUMNS
+
+    @classmethod
+    def from_logs(cls, batch: typing.Sequence[LogData]) -> "LogColumns":
+        # pylint: disable=no-member
+        columns = cls()
+        tables = _Tables()
+        strings = tables.strings
+        columns.attribute_offsets.append(0)
+        for log_data in batch:
+            log_record = log_data.log_record
+            trace_id = log_record.trace_id or 0
+            columns.timestamp.append(log_record.timestamp or 0)
+            columns.observed_timestamp.append(log_record.observed_timestamp or 0)
+            columns.trace_id_high.append(trace_id >> 64)
+            columns.trace_id_low.append(trace_id & 0xFFFFFFFFFFFFFFFF)
+            columns.span_id.append(log_record.span_id or 0)
+            columns.severity_number.append(
+                log_record.severity_number.value if log_record.severity_number is not None else 0
+            )
+            severity_text = log_record.severity_text
+            columns.severity_text.append(
+                strings.setdefault(severity_text, len(strings)) if severity_text is not None else -1
+            )
+            columns._append_value(tables, log_record.body, columns.body_type, columns.body_value)
+            columns.resource_index.append(tables.resource(log_record.resource))
+            columns.scope_index.append(tables.scope(log_data.instrumentation_scope))
+            columns._append_attributes(tables, log_record.attributes)
+        columns._finish(tables)
+        return columns
+
+    def body(self, row: int) -> typing.Any:
+        return self._value(self.body_type[row], self.body_value[row])  # pylint: disable=no-member
+
+
+def iter_columnar(data: Buffer) -> typing.Iterator[typing.Union[SpanColumns, LogColumns]]:
+    """Iterates over the batches of concatenated columnar payloads."""
+    data = memoryview(data)
+    pos = 0
+    while pos < len(data):
+        if pos + _HEADER.size > len(data):
+            raise ValueError("truncated columnar payload")
+        magic, kind, length, _ = _HEADER.unpack_from(data, pos)
+        if magic != _MAGIC:
+            raise ValueError("not a columnar payload")
+        if kind == _SPANS:
+            cls = SpanColumns
+        elif kind == _LOGS:
+            cls = LogColumns
+        else:
+            raise ValueError(f"unknown columnar payload kind {kind}")
+        if pos + length > len(data):
+            raise ValueError("truncated columnar payload")
+        try:
+            yield cls._from_bytes(data, pos + _HEADER.size, pos + length)
+        except struct.error:
+            raise ValueError("truncated columnar payload") from None
+        pos += length
+
+
+def decode_columnar(data: Buffer) -> typing.Union[SpanColumns, LogColumns]:
+    """Decodes a single columnar payload."""
+    (columns,) = iter_columnar(data)
+    return columns
@@ -0,0 +1,178 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+"""
+This module allows the user to write spans and logs as newline-delimited
+JSON rows shaped like the rows of a Snowflake event table, e.g. to stage
+them for a bulk load or to inspect them in tests, by implementing the
+write_rows() abstract method. The only classes that should be accessed
+outside of this module are:
+
+- EventTableWriter
+- EventTableEncoder
+- EventTableSpanExporter
+- EventTableLogExporter
+- NDJSONFileWriter
+- SQLiteEventTableWriter
+
+Please see the class documentation for those classes to learn more.
+"""
+
+import abc
+import os
+import threading
+import time
+import typing
+
+from opentelemetry.sdk._logs import LogData
+from opentelemetry.sdk._logs.export import LogExportResult, LogExporter
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExportResult, SpanExporter
+from snowflake.telemetry._internal import fork
+from snowflake.telemetry._internal.exporter.event_table._encoder import EventTableEncoder
+from snowflake.telemetry._internal.exporter.otlp.proto._stats import ExporterStats
+
+
+class EventTableWriter(abc.ABC):
+    """
+    EventTableWriter abstract base class with one abstract method that must
+    be implemented by the user.
+    """
+    @abc.abstractmethod
+    def write_rows(self, rows: bytes) -> None:
+        """
+        Implement this method to write the rows to your preferred location.
+        rows holds one or more UTF-8 encoded JSON objects, each terminated
+        by a newline.
+        """
+
+    def force_flush(self, timeout_millis: float = 30_000) -> bool:
+        """
+        Override this method if your writer buffers data, to write everything
+        that is buffered within the given timeout. Returns False if the
+        timeout expired.
+        """
+        return True
+
+    def shutdown(self, timeout_millis: float = 30_000) -> None:
+        """
+        Override this method to release the resources held by your writer.
+        """
+
+
+class NDJSONFileWriter(EventTableWriter):
+    """
+    Appends the rows to a file, which can be loaded into an event table
+    shaped table with COPY INTO and FILE_FORMAT = (TYPE = JSON) after
+    staging it with PUT.
+
+    The file is not buffered, every batch of rows is written with one
+    write, so a forked child never writes rows of its parent.
+    """
+    def __init__(self, path: typing.Union[str, "os.PathLike[str]"]):
+        self._path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "ab", buffering=0)  # pylint: disable=consider-using-with
+        fork.register(self)
+
+    def _at_fork_reinit(self) -> None:
+        self._lock = threading.Lock()
+
+    def write_rows(self, rows: bytes) -> None:
+        view = memoryview(rows)
+        with self._lock:
+            while view:
+                view = view[self._file.write(view):]
+
+    def shutdown(self, timeout_millis: float = 30_000) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class _EventTableExporter:
+    def __init__(self, writer: EventTableWriter, stats: typing.Optional[ExporterStats]):
+        self.writer = writer
+        self.stats = stats
+        self._encoder = EventTableEncoder()
+
+    def _export(self, encode: typing.Callable[[typing.Sequence], bytes], batch: typing.Sequence) -> bool:
+        try:
+            if self.stats is None:
+                self.writer.write_rows(encode(batch))
+                return True
+            start = time.perf_counter()
+            rows = encode(batch)
+            encoded = time.perf_counter()
+            self.stats.record_encode(encoded - start)
+            self.writer.write_rows(rows)
+            self.stats.record_write(time.perf_counter() - encoded, len(rows), len(batch))
+            return True
+        except Exception as exception:  # pylint: disable=broad-exception-caught
+            if self.stats is not None:
+                self.stats.record_failure(exception)
+            return False
+
+
+class EventTableSpanExporter(_EventTableExporter, SpanExporter):
+    """
+    Implementation of the SpanExporter interface that writes spans as event
+    table rows with the EventTableWriter you provide: a SPAN row per span and
+    a SPAN_EVENT row per span event, see EventTableEncoder.
+
+    If stats are given, the exporter records its latencies, payload sizes
+    and failures in them, see ExporterStats.
+    """
+    def __init__(self, writer: EventTableWriter, stats: typing.Optional[ExporterStats] = None):
+        super().__init__(writer, stats)
+
+    def export(self, spans: typing.Sequence[ReadableSpan]) -> "SpanExportResult":
+        if self._export(self._encoder.encode_spans, spans):
+            return SpanExportResult.SUCCESS
+        return SpanExportResult.FAILURE
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.writer.force_flush(timeout_millis)
+
+    def shutdown(self, timeout_millis: float = 30_000) -> None:
+        self.writer.shutdown(timeout_millis)
+
+
+class EventTableLogExporter(_EventTableExporter, LogExporter):
+    """
+    Implementation of the LogExporter interface that writes log records as
+    LOG event table rows with the EventTableWriter you provide, see
+    EventTableEncoder.
+
+    If stats are given, the exporter records its latencies, payload sizes
+    and failures in them, see ExporterStats.
+    """
+    def __init__(self, writer: EventTableWriter, stats: typing.Optional[ExporterStats] = None):
+        super().__init__(writer, stats)
+
+    def export(self, batch: typing.Sequence[LogData]) -> "LogExportResult":
+        if self._export(self._encoder.encode_logs, batch):
+            return LogExportResult.SUCCESS
+        return LogExportResult.FAILURE
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.writer.force_flush(timeout_millis)
+
+    def shutdown(self, timeout_millis: float = 30_000) -> None:
+        self.writer.shutdown(timeout_millis)
+
+
+# Imported last, the writer module refers to EventTableWriter.
+from snowflake.telemetry._internal.exporter.event_table._sqlite import (  # noqa: E402
+    SQLiteEventTableWriter,
+)
+
+
+__all__ = [
+    "EventTableWriter",
+    "EventTableEncoder",
+    "EventTableSpanExporter",
+    "EventTableLogExporter",
+    "NDJSONFileWriter",
+    "SQLiteEventTableWriter",
+]
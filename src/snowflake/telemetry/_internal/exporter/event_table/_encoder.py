@@ -0,0 +1,262 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+"""
+Encodes spans and log records as newline-delimited JSON rows shaped like the
+rows of a Snowflake event table.
+
+The rows are assembled from string fragments rather than through json.dumps:
+strings are escaped with the C encoder of the json module, the fixed parts
+of a row are constants, and the RESOURCE_ATTRIBUTES, SCOPE and
+SCOPE_ATTRIBUTES columns, which are the same for every row of a resource and
+scope, are encoded once and cached.
+"""
+
+import base64
+import json.encoder
+import math
+import threading
+import time
+import typing
+
+from opentelemetry.sdk._logs import LogData
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.util.instrumentation import InstrumentationScope
+from opentelemetry.trace import SpanKind, StatusCode
+from snowflake.telemetry._internal import fork
+
+_encode_string = json.encoder.encode_basestring
+
+# The cached fragments are dropped when there are more than this many, to
+# bound the memory of processes with many distinct resources or keys.
+_MAX_CACHED_FRAGMENTS = 4096
+
+_KINDS = {
+    SpanKind.INTERNAL: '"kind":"SPAN_KIND_INTERNAL"',
+    SpanKind.SERVER: '"kind":"SPAN_KIND_SERVER"',
+    SpanKind.CLIENT: '"kind":"SPAN_KIND_CLIENT"',
+    SpanKind.PRODUCER: '"kind":"SPAN_KIND_PRODUCER"',
+    SpanKind.CONSUMER: '"kind":"SPAN_KIND_CONSUMER"',
+}
+_STATUS_CODES = {
+    StatusCode.UNSET: '"status":{"code":"STATUS_CODE_UNSET"',
+    StatusCode.OK: '"status":{"code":"STATUS_CODE_OK"',
+    StatusCode.ERROR: '"status":{"code":"STATUS_CODE_ERROR"',
+}
+_NON_FINITE = {math.inf: '"Infinity"', -math.inf: '"-Infinity"'}
+
+
+def _encode_float(value: float) -> str:
+    if math.isfinite(value):
+        return float.__repr__(value)
+    # JSON has no literals for these, Snowflake parses the strings as floats.
+    return _NON_FINITE.get(value, '"NaN"')
+
+
+def _encode_value(value: typing.Any) -> str:
+    cls = type(value)
+    if cls is str:
+        return _encode_string(value)
+    if cls is bool:
+        return "true" if value else "false"
+    if cls is int:
+        return int.__repr__(value)
+    if cls is float:
+        return _encode_float(value)
+    if value is None:
+        return "null"
+    if isinstance(value, (bytes, bytearray)):
+        return '"' + base64.b64encode(value).decode("ascii") + '"'
+    if isinstance(value, typing.Mapping):
+        return "{" + ",".join(
+            _encode_string(str(key)) + ":" + _encode_value(item) for key, item in value.items()
+        ) + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join(map(_encode_value, value)) + "]"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return int.__repr__(value)
+    if isinstance(value, float):
+        return _encode_float(value)
+    return _encode_string(str(value))
+
+
+class EventTableEncoder:
+    """
+    Encodes spans and log records as UTF-8, newline-delimited JSON objects
+    with the columns of a Snowflake event table: TIMESTAMP,
+    START_TIMESTAMP, OBSERVED_TIMESTAMP, TRACE, RESOURCE_ATTRIBUTES, SCOPE,
+    SCOPE_ATTRIBUTES, RECORD_TYPE, RECORD, RECORD_ATTRIBUTES and VALUE.
+    Columns without a value are left out.
+
+    A span is written as a SPAN row followed by a SPAN_EVENT row per event,
+    a log record as a LOG row with its body in VALUE. Timestamps are UTC
+    with nanoseconds, e.g. "2024-05-01 12:00:00.000000001".
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._headers: typing.Dict[
+            typing.Tuple[int, int],
+            typing.Tuple[Resource, InstrumentationScope, str],
+        ] = {}
+        self._keys: typing.Dict[str, str] = {}
+        # The second and its formatted prefix of the last timestamp, most
+        # timestamps of a batch fall into the same second.
+        self._second: typing.Tuple[int, str] = (-1, "")
+        fork.register(self)
+
+    def _at_fork_reinit(self) -> None:
+        self._lock = threading.Lock()
+
+    def encode_spans(self, spans: typing.Sequence[ReadableSpan]) -> bytes:
+        rows: typing.List[str] = []
+        for span in spans:
+            self._encode_span(span, rows)
+        return "".join(rows).encode("utf-8")
+
+    def encode_logs(self, batch: typing.Sequence[LogData]) -> bytes:
+        rows: typing.List[str] = []
+        for log_data in batch:
+            self._encode_log(log_data, rows)
+        return "".join(rows).encode("utf-8")
+
+    def _encode_span(self, span: ReadableSpan, rows: typing.List[str]) -> None:
+        context = span.context
+        trace = (
+            f',"TRACE":{{"trace_id":"{context.trace_id:032x}",'
+            f'"span_id":"{context.span_id:016x}"}}'
+        )
+        header = self._header(span.resource, span.instrumentation_scope)
+        record = [_encode_string(span.name), _KINDS[span.kind]]
+        if span.parent is not None:
+            record.append(f'"parent_span_id":"{span.parent.span_id:016x}"')
+        status = _STATUS_CODES[span.status.status_code]
+        if span.status.description:
+            status += ',"message":' + _encode_string(span.status.description)
+        record.append(status + "}")
+        if span.dropped_attributes:
+            record.append(f'"dropped_attributes_count":{span.dropped_attributes}')
+        if span.dropped_events:
+            record.append(f'"dropped_events_count":{span.dropped_events}')
+        if span.links:
+            record.append('"links":[' + ",".join(
+                f'{{"trace_id":"{link.context.trace_id:032x}",'
+                f'"span_id":"{link.context.span_id:016x}"'
+                + (',"attributes":' + self._attributes(link.attributes) if link.attributes else "")
+                + "}"
+                for link in span.links
+            ) + "]")
+        if span.dropped_links:
+            record.append(f'"dropped_links_count":{span.dropped_links}')
+        row = [
+            '{"TIMESTAMP":', self._timestamp(span.end_time),
+            ',"START_TIMESTAMP":', self._timestamp(span.start_time),
+            trace, header,
+            ',"RECORD_TYPE":"SPAN","RECORD":{"name":', ",".join(record), "}",
+        ]
+        if span.attributes:
+            row.append(',"RECORD_ATTRIBUTES":')
+            row.append(self._attributes(span.attributes))
+        row.append("}\n")
+        rows.append("".join(row))
+        for event in span.events:
+            row = [
+                '{"TIMESTAMP":', self._timestamp(event.timestamp),
+                trace, header,
+                ',"RECORD_TYPE":"SPAN_EVENT","RECORD":{"name":', _encode_string(event.name), "}",
+            ]
+            if event.attributes:
+                row.append(',"RECORD_ATTRIBUTES":')
+                row.append(self._attributes(event.attributes))
+            row.append("}\n")
+            rows.append("".join(row))
+
+    def _encode_log(self, log_data: LogData, rows: typing.List[str]) -> None:
+        log_record = log_data.log_record
+        observed = self._timestamp(log_record.observed_timestamp)
+        row = [
+            '{"TIMESTAMP":',
+            self._timestamp(log_record.timestamp) if log_record.timestamp else observed,
+            ',"OBSERVED_TIMESTAMP":', observed,
+        ]
+        if log_record.trace_id:
+            row.append(f',"TRACE":{{"trace_id":"{log_record.trace_id:032x}"')
+            if log_record.span_id:
+                row.append(f',"span_id":"{log_record.span_id:016x}"')
+            row.append("}")
+        row.append(self._header(log_record.resource, log_data.instrumentation_scope))
+        row.append(',"RECORD_TYPE":"LOG","RECORD":{')
+        record = []
+        if log_record.severity_text is not None:
+            record.append('"severity_text":' + _encode_string(log_record.severity_text))
+        if log_record.severity_number is not None:
+            record.append(f'"severity_number":{log_record.severity_number.value}')
+        if log_record.dropped_attributes:
+            record.append(f'"dropped_attributes_count":{log_record.dropped_attributes}')
+        row.append(",".join(record))
+        row.append("}")
+        if log_record.attributes:
+            row.append(',"RECORD_ATTRIBUTES":')
+            row.append(self._attributes(log_record.attributes))
+        if log_record.body is not None:
+            row.append(',"VALUE":')
+            row.append(_encode_value(log_record.body))
+        row.append("}\n")
+        rows.append("".join(row))
+
+    def _timestamp(self, nanos: int) -> str:
+        seconds, fraction = divmod(nanos, 1_000_000_000)
+        second, prefix = self._second
+        if seconds != second:
+            prefix = time.strftime('"%Y-%m-%d %H:%M:%S.', time.gmtime(seconds))
+            self._second = (seconds, prefix)
+        return f'{prefix}{fraction:09d}"'
+
+    def _attributes(self, attributes: typing.Mapping[str, typing.Any]) -> str:
+        keys = self._keys
+        fragments = []
+        for key, value in attributes.items():
+            fragment = keys.get(key)
+            if fragment is None:
+                fragment = _encode_string(key) + ":"
+                if len(keys) < _MAX_CACHED_FRAGMENTS:
+                    keys[key] = fragment
+            fragments.append(fragment + _encode_value(value))
+        return "{" + ",".join(fragments) + "}"
+
+    def _header(
+        self,
+        resource: typing.Optional[Resource],
+        scope: typing.Optional[InstrumentationScope],
+    ) -> str:
+        # Keyed by identity: the SDK shares one Resource and one scope
+        # between the spans of a tracer, and hashing a Resource means
+        # serializing its attributes. The cached objects are kept alive, so
+        # their ids are not reused.
+        cache_key = (id(resource), id(scope))
+        cached = self._headers.get(cache_key)
+        if cached is not None and cached[0] is resource and cached[1] is scope:
+            return cached[2]
+        header = []
+        if resource is not None and resource.attributes:
+            header.append(',"RESOURCE_ATTRIBUTES":')
+            header.append(self._attributes(resource.attributes))
+        if scope is not None:
+            header.append(',"SCOPE":{"name":')
+            header.append(_encode_string(scope.name))
+            if scope.version:
+                header.append(',"version":')
+                header.append(_encode_string(scope.version))
+            header.append("}")
+            if scope.attributes:
+                header.append(',"SCOPE_ATTRIBUTES":')
+                header.append(self._attributes(scope.attributes))
+        fragment = "".join(header)
+        with self._lock:
+            if len(self._headers) >= _MAX_CACHED_FRAGMENTS:
+                self._headers.clear()
+            self._headers[cache_key] = (resource, scope, fragment)
+        return fragment
@@ -0,0 +1,200 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+import json
+import os
+import sqlite3
+import threading
+import typing
+
+from snowflake.telemetry._internal import fork
+from snowflake.telemetry._internal.exporter.event_table import EventTableWriter
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    timestamp TEXT NOT NULL,
+    start_timestamp TEXT,
+    observed_timestamp TEXT,
+    trace_id TEXT,
+    span_id TEXT,
+    parent_span_id TEXT,
+    record_type TEXT NOT NULL,
+    name TEXT,
+    row TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_trace_id ON events (trace_id);
+CREATE INDEX IF NOT EXISTS events_span_id ON events (span_id);
+CREATE INDEX IF NOT EXISTS events_parent_span_id ON events (parent_span_id);
+CREATE INDEX IF NOT EXISTS events_timestamp ON events (timestamp);
+"""
+
+_INSERT = "INSERT INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+
+_Row = typing.Tuple[
+    str, typing.Optional[str], typing.Optional[str], typing.Optional[str],
+    typing.Optional[str], typing.Optional[str], str, typing.Optional[str], str,
+]
+
+
+def _decode(line: bytes) -> _Row:
+    event = json.loads(line)
+    trace = event.get("TRACE") or {}
+    record = event.get("RECORD") or {}
+    return (
+        event["TIMESTAMP"],
+        event.get("START_TIMESTAMP"),
+        event.get("OBSERVED_TIMESTAMP"),
+        trace.get("trace_id"),
+        trace.get("span_id"),
+        record.get("parent_span_id"),
+        event["RECORD_TYPE"],
+        record.get("name"),
+        line.decode("utf-8"),
+    )
+
+
+class SQLiteEventTableWriter(EventTableWriter):
+    """
+    EventTableWriter that inserts the rows into an events table of a SQLite
+    database, to run event table queries like those of
+    docs/trace-explorer.md locally, e.g. in CI.
+
+    Rows are buffered and inserted with executemany() in one transaction per
+    batch_size rows, or when force_flush() is called. If the transaction
+    fails, e.g. because another connection holds the write lock, the rows
+    stay buffered and are inserted with the next batch. The database uses
+    write-ahead logging, so the queries of other connections do not block
+    the inserts. Besides the whole row as JSON, the events table has the
+    timestamps, the trace, span and parent span ids, the record type and the
+    span or event name in columns of their own, with indexes on the ids and
+    the timestamp; the JSON can be queried with SQLite's json_extract().
+
+    The query helpers flush the buffered rows first and return the rows as
+    dicts decoded from JSON, like json.loads() of the rows of an event table.
+    """
+    def __init__(
+        self,
+        path: typing.Union[str, "os.PathLike[str]"],
+        batch_size: int = 10_000,
+    ):
+        self._path = path
+        self._batch_size = batch_size
+        self._lock = threading.RLock()
+        self._pending: typing.List[_Row] = []
+        self._connection = self._connect()
+        fork.register(self)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self._path, check_same_thread=False, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(_SCHEMA)
+        return connection
+
+    def _at_fork_reinit(self) -> None:
+        # The connection of the parent must not be used in the child, and
+        # the rows buffered in the parent are inserted by the parent.
+        self._lock = threading.RLock()
+        self._pending = []
+        self._connection = self._connect()
+
+    def write_rows(self, rows: bytes) -> None:
+        decoded = [_decode(line) for line in rows.splitlines() if line]
+        with self._lock:
+            self._pending.extend(decoded)
+            if len(self._pending) >= self._batch_size:
+                self._insert_pending()
+
+    def _insert_pending(self) -> None:
+        if not self._pending:
+            return
+        connection = self._connection
+        connection.execute("BEGIN")
+        try:
+            connection.executemany(_INSERT, self._pending)
+            connection.execute("COMMIT")
+        except BaseException:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            raise
+        # Only dropped once they are committed, a failed batch is retried.
+        self._pending = []
+
+    def load_ndjson(self, path: typing.Union[str, "os.PathLike[str]"]) -> None:
+        """Inserts the rows of a file written by an NDJSONFileWriter."""
+        with open(path, "rb") as file:
+            while True:
+                lines = file.readlines(1 << 20)
+                if not lines:
+                    break
+                self.write_rows(b"".join(lines))
+        self.force_flush()
+
+    def force_flush(self, timeout_millis: float = 30_000) -> bool:
+        with self._lock:
+            self._insert_pending()
+        return True
+
+    def shutdown(self, timeout_millis: float = 30_000) -> None:
+        with self._lock:
+            try:
+                self._insert_pending()
+            finally:
+                self._connection.close()
+
+    def query(self, sql: str, parameters: typing.Sequence[typing.Any] = ()) -> typing.List[typing.Tuple]:
+        """Runs a query against the events table after flushing."""
+        with self._lock:
+            self._insert_pending()
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def _rows(self, where: str, parameters: typing.Sequence[typing.Any], order_by: str = "timestamp") -> typing.List[dict]:
+        return [
+            json.loads(row)
+            for (row,) in self.query(f"SELECT row FROM events WHERE {where} ORDER BY {order_by}", parameters)
+        ]
+
+    def trace_id_for_query(self, query_id: str) -> typing.Optional[str]:
+        """
+        Returns the trace id of the spans of a query, found by the prefix of
+        their snow.query.id resource attribute.
+        """
+        rows = self.query(
+            "SELECT trace_id FROM events WHERE record_type = 'SPAN' AND "
+            "substr(json_extract(row, '$.RESOURCE_ATTRIBUTES.\"snow.query.id\"'), 1, ?) = ? LIMIT 1",
+            (len(query_id), query_id.lower()),
+        )
+        return rows[0][0] if rows else None
+
+    def spans(self, trace_id: str) -> typing.List[dict]:
+        """Returns the spans of a trace in the order they started."""
+        return self._rows("trace_id = ? AND record_type = 'SPAN'", (trace_id,), "start_timestamp")
+
+    def span(self, span_id: str) -> typing.Optional[dict]:
+        rows = self._rows("span_id = ? AND record_type = 'SPAN'", (span_id,))
+        return rows[0] if rows else None
+
+    def children(self, span_id: str) -> typing.List[dict]:
+        """Returns the spans whose parent is the given span."""
+        return self._rows("parent_span_id = ?", (span_id,), "start_timestamp")
+
+    def events(self, trace_id: str, record_types: typing.Iterable[str] = ("SPAN_EVENT", "LOG")) -> typing.List[dict]:
+        """Returns the span events and logs of a trace in timestamp order."""
+        record_types = tuple(record_types)
+        placeholders = ", ".join("?" * len(record_types))
+        return self._rows(f"trace_id = ? AND record_type IN ({placeholders})", (trace_id,) + record_types)
+
+    def between(self, start: str, end: str, record_type: typing.Optional[str] = None) -> typing.List[dict]:
+        """
+        Returns the rows with a timestamp from start up to, excluding, end,
+        e.g. "2024-05-01 12:00:00".
+        """
+        if record_type is None:
+            return self._rows("timestamp >= ? AND timestamp < ?", (start, end))
+        return self._rows("timestamp >= ? AND timestamp < ? AND record_type = ?", (start, end, record_type))
+
+    def count(self, record_type: typing.Optional[str] = None) -> int:
+        if record_type is None:
+            return self.query("SELECT count(*) FROM events")[0][0]
+        return self.query("SELECT count(*) FROM events WHERE record_type = ?", (record_type,))[0][0]
@@ -0,0 +1,287 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+"""
+Adaptive batch sizing for the batching span and log record processors.
+
+A static batch size and schedule delay are either too small for large scans,
+which then pay the fixed cost of a write for a handful of items, or too
+large for small UDFs, which then hold their telemetry for the whole schedule
+delay. The AdaptiveBatchController measures how long batches take to encode
+and write, and derives the batch size that meets a target latency while
+keeping up with the rate at which items arrive, and the flush interval in
+which that many items arrive.
+"""
+
+import collections
+import logging
+import threading
+import time
+import typing
+
+from opentelemetry.context import (
+    _SUPPRESS_INSTRUMENTATION_KEY,
+    attach,
+    detach,
+    set_value,
+)
+from snowflake.telemetry._internal import fork
+
+_logger = logging.getLogger(__name__)
+
+
+class _LinearFit:
+    """
+    An exponentially weighted least squares fit of y = intercept + slope * x,
+    in which older observations weigh less and less.
+    """
+    __slots__ = ("_decay", "_weight", "_x", "_y", "_xx", "_xy")
+
+    def __init__(self, smoothing: float):
+        self._decay = 1 - smoothing
+        self._weight = 0.0
+        self._x = 0.0
+        self._y = 0.0
+        self._xx = 0.0
+        self._xy = 0.0
+
+    def add(self, x: float, y: float) -> None:
+        decay = self._decay
+        self._weight = self._weight * decay + 1
+        self._x = self._x * decay + x
+        self._y = self._y * decay + y
+        self._xx = self._xx * decay + x * x
+        self._xy = self._xy * decay + x * y
+
+    def coefficients(self) -> typing.Optional[typing.Tuple[float, float]]:
+        if not self._weight:
+            return None
+        mean_x = self._x / self._weight
+        mean_y = self._y / self._weight
+        variance = self._xx / self._weight - mean_x * mean_x
+        if variance <= mean_x * mean_x * 1e-6:
+            # All observations have about the same x, which cannot tell the
+            # fixed cost apart from the proportional one.
+            return 0.0, (mean_y / mean_x if mean_x else 0.0)
+        slope = max((self._xy / self._weight - mean_x * mean_y) / variance, 0.0)
+        return max(mean_y - slope * mean_x, 0.0), slope
+
+
+class AdaptiveBatchController:
+    """
+    Derives a batch size and a flush interval from the measured cost of
+    encoding and writing batches.
+
+    The encode and write latencies are each modeled as a fixed cost per batch
+    plus a cost per item or per byte. The batch size is the largest that is
+    encoded and written within target_latency_millis, but at least the size
+    that keeps up with the measured arrival rate of items, and it changes by
+    at most a factor of two per observation. The flush interval is the time
+    in which a batch worth of items arrives. Both are kept within the given
+    bounds.
+
+    One controller can be shared by a processor and the BatchingWriter it
+    writes to, in which case the BatchingWriter reports the write latencies.
+    All methods are thread safe.
+    """
+    def __init__(
+        self,
+        target_latency_millis: float = 100,
+        initial_batch_size: int = 512,
+        min_batch_size: int = 16,
+        max_batch_size: int = 8192,
+        initial_interval_millis: float = 5_000,
+        min_interval_millis: float = 100,
+        max_interval_millis: float = 5_000,
+        smoothing: float = 0.2,
+    ):
+        if not 0 < min_batch_size <= max_batch_size:
+            raise ValueError("min_batch_size must be positive and at most max_batch_size")
+        if not 0 < smoothing <= 1:
+            raise ValueError("smoothing must be in (0, 1]")
+        self._target_latency = target_latency_millis / 1e3
+        self._min_batch_size = min_batch_size
+        self._max_batch_size = max_batch_size
+        self._min_interval = min_interval_millis / 1e3
+        self._max_interval = max_interval_millis / 1e3
+        self._smoothing = smoothing
+        self._lock = threading.Lock()
+        self._encode = _LinearFit(smoothing)
+        self._write = _LinearFit(smoothing)
+        self._bytes_per_item: typing.Optional[float] = None
+        self._arrival_rate: typing.Optional[float] = None
+        self._batch_size = min(max(initial_batch_size, min_batch_size), max_batch_size)
+        self._interval = min(max(initial_interval_millis / 1e3, self._min_interval), self._max_interval)
+
+    @property
+    def batch_size(self) -> int:
+        return self._batch_size
+
+    @property
+    def interval_millis(self) -> float:
+        return self._interval * 1e3
+
+    def _average(self, average: typing.Optional[float], value: float) -> float:
+        if average is None:
+            return value
+        return average + self._smoothing * (value - average)
+
+    def record_encode(self, items: int, seconds: float, size_bytes: int) -> None:
+        """Records that items were encoded into size_bytes in seconds."""
+        if items <= 0:
+            return
+        with self._lock:
+            self._encode.add(items, seconds)
+            self._bytes_per_item = self._average(self._bytes_per_item, size_bytes / items)
+            self._adjust()
+
+    def record_write(self, seconds: float, size_bytes: int) -> None:
+        """Records that a payload of size_bytes was written in seconds."""
+        with self._lock:
+            self._write.add(size_bytes, seconds)
+            self._adjust()
+
+    def record_arrivals(self, items: int, seconds: float) -> None:
+        """Records that items arrived within seconds."""
+        if seconds <= 0:
+            return
+        with self._lock:
+            self._arrival_rate = self._average(self._arrival_rate, items / seconds)
+            self._adjust()
+
+    def _adjust(self) -> None:
+        encode = self._encode.coefficients()
+        if encode is not None:
+            fixed, per_item = encode
+            write = self._write.coefficients()
+            if write is not None and self._bytes_per_item is not None:
+                fixed += write[0]
+                per_item += write[1] * self._bytes_per_item
+            if per_item <= 0:
+                desired = float(self._max_batch_size)
+            else:
+                desired = max((self._target_latency - fixed) / per_item, 0.0)
+            rate = self._arrival_rate
+            if rate and fixed > 0:
+                # A batch of n items takes fixed + n * per_item, so batches
+                # keep up with the arrivals if n >= rate * that.
+                if rate * per_item < 1:
+                    desired = max(desired, rate * fixed / (1 - rate * per_item))
+                else:
+                    desired = float(self._max_batch_size)
+            desired = min(max(desired, self._batch_size / 2, self._min_batch_size), self._batch_size * 2)
+            self._batch_size = int(min(desired, self._max_batch_size))
+        if self._arrival_rate:
+            interval = self._batch_size / self._arrival_rate
+        else:
+            interval = self._max_interval
+        self._interval = min(max(interval, self._min_interval), self._max_interval)
+
+
+class _AdaptiveBatcher:
+    """
+    Queues items and exports them on a background thread in batches of the
+    size chosen by an AdaptiveBatchController, at least once per flush
+    interval.
+    """
+    def __init__(
+        self,
+        name: str,
+        export: typing.Callable[[typing.List[typing.Any]], None],
+        controller: AdaptiveBatchController,
+        max_queue_size: int,
+    ):
+        self._name = name
+        self._export = export
+        self._controller = controller
+        self._max_queue_size = max_queue_size
+        self._condition = threading.Condition(threading.Lock())
+        # Serializes exports, so that batches are exported in order.
+        self._export_lock = threading.Lock()
+        self._queue: typing.Deque[typing.Any] = collections.deque()
+        self._arrived = 0
+        self._last_export = time.monotonic()
+        self._worker: typing.Optional[threading.Thread] = None
+        self._shutdown = False
+        self.dropped_items = 0
+        fork.register(self)
+
+    def _at_fork_reinit(self) -> None:
+        # The parent exports the items it queued, the worker is started
+        # again by the next add().
+        self._condition = threading.Condition(threading.Lock())
+        self._export_lock = threading.Lock()
+        self._queue = collections.deque()
+        self._worker = None
+
+    def add(self, item: typing.Any) -> None:
+        with self._condition:
+            if self._shutdown:
+                return
+            if len(self._queue) >= self._max_queue_size:
+                self.dropped_items += 1
+                return
+            if self._worker is None:
+                self._worker = threading.Thread(name=self._name, target=self._run, daemon=True)
+                self._worker.start()
+            self._queue.append(item)
+            self._arrived += 1
+            if len(self._queue) == 1 or len(self._queue) >= self._controller.batch_size:
+                self._condition.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._shutdown:
+                    timeout = self._last_export + self._controller.interval_millis / 1e3 - time.monotonic()
+                    if len(self._queue) >= self._controller.batch_size or (self._queue and timeout <= 0):
+                        break
+                    self._condition.wait(timeout if self._queue else None)
+                if self._shutdown:
+                    return
+            self._export_batch()
+
+    def _export_batch(self) -> bool:
+        with self._export_lock:
+            with self._condition:
+                now = time.monotonic()
+                self._controller.record_arrivals(self._arrived, now - self._last_export)
+                self._arrived = 0
+                self._last_export = now
+                batch = [
+                    self._queue.popleft()
+                    for _ in range(min(len(self._queue), self._controller.batch_size))
+                ]
+            if not batch:
+                return True
+            token = attach(set_value(_SUPPRESS_INSTRUMENTATION_KEY, True))
+            try:
+                self._export(batch)
+                return True
+            # pylint: disable=broad-exception-caught
+            except Exception:
+                _logger.exception("Exception while exporting batch.")
+                return False
+            finally:
+                detach(token)
+
+    def flush(self, timeout_millis: float) -> bool:
+        deadline = time.monotonic() + timeout_millis / 1e3
+        exported = True
+        while self._queue:
+            if time.monotonic() >= deadline:
+                return False
+            exported = self._export_batch() and exported
+        return exported
+
+    def shutdown(self, timeout_millis: float) -> None:
+        with self._condition:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            self._condition.notify_all()
+        deadline = time.monotonic() + timeout_millis / 1e3
+        if self._worker is not None:
+            self._worker.join(timeout_millis / 1e3)
+        self.flush(max(deadline - time.monotonic(), 0) * 1e3)
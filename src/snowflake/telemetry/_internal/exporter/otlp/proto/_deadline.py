@@ -0,0 +1,83 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+"""
+Deadlines for exports.
+
+Encoding a large batch can take longer than the timeout the SDK gives an
+export, and nothing interrupts it, so a single batch could hold up a
+shutdown, and with it the query, for as long as it takes to encode. Batches
+are therefore encoded in shards, and the deadline is checked between the
+shards. Once it expires, the shards encoded so far are written as a partial
+payload and the items of the others are dropped.
+"""
+
+import math
+import time
+import typing
+
+_T = typing.TypeVar("_T")
+
+
+class DeadlineExceeded(Exception):
+    """
+    Raised when a deadline expires before all shards of a batch are encoded.
+    payload holds the shards encoded in time, which form a valid message on
+    their own, and dropped the number of items of the others.
+    """
+    def __init__(self, payload: bytes, dropped: int):
+        super().__init__(f"deadline exceeded, {dropped} items dropped")
+        self.payload = payload
+        self.dropped = dropped
+
+
+class Deadline:
+    """
+    The point in time timeout_millis from now, or no deadline at all if
+    timeout_millis is None.
+    """
+    def __init__(self, timeout_millis: typing.Optional[float]):
+        if timeout_millis is None:
+            self._expires = math.inf
+        else:
+            self._expires = time.monotonic() + timeout_millis / 1e3
+
+    @property
+    def bounded(self) -> bool:
+        return self._expires != math.inf
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self._expires
+
+    def remaining(self) -> typing.Optional[float]:
+        """Returns the remaining seconds, or None without a deadline."""
+        if not self.bounded:
+            return None
+        return max(self._expires - time.monotonic(), 0.0)
+
+    def remaining_millis(self, default: float = 30_000) -> float:
+        """Returns the remaining milliseconds, or default without a deadline."""
+        remaining = self.remaining()
+        return default if remaining is None else remaining * 1e3
+
+
+def serialize_shards(
+    shards: typing.Sequence[_T],
+    serialize: typing.Callable[[_T], bytes],
+    count: typing.Callable[[_T], int],
+    deadline: Deadline,
+) -> bytes:
+    """
+    Serializes the shards one after the other and concatenates them,
+    raising DeadlineExceeded if the deadline expires before the last one.
+    count returns the number of items of a shard.
+    """
+    serialized = []
+    for index, shard in enumerate(shards):
+        if deadline.expired():
+            raise DeadlineExceeded(
+                b"".join(serialized), sum(count(rest) for rest in shards[index:])
+            )
+        serialized.append(serialize(shard))
+    return b"".join(serialized)
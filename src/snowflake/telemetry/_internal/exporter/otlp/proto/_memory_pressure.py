@@ -0,0 +1,313 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+"""
+Memory pressure aware degradation for the exporters.
+
+UDF sandboxes have hard memory limits, and buffered telemetry must never be
+the reason a query runs out of memory. A MemoryPressureMonitor compares the
+resident set size of the process and the bytes buffered by the exporters
+with watermarks, and the exporters switch to progressively cheaper behavior
+above them.
+"""
+
+import collections
+import copy
+import enum
+import logging
+import os
+import sys
+import threading
+import time
+import typing
+
+from opentelemetry._logs import SeverityNumber
+from opentelemetry.attributes import BoundedAttributes
+from opentelemetry.sdk._logs import LogData
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.trace import StatusCode
+from snowflake.telemetry._internal import fork
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_logger = logging.getLogger(__name__)
+
+# Counted in MemoryPressureMonitor.degradations.
+DROPPED_LOGS = "dropped_logs"
+SAMPLED_OUT_SPANS = "sampled_out_spans"
+TRUNCATED_ATTRIBUTES = "truncated_attributes"
+EARLY_FLUSHES = "early_flushes"
+
+_CGROUP_LIMITS = (
+    "/sys/fs/cgroup/memory.max",
+    "/sys/fs/cgroup/memory/memory.limit_in_bytes",
+)
+# Larger values mean that there is no limit.
+_UNLIMITED = 1 << 60
+
+
+class MemoryPressure(enum.IntEnum):
+    NORMAL = 0
+    ELEVATED = 1
+    HIGH = 2
+    CRITICAL = 3
+
+
+_DEGRADED_LEVELS = (MemoryPressure.ELEVATED, MemoryPressure.HIGH, MemoryPressure.CRITICAL)
+
+
+def current_rss_bytes() -> typing.Optional[int]:
+    """
+    Returns the resident set size of the process, or its peak resident set
+    size where the current one is not available, or None.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, KiB elsewhere.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def memory_limit_bytes() -> typing.Optional[int]:
+    """
+    Returns the memory limit of the process, from its cgroup or its address
+    space limit, or None if it has no limit.
+    """
+    for path in _CGROUP_LIMITS:
+        try:
+            with open(path, "rb") as limit_file:
+                limit = limit_file.read().strip()
+        except OSError:
+            continue
+        if limit.isdigit() and int(limit) < _UNLIMITED:
+            return int(limit)
+    if resource is not None:
+        limit, _ = resource.getrlimit(resource.RLIMIT_AS)
+        if 0 < limit < _UNLIMITED:
+            return limit
+    return None
+
+
+def _truncate_value(value, max_length: int):
+    if isinstance(value, str):
+        return value[:max_length] if len(value) > max_length else value
+    if isinstance(value, (tuple, list)):
+        return type(value)(_truncate_value(item, max_length) for item in value)
+    return value
+
+
+def _truncate_attributes(attributes, max_length: int):
+    """
+    Returns a copy of attributes with the strings cut to max_length, or None
+    if no string is longer than max_length.
+    """
+    if not attributes:
+        return None
+    truncated = {key: _truncate_value(value, max_length) for key, value in attributes.items()}
+    if all(truncated[key] == value for key, value in attributes.items()):
+        return None
+    return truncated
+
+
+class MemoryPressureMonitor:
+    """
+    Measures memory pressure and degrades the spans and log records exported
+    under it.
+
+    The pressure is the highest MemoryPressure level whose watermark is
+    reached by either the resident set size of the process, or the bytes
+    buffered by the sources added with add_buffer(). rss_watermarks and
+    buffer_watermarks hold the watermarks of the ELEVATED, HIGH and CRITICAL
+    levels in bytes; rss_watermarks default to 60%, 75% and 90% of the
+    memory limit of the process, if it has one. The resident set size is
+    read at most once per check_interval_millis.
+
+    The per level settings also list the ELEVATED, HIGH and CRITICAL values:
+    log records below min_log_severities are dropped, spans are sampled with
+    span_sample_ratios, keeping whole traces and all spans with an error
+    status, and string attributes are cut to max_attribute_lengths. Above
+    NORMAL, exporters also flush their writer after every batch so that
+    nothing stays buffered. Every degradation is counted in degradations.
+    """
+    def __init__(
+        self,
+        rss_watermarks: typing.Optional[typing.Sequence[int]] = None,
+        buffer_watermarks: typing.Sequence[int] = (16 * 1024 * 1024, 64 * 1024 * 1024, 128 * 1024 * 1024),
+        min_log_severities: typing.Sequence[SeverityNumber] = (
+            SeverityNumber.INFO,
+            SeverityNumber.WARN,
+            SeverityNumber.ERROR,
+        ),
+        span_sample_ratios: typing.Sequence[float] = (1.0, 0.25, 0.0),
+        max_attribute_lengths: typing.Sequence[typing.Optional[int]] = (None, 1024, 128),
+        check_interval_millis: float = 100,
+        flush_timeout_millis: float = 1_000,
+    ):
+        if rss_watermarks is None:
+            limit = memory_limit_bytes()
+            if limit is not None:
+                rss_watermarks = (int(limit * 0.6), int(limit * 0.75), int(limit * 0.9))
+        for name, levels in (
+            ("rss_watermarks", rss_watermarks),
+            ("buffer_watermarks", buffer_watermarks),
+            ("min_log_severities", min_log_severities),
+            ("span_sample_ratios", span_sample_ratios),
+            ("max_attribute_lengths", max_attribute_lengths),
+        ):
+            if levels is not None and len(levels) != 3:
+                raise ValueError(f"{name} must have one value for each of ELEVATED, HIGH and CRITICAL")
+        self._rss_watermarks = rss_watermarks
+        self._buffer_watermarks = buffer_watermarks
+        self._min_log_severities = min_log_severities
+        self._span_sample_ratios = span_sample_ratios
+        self._max_attribute_lengths = max_attribute_lengths
+        self._check_interval = check_interval_millis / 1e3
+        self.flush_timeout_millis = flush_timeout_millis
+        self._lock = threading.Lock()
+        self._buffers: typing.List[typing.Callable[[], int]] = []
+        self._rss: typing.Optional[int] = None
+        self._rss_checked = float("-inf")
+        self._level = MemoryPressure.NORMAL
+        self.degradations: typing.Counter[str] = collections.Counter()
+        fork.register(self)
+
+    def _at_fork_reinit(self) -> None:
+        self._lock = threading.Lock()
+        # The resident set size of the child is measured on the next check.
+        self._rss_checked = float("-inf")
+
+    def add_buffer(self, buffered_bytes: typing.Callable[[], int]) -> None:
+        """
+        Adds a source of buffered bytes, e.g. lambda: writer.queue_bytes for
+        a BatchingWriter.
+        """
+        with self._lock:
+            self._buffers.append(buffered_bytes)
+
+    def count(self, degradation: str, amount: int = 1) -> None:
+        if amount:
+            with self._lock:
+                self.degradations[degradation] += amount
+
+    @staticmethod
+    def _level_of(value: typing.Optional[int], watermarks: typing.Optional[typing.Sequence[int]]) -> MemoryPressure:
+        level = MemoryPressure.NORMAL
+        if value is not None and watermarks is not None:
+            for candidate, watermark in zip(_DEGRADED_LEVELS, watermarks):
+                if value >= watermark:
+                    level = candidate
+        return level
+
+    def level(self) -> MemoryPressure:
+        """Returns the current memory pressure."""
+        with self._lock:
+            now = time.monotonic()
+            if self._rss_watermarks is not None and now - self._rss_checked >= self._check_interval:
+                self._rss = current_rss_bytes()
+                self._rss_checked = now
+            buffers = list(self._buffers)
+            rss = self._rss
+        buffered = sum(buffered_bytes() for buffered_bytes in buffers)
+        level = max(
+            self._level_of(rss, self._rss_watermarks),
+            self._level_of(buffered, self._buffer_watermarks),
+        )
+        with self._lock:
+            previous = self._level
+            self._level = level
+        if level > previous:
+            _logger.warning(
+                "Telemetry memory pressure is %s (RSS %s bytes, %d bytes buffered), degrading exported telemetry.",
+                level.name, rss, buffered,
+            )
+        return level
+
+    def flush_early(self, writer) -> None:
+        """
+        Flushes writer, so that it buffers nothing under memory pressure.
+        """
+        self.count(EARLY_FLUSHES)
+        writer.force_flush(self.flush_timeout_millis)
+
+    def _per_level(self, values: typing.Sequence, level: MemoryPressure):
+        return values[level - 1] if level > MemoryPressure.NORMAL else None
+
+    def degrade_spans(
+        self, spans: typing.Sequence[ReadableSpan], level: MemoryPressure
+    ) -> typing.Sequence[ReadableSpan]:
+        """Samples the spans and truncates their attributes for level."""
+        if level is MemoryPressure.NORMAL:
+            return spans
+        ratio = self._per_level(self._span_sample_ratios, level)
+        max_length = self._per_level(self._max_attribute_lengths, level)
+        threshold = int(ratio * (1 << 64))
+        degraded = []
+        truncated = 0
+        for span in spans:
+            # Sampling on the trace id keeps or drops whole traces.
+            if (
+                ratio < 1
+                and span.context.trace_id & 0xFFFFFFFFFFFFFFFF >= threshold
+                and span.status.status_code is not StatusCode.ERROR
+            ):
+                continue
+            if max_length is not None:
+                attributes = _truncate_attributes(span.attributes, max_length)
+                if attributes is not None:
+                    truncated += 1
+                    dropped = span.dropped_attributes
+                    attributes = BoundedAttributes(attributes=attributes)
+                    attributes.dropped = dropped
+                    # A copy keeps the events, links and their drop counts.
+                    span = copy.copy(span)
+                    span._attributes = attributes  # pylint: disable=protected-access
+            degraded.append(span)
+        self.count(SAMPLED_OUT_SPANS, len(spans) - len(degraded))
+        self.count(TRUNCATED_ATTRIBUTES, truncated)
+        return degraded
+
+    def degrade_logs(
+        self, batch: typing.Sequence[LogData], level: MemoryPressure
+    ) -> typing.Sequence[LogData]:
+        """
+        Drops low severity log records and truncates the attributes and
+        bodies of the others for level.
+        """
+        if level is MemoryPressure.NORMAL:
+            return batch
+        min_severity = self._per_level(self._min_log_severities, level)
+        max_length = self._per_level(self._max_attribute_lengths, level)
+        degraded = []
+        truncated = 0
+        for log_data in batch:
+            log_record = log_data.log_record
+            severity = log_record.severity_number
+            if severity is not None and severity.value < min_severity.value:
+                continue
+            if max_length is not None:
+                attributes = _truncate_attributes(log_record.attributes, max_length)
+                body = _truncate_value(log_record.body, max_length)
+                if attributes is not None or body != log_record.body:
+                    truncated += 1
+                    dropped = log_record.dropped_attributes
+                    log_record = copy.copy(log_record)
+                    if attributes is not None:
+                        log_record.attributes = BoundedAttributes(
+                            attributes=attributes, extended_attributes=True
+                        )
+                        log_record.attributes.dropped = dropped
+                    log_record.body = body
+                    log_data = LogData(log_record, log_data.instrumentation_scope)
+            degraded.append(log_data)
+        self.count(DROPPED_LOGS, len(batch) - len(degraded))
+        self.count(TRUNCATED_ATTRIBUTES, truncated)
+        return degraded
@@ -0,0 +1,248 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+"""
+Parallel encoding of large trace and metric batches.
+
+A batch is split into shards, each shard is encoded into a serialized
+TracesData/MetricsData message on the given executor, and the serialized
+shards are concatenated. TracesData and MetricsData only contain a repeated
+message field, and concatenating serialized protobuf messages merges their
+repeated fields, so the result is a valid message containing the
+ResourceSpans/ResourceMetrics of all shards.
+
+Every shard builds its own marshaler objects, so no marshaler instance (and
+none of the size and marshaler caches kept on it) is ever shared between
+workers.
+
+With a ThreadPoolExecutor the shards are passed to the workers as is. This
+only makes encoding faster on free-threaded Python builds, since encoding is
+CPU bound and holds the GIL otherwise. With any other executor, e.g. a
+ProcessPoolExecutor, the shards are pickled first. The SDK objects hold
+locks, which cannot be pickled, so they are reduced to their state and get a
+new lock when they are unpickled.
+"""
+
+import copyreg
+import io
+import pickle
+import threading
+from collections import defaultdict
+from concurrent.futures import Executor, ThreadPoolExecutor, wait
+from typing import Callable, List, Optional, Sequence
+
+from snowflake.telemetry._internal.exporter.otlp.proto._deadline import (
+    Deadline,
+    DeadlineExceeded,
+)
+from snowflake.telemetry._internal.opentelemetry.exporter.otlp.proto.common.metrics_encoder import (
+    encode_metrics,
+)
+from snowflake.telemetry._internal.opentelemetry.exporter.otlp.proto.common.trace_encoder import (
+    encode_spans,
+)
+from snowflake.telemetry._internal.opentelemetry.proto.metrics.v1.metrics_marshaler import MetricsData as PB2MetricsData
+from snowflake.telemetry._internal.opentelemetry.proto.trace.v1.trace_marshaler import TracesData
+from opentelemetry.attributes import BoundedAttributes
+from opentelemetry.sdk.metrics.export import (
+    MetricsData,
+    ResourceMetrics,
+    ScopeMetrics,
+)
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.util import BoundedList
+
+DEFAULT_SHARD_SIZE = 1024
+
+_RLOCK_TYPE = type(threading.RLock())
+
+
+def _rebuild_locked(cls, state, reentrant):
+    obj = cls.__new__(cls)
+    obj.__dict__.update(state)
+    obj._lock = threading.RLock() if reentrant else threading.Lock()
+    return obj
+
+
+def _reduce_locked(obj):
+    state = obj.__dict__.copy()
+    lock = state.pop("_lock")
+    return _rebuild_locked, (type(obj), state, isinstance(lock, _RLOCK_TYPE))
+
+
+def _dumps(obj) -> bytes:
+    stream = io.BytesIO()
+    pickler = pickle.Pickler(stream, protocol=pickle.HIGHEST_PROTOCOL)
+    pickler.dispatch_table = copyreg.dispatch_table.copy()
+    pickler.dispatch_table[BoundedAttributes] = _reduce_locked
+    pickler.dispatch_table[BoundedList] = _reduce_locked
+    pickler.dump(obj)
+    return stream.getvalue()
+
+
+def _serialize_spans_shard(sdk_spans: Sequence[ReadableSpan]) -> bytes:
+    # pylint: disable=no-member
+    return TracesData(
+        resource_spans=encode_spans(sdk_spans).resource_spans
+    ).SerializeToString()
+
+
+def _serialize_pickled_spans_shard(payload: bytes) -> bytes:
+    return _serialize_spans_shard(pickle.loads(payload))
+
+
+def _serialize_metrics_shard(data: MetricsData) -> bytes:
+    # pylint: disable=no-member
+    return PB2MetricsData(
+        resource_metrics=encode_metrics(data).resource_metrics
+    ).SerializeToString()
+
+
+def _serialize_pickled_metrics_shard(payload: bytes) -> bytes:
+    return _serialize_metrics_shard(pickle.loads(payload))
+
+
+def _run(
+    executor: Executor,
+    shards: List,
+    serialize: Callable[..., bytes],
+    serialize_pickled: Callable[[bytes], bytes],
+    count: Callable[..., int],
+    deadline: Optional[Deadline],
+) -> bytes:
+    if deadline is not None and deadline.expired():
+        raise DeadlineExceeded(b"", sum(count(shard) for shard in shards))
+    if len(shards) == 1:
+        return serialize(shards[0])
+    if isinstance(executor, ThreadPoolExecutor):
+        futures = [executor.submit(serialize, shard) for shard in shards]
+    else:
+        futures = [
+            executor.submit(serialize_pickled, _dumps(shard)) for shard in shards
+        ]
+    if deadline is not None and deadline.bounded:
+        _, not_done = wait(futures, deadline.remaining())
+        if not_done:
+            # Shards that did not start yet are cancelled, the ones being
+            # encoded run to completion and are discarded.
+            for future in not_done:
+                future.cancel()
+            raise DeadlineExceeded(
+                b"".join(future.result() for future in futures if future not in not_done),
+                sum(count(shard) for shard, future in zip(shards, futures) if future in not_done),
+            )
+    return b"".join(future.result() for future in futures)
+
+
+def span_shards(
+    sdk_spans: Sequence[ReadableSpan],
+    shard_size: int = DEFAULT_SHARD_SIZE,
+) -> List[List[ReadableSpan]]:
+    """
+    Splits the spans into shards of at most shard_size spans. Spans are
+    grouped by resource and instrumentation scope first, so that a shard
+    usually repeats only one resource and scope header.
+    """
+    groups = defaultdict(list)
+    for sdk_span in sdk_spans:
+        groups[(sdk_span.resource, sdk_span.instrumentation_scope)].append(sdk_span)
+    shards = []
+    for group in groups.values():
+        for start in range(0, len(group), shard_size):
+            shards.append(group[start:start + shard_size])
+    return shards
+
+
+def serialize_spans_parallel(
+    executor: Executor,
+    sdk_spans: Sequence[ReadableSpan],
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    deadline: Optional[Deadline] = None,
+) -> bytes:
+    """
+    Serializes the spans into a TracesData message, encoding the shards of
+    span_shards() on the executor. If the deadline expires first, the shards
+    that are not done are cancelled and DeadlineExceeded is raised.
+    """
+    shards = span_shards(sdk_spans, shard_size)
+    if not shards:
+        return _serialize_spans_shard(sdk_spans)
+    return _run(executor, shards, _serialize_spans_shard, _serialize_pickled_spans_shard, len, deadline)
+
+
+def count_data_points(data: MetricsData) -> int:
+    return sum(
+        len(getattr(metric.data, "data_points", ()))
+        for resource_metrics in data.resource_metrics
+        for scope_metrics in resource_metrics.scope_metrics
+        for metric in scope_metrics.metrics
+    )
+
+
+def serialize_metrics_parallel(
+    executor: Executor,
+    data: MetricsData,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    deadline: Optional[Deadline] = None,
+) -> bytes:
+    """
+    Serializes the metrics data into a MetricsData message, encoding the
+    shards of metrics_shards() on the executor. If the deadline expires
+    first, the shards that are not done are cancelled and DeadlineExceeded
+    is raised.
+    """
+    shards = metrics_shards(data, shard_size)
+    if not shards:
+        return _serialize_metrics_shard(data)
+    return _run(
+        executor, shards, _serialize_metrics_shard, _serialize_pickled_metrics_shard, count_data_points, deadline
+    )
+
+
+def metrics_shards(
+    data: MetricsData,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+) -> List[MetricsData]:
+    """
+    Splits the metrics data into shards of at most shard_size data points,
+    or of a single metric with more data points. A shard never spans more
+    than one resource and instrumentation scope.
+    """
+    shards = []
+    for resource_metrics in data.resource_metrics:
+        for scope_metrics in resource_metrics.scope_metrics:
+            metrics = []
+            points = 0
+            for metric in scope_metrics.metrics:
+                metrics.append(metric)
+                points += len(getattr(metric.data, "data_points", ()))
+                if points >= shard_size:
+                    shards.append(_metrics_shard(resource_metrics, scope_metrics, metrics))
+                    metrics = []
+                    points = 0
+            if metrics:
+                shards.append(_metrics_shard(resource_metrics, scope_metrics, metrics))
+    return shards
+
+
+def _metrics_shard(
+    resource_metrics: ResourceMetrics,
+    scope_metrics: ScopeMetrics,
+    metrics: list,
+) -> MetricsData:
+    return MetricsData(
+        resource_metrics=[
+            ResourceMetrics(
+                resource=resource_metrics.resource,
+                scope_metrics=[
+                    ScopeMetrics(
+                        scope=scope_metrics.scope,
+                        metrics=metrics,
+                        schema_url=scope_metrics.schema_url,
+                    )
+                ],
+                schema_url=resource_metrics.schema_url,
+            )
+        ]
+    )
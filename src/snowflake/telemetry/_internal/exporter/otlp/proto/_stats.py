@@ -0,0 +1,232 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+"""
+Self-telemetry of the exporters.
+
+An ExporterStats given to an exporter records how long its batches take to
+encode, serialize and write, how large they are, and what fails or gets
+dropped, so that slow telemetry can be told apart from a slow sink. The
+recording is a few perf_counter() calls and integer additions per batch,
+and exporters without an ExporterStats skip it entirely.
+"""
+
+import bisect
+import collections
+import threading
+import typing
+
+from opentelemetry.metrics import CallbackOptions, MeterProvider, Observation
+from snowflake.telemetry._internal import fork
+
+_METER_NAME = "snowflake.telemetry.exporter"
+
+# Upper bounds of the histogram buckets, the last bucket has no bound.
+_LATENCY_BOUNDARIES = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+_SIZE_BOUNDARIES = tuple(float(256 * 4 ** i) for i in range(10))
+
+
+class HistogramSnapshot(typing.NamedTuple):
+    """
+    The values recorded in a histogram. counts[i] is the number of values
+    up to boundaries[i], the last count the number of larger values.
+    """
+    count: int
+    sum: float
+    min: float
+    max: float
+    boundaries: typing.Tuple[float, ...]
+    counts: typing.Tuple[int, ...]
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """
+        Returns an estimate of the q quantile: the upper bound of the bucket
+        holding it, or the maximum for the last bucket.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for boundary, count in zip(self.boundaries, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(boundary, self.max)
+        return self.max
+
+
+class _Histogram:
+    def __init__(self, boundaries: typing.Tuple[float, ...]):
+        self._boundaries = boundaries
+        self._counts = [0] * (len(boundaries) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._min = float("inf")
+        self._max = float("-inf")
+
+    def record(self, value: float) -> None:
+        self._counts[bisect.bisect_left(self._boundaries, value)] += 1
+        self._count += 1
+        self._sum += value
+        if value < self._min:
+            self._min = value
+        if value > self._max:
+            self._max = value
+
+    def snapshot(self) -> HistogramSnapshot:
+        return HistogramSnapshot(
+            self._count,
+            self._sum,
+            self._min if self._count else 0.0,
+            self._max if self._count else 0.0,
+            self._boundaries,
+            tuple(self._counts),
+        )
+
+
+class ExporterStats:
+    """
+    Records the self-telemetry of an exporter: histograms of the encode,
+    serialize and write latencies in seconds and of the payload sizes in
+    bytes, the number of exported payloads and items, failures by exception
+    type, dropped items and the depth of the queues added with add_queue().
+    Items are spans, metric data points or log records.
+
+    Read the recorded values with snapshot(). If a meter_provider is given,
+    they are also recorded as OpenTelemetry metrics of the
+    snowflake.telemetry.exporter meter, with the given attributes. Use a
+    meter provider of its own, so that the self-telemetry does not go
+    through the exporter it measures.
+
+    Batches that are encoded in shards are encoded and serialized in one
+    go, their time is recorded as encode time.
+    """
+    def __init__(
+        self,
+        meter_provider: typing.Optional[MeterProvider] = None,
+        attributes: typing.Optional[typing.Dict[str, str]] = None,
+    ):
+        self._lock = threading.Lock()
+        self._encode = _Histogram(_LATENCY_BOUNDARIES)
+        self._serialize = _Histogram(_LATENCY_BOUNDARIES)
+        self._write = _Histogram(_LATENCY_BOUNDARIES)
+        self._payload_bytes = _Histogram(_SIZE_BOUNDARIES)
+        self._queues: typing.List[typing.Callable[[], int]] = []
+        self.exported_payloads = 0
+        self.exported_items = 0
+        self.dropped_items = 0
+        self.failures: typing.Counter[str] = collections.Counter()
+        self._attributes = dict(attributes or {})
+        self._metered = meter_provider is not None
+        if self._metered:
+            self._create_instruments(meter_provider)
+        fork.register(self)
+
+    def _at_fork_reinit(self) -> None:
+        self._lock = threading.Lock()
+
+    def _create_instruments(self, meter_provider: MeterProvider) -> None:
+        meter = meter_provider.get_meter(_METER_NAME)
+        self._encode_duration = meter.create_histogram(
+            f"{_METER_NAME}.encode.duration", "s", "Time spent encoding batches.",
+            explicit_bucket_boundaries_advisory=_LATENCY_BOUNDARIES,
+        )
+        self._serialize_duration = meter.create_histogram(
+            f"{_METER_NAME}.serialize.duration", "s", "Time spent serializing batches.",
+            explicit_bucket_boundaries_advisory=_LATENCY_BOUNDARIES,
+        )
+        self._write_duration = meter.create_histogram(
+            f"{_METER_NAME}.write.duration", "s", "Time spent writing payloads.",
+            explicit_bucket_boundaries_advisory=_LATENCY_BOUNDARIES,
+        )
+        self._payload_size = meter.create_histogram(
+            f"{_METER_NAME}.payload.size", "By", "Size of the written payloads.",
+            explicit_bucket_boundaries_advisory=_SIZE_BOUNDARIES,
+        )
+        self._items_counter = meter.create_counter(f"{_METER_NAME}.items", "{item}", "Items written.")
+        self._dropped_counter = meter.create_counter(f"{_METER_NAME}.dropped", "{item}", "Items dropped.")
+        self._failures_counter = meter.create_counter(f"{_METER_NAME}.failures", "{export}", "Failed exports.")
+        meter.create_observable_gauge(
+            f"{_METER_NAME}.queue.depth",
+            [self._observe_queue_depth],
+            "{payload}",
+            "Payloads queued by the writers.",
+        )
+
+    def _observe_queue_depth(self, options: CallbackOptions) -> typing.Iterable[Observation]:
+        yield Observation(self.queue_depth, self._attributes)
+
+    def add_queue(self, depth: typing.Callable[[], int]) -> None:
+        """
+        Adds a queue whose depth is reported, e.g. lambda: writer.queue_depth
+        for a BatchingWriter.
+        """
+        with self._lock:
+            self._queues.append(depth)
+
+    @property
+    def queue_depth(self) -> int:
+        with self._lock:
+            queues = list(self._queues)
+        return sum(depth() for depth in queues)
+
+    def record_encode(self, seconds: float) -> None:
+        with self._lock:
+            self._encode.record(seconds)
+        if self._metered:
+            self._encode_duration.record(seconds, self._attributes)
+
+    def record_serialize(self, seconds: float) -> None:
+        with self._lock:
+            self._serialize.record(seconds)
+        if self._metered:
+            self._serialize_duration.record(seconds, self._attributes)
+
+    def record_write(self, seconds: float, size_bytes: int, items: int) -> None:
+        with self._lock:
+            self._write.record(seconds)
+            self._payload_bytes.record(size_bytes)
+            self.exported_payloads += 1
+            self.exported_items += items
+        if self._metered:
+            self._write_duration.record(seconds, self._attributes)
+            self._payload_size.record(size_bytes, self._attributes)
+            self._items_counter.add(items, self._attributes)
+
+    def record_dropped(self, items: int) -> None:
+        if not items:
+            return
+        with self._lock:
+            self.dropped_items += items
+        if self._metered:
+            self._dropped_counter.add(items, self._attributes)
+
+    def record_failure(self, exception: BaseException) -> None:
+        error_type = type(exception).__qualname__
+        with self._lock:
+            self.failures[error_type] += 1
+        if self._metered:
+            self._failures_counter.add(1, {**self._attributes, "error.type": error_type})
+
+    def snapshot(self) -> typing.Dict[str, typing.Any]:
+        """Returns the values recorded so far."""
+        queue_depth = self.queue_depth
+        with self._lock:
+            return {
+                "encode_seconds": self._encode.snapshot(),
+                "serialize_seconds": self._serialize.snapshot(),
+                "write_seconds": self._write.snapshot(),
+                "payload_bytes": self._payload_bytes.snapshot(),
+                "exported_payloads": self.exported_payloads,
+                "exported_items": self.exported_items,
+                "dropped_items": self.dropped_items,
+                "failures": dict(self.failures),
+                "queue_depth": queue_depth,
+            }
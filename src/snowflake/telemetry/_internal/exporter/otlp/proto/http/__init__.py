@@ -0,0 +1,26 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+"""
+This module sends serialized protobuf messages to OTLP/HTTP endpoints. The
+only classes that should be accessed outside of this module are:
+
+- OTLPHTTPWriter
+- OTLPHTTPReceiver
+
+Please see the class documentation for those classes to learn more.
+"""
+
+from snowflake.telemetry._internal.exporter.otlp.proto.http._receiver import (
+    OTLPHTTPReceiver,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.http._writer import (
+    OTLPHTTPWriter,
+)
+
+
+__all__ = [
+    "OTLPHTTPReceiver",
+    "OTLPHTTPWriter",
+]
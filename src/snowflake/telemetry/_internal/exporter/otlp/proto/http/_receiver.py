@@ -0,0 +1,136 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+import gzip
+import logging
+import threading
+import typing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from snowflake.telemetry._internal.exporter.otlp.proto.http._writer import (
+    LOGS_PATH,
+    METRICS_PATH,
+    TRACES_PATH,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.logs import LogWriter
+from snowflake.telemetry._internal.exporter.otlp.proto.metrics import MetricWriter
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import SpanWriter
+
+_logger = logging.getLogger(__name__)
+
+_WRITE_METHODS = {
+    TRACES_PATH: "write_span",
+    METRICS_PATH: "write_metrics",
+    LOGS_PATH: "write_logs",
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep-alive, like a real collector.
+    protocol_version = "HTTP/1.1"
+    server: "_Server"
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        receiver = self.server.receiver
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        method = _WRITE_METHODS.get(self.path)
+        if method is None:
+            self._respond(404)
+            return
+        status = receiver.next_status()
+        if status != 200:
+            self._respond(status)
+            return
+        try:
+            if self.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            receiver.received(self.path, body)
+            if receiver.writer is not None:
+                getattr(receiver.writer, method)(body)
+        # pylint: disable=broad-exception-caught
+        except Exception:
+            _logger.exception("Exception while handling OTLP request.")
+            self._respond(500)
+            return
+        self._respond(200)
+
+    def _respond(self, status: int) -> None:
+        # An empty body is a valid Export*ServiceResponse.
+        self.send_response(status)
+        self.send_header("Content-Type", "application/x-protobuf")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    receiver: "OTLPHTTPReceiver"
+
+
+class OTLPHTTPReceiver:
+    """
+    A minimal OTLP/HTTP protobuf receiver for local load tests and
+    benchmarks, e.g. of an OTLPHTTPWriter, without an external collector.
+
+    It accepts POST requests to /v1/traces, /v1/metrics and /v1/logs,
+    gzip compressed or not, counts them in requests and received_bytes
+    (uncompressed, by path) and passes the payloads to the writer you
+    provide, if any. Set fail_next to a list of HTTP status codes to answer
+    the next requests with them, e.g. to test retries.
+
+    The server listens on host and port (a free port if 0) in a background
+    thread between start() and shutdown(). Use endpoint as the endpoint of
+    the OTLPHTTPWriter.
+    """
+    def __init__(
+        self,
+        writer: typing.Optional[typing.Union[SpanWriter, MetricWriter, LogWriter]] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.writer = writer
+        self._server = _Server((host, port), _Handler)
+        self._server.receiver = self
+        self._thread: typing.Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.fail_next: typing.List[int] = []
+        self.requests: typing.Dict[str, int] = {}
+        self.received_bytes: typing.Dict[str, int] = {}
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "OTLPHTTPReceiver":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.shutdown()
+
+    def next_status(self) -> int:
+        with self._lock:
+            return self.fail_next.pop(0) if self.fail_next else 200
+
+    def received(self, path: str, body: bytes) -> None:
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+            self.received_bytes[path] = self.received_bytes.get(path, 0) + len(body)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            name="OTLPHTTPReceiver", target=self._server.serve_forever, daemon=True
+        )
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
@@ -0,0 +1,239 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+import gzip
+import http.client
+import logging
+import queue
+import random
+import ssl
+import threading
+import typing
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+from snowflake.telemetry._internal import fork
+from snowflake.telemetry._internal.exporter.otlp.proto.logs import LogWriter
+from snowflake.telemetry._internal.exporter.otlp.proto.metrics import MetricWriter
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import SpanWriter
+
+_logger = logging.getLogger(__name__)
+
+TRACES_PATH = "/v1/traces"
+METRICS_PATH = "/v1/metrics"
+LOGS_PATH = "/v1/logs"
+
+_RETRYABLE_STATUS = frozenset((429, 502, 503, 504))
+
+
+class _RetryableError(Exception):
+    def __init__(self, message: str, retry_after: typing.Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _ConnectionPool:
+    """Idle keep-alive connections to one host, most recently used first."""
+
+    def __init__(self, url: urllib.parse.SplitResult, timeout: float, ssl_context: typing.Optional[ssl.SSLContext]):
+        self._url = url
+        self._timeout = timeout
+        self._ssl_context = ssl_context
+        self._idle: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue()
+
+    def acquire(self, reuse: bool = True) -> typing.Tuple[http.client.HTTPConnection, bool]:
+        """Returns a connection and whether it was used before."""
+        if reuse:
+            try:
+                return self._idle.get_nowait(), True
+            except queue.Empty:
+                pass
+        if self._url.scheme == "https":
+            connection = http.client.HTTPSConnection(
+                self._url.hostname, self._url.port, timeout=self._timeout, context=self._ssl_context
+            )
+        else:
+            connection = http.client.HTTPConnection(self._url.hostname, self._url.port, timeout=self._timeout)
+        return connection, False
+
+    def release(self, connection: http.client.HTTPConnection) -> None:
+        self._idle.put(connection)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class OTLPHTTPWriter(SpanWriter, MetricWriter, LogWriter):
+    """
+    A SpanWriter, MetricWriter and LogWriter that sends serialized payloads
+    to an OTLP/HTTP endpoint, e.g. an OpenTelemetry collector.
+
+    TracesData, MetricsData and LogsData have the same encoding as the
+    Export*ServiceRequest messages, so the payloads are posted as they are
+    to endpoint + /v1/traces, /v1/metrics and /v1/logs, gzip compressed
+    unless compression is disabled.
+
+    Requests are sent on a pool of up to max_in_flight threads over
+    persistent keep-alive connections, and a write only blocks while
+    max_in_flight requests are in flight. Requests that fail with a
+    connection error or a 429, 502, 503 or 504 status are retried up to
+    max_retries times with full jitter exponential backoff, honoring
+    Retry-After. Payloads that could not be sent are counted in
+    failed_payloads.
+    """
+    def __init__(
+        self,
+        endpoint: str = "http://localhost:4318",
+        headers: typing.Optional[typing.Dict[str, str]] = None,
+        compression: bool = True,
+        timeout_millis: float = 10_000,
+        max_in_flight: int = 4,
+        max_retries: int = 5,
+        initial_backoff_millis: float = 100,
+        max_backoff_millis: float = 10_000,
+        ssl_context: typing.Optional[ssl.SSLContext] = None,
+    ):
+        if max_in_flight <= 0:
+            raise ValueError("max_in_flight must be a positive integer")
+        url = urllib.parse.urlsplit(endpoint)
+        if url.scheme not in ("http", "https"):
+            raise ValueError(f"unsupported endpoint {endpoint}")
+        self._base_path = url.path.rstrip("/")
+        self._headers = {"Content-Type": "application/x-protobuf"}
+        if compression:
+            self._headers["Content-Encoding"] = "gzip"
+        self._headers.update(headers or {})
+        self._compression = compression
+        self._max_retries = max_retries
+        self._initial_backoff = initial_backoff_millis / 1e3
+        self._max_backoff = max_backoff_millis / 1e3
+        self._url = url
+        self._timeout = timeout_millis / 1e3
+        self._ssl_context = ssl_context
+        self._max_in_flight = max_in_flight
+        self._pool = _ConnectionPool(url, self._timeout, ssl_context)
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._executor = ThreadPoolExecutor(max_in_flight, thread_name_prefix="OTLPHTTPWriter")
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._shutdown = threading.Event()
+        self.failed_payloads = 0
+        fork.register(self)
+
+    def _at_fork_reinit(self) -> None:
+        # The idle connections share their sockets with the parent, and the
+        # requests in flight are the parent's to finish.
+        self._pool = _ConnectionPool(self._url, self._timeout, self._ssl_context)
+        self._slots = threading.BoundedSemaphore(self._max_in_flight)
+        self._executor = ThreadPoolExecutor(self._max_in_flight, thread_name_prefix="OTLPHTTPWriter")
+        self._condition = threading.Condition()
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def write_span(self, serialized_spans: bytes) -> None:
+        self._submit(TRACES_PATH, serialized_spans)
+
+    def write_metrics(self, serialized_metrics: bytes) -> None:
+        self._submit(METRICS_PATH, serialized_metrics)
+
+    def write_logs(self, serialized_logs: bytes) -> None:
+        self._submit(LOGS_PATH, serialized_logs)
+
+    def _submit(self, path: str, payload: bytes) -> None:
+        if self._shutdown.is_set():
+            raise ValueError("OTLPHTTPWriter is shut down")
+        self._slots.acquire()
+        with self._condition:
+            self._in_flight += 1
+        try:
+            self._executor.submit(self._send, self._base_path + path, payload)
+        except BaseException:
+            self._done()
+            raise
+
+    def _done(self) -> None:
+        self._slots.release()
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def _send(self, path: str, payload: bytes) -> None:
+        try:
+            body = gzip.compress(payload, compresslevel=6) if self._compression else payload
+            attempt = 0
+            while True:
+                try:
+                    self._post(path, body)
+                    return
+                except _RetryableError as error:
+                    if attempt >= self._max_retries or self._shutdown.is_set():
+                        raise
+                    backoff = random.uniform(0, min(self._max_backoff, self._initial_backoff * 2 ** attempt))
+                    if error.retry_after is not None:
+                        backoff = max(backoff, error.retry_after)
+                    _logger.debug("Retrying OTLP request in %.2fs: %s", backoff, error)
+                    attempt += 1
+                    if self._shutdown.wait(backoff):
+                        raise
+        # pylint: disable=broad-exception-caught
+        except Exception:
+            _logger.exception("Exception while sending serialized payload to %s.", path)
+            with self._condition:
+                self.failed_payloads += 1
+        finally:
+            self._done()
+
+    def _post(self, path: str, body: bytes) -> None:
+        reuse = True
+        while True:
+            connection, reused = self._pool.acquire(reuse)
+            try:
+                connection.request("POST", path, body, self._headers)
+                response = connection.getresponse()
+                # The response must be read fully to reuse the connection.
+                response.read()
+                break
+            except (OSError, http.client.HTTPException) as error:
+                connection.close()
+                if reused and isinstance(
+                    error, (ConnectionError, http.client.RemoteDisconnected)
+                ):
+                    # The server closed an idle keep-alive connection, try
+                    # again right away on a new one.
+                    reuse = False
+                    continue
+                raise _RetryableError(repr(error)) from error
+        if response.will_close:
+            connection.close()
+        else:
+            self._pool.release(connection)
+        if 200 <= response.status < 300:
+            return
+        message = f"{response.status} {response.reason}"
+        if response.status in _RETRYABLE_STATUS:
+            retry_after = response.getheader("Retry-After")
+            raise _RetryableError(
+                message, float(retry_after) if retry_after and retry_after.isdigit() else None
+            )
+        raise IOError(message)
+
+    def force_flush(self, timeout_millis: float = 30_000) -> bool:
+        with self._condition:
+            return self._condition.wait_for(lambda: self._in_flight == 0, timeout_millis / 1e3)
+
+    def shutdown(self, timeout_millis: float = 30_000) -> None:
+        if self._shutdown.is_set():
+            return
+        self.force_flush(timeout_millis)
+        # Requests waiting for a retry fail right away.
+        self._shutdown.set()
+        self._executor.shutdown(wait=False)
+        self._pool.close()
@@ -0,0 +1,191 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+"""
+This module allows the user to write logs serialized as protobuf messages to
+the preferred location by implementing the write_logs() abstract method. The
+only classes that should be accessed outside of this module are:
+
+- LogWriter
+- AsyncLogWriter
+- ProtoLogExporter
+- AdaptiveBatchLogRecordProcessor
+
+Please see the class documentation for those classes to learn more.
+"""
+
+import abc
+import time
+import typing
+
+from snowflake.telemetry._internal.exporter.otlp.proto._memory_pressure import (
+    MemoryPressure,
+    MemoryPressureMonitor,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto._stats import ExporterStats
+from snowflake.telemetry._internal.opentelemetry.exporter.otlp.proto.common._log_encoder import (
+    encode_logs,
+)
+from snowflake.telemetry._internal.opentelemetry.proto.logs.v1.logs_marshaler import LogsData
+from opentelemetry.sdk._logs import LogData
+from opentelemetry.sdk._logs.export import (
+    LogExportResult,
+    LogExporter,
+)
+
+
+# pylint: disable=too-few-public-methods
+class LogWriter(abc.ABC):
+    """
+    LogWriter abstract base class with one abstract method that must be
+    implemented by the user.
+    """
+    @abc.abstractmethod
+    def write_logs(self, serialized_logs: bytes) -> None:
+        """
+        Implement this method to write the serialized protobuf message to your
+        preferred location. For an example implementation, see
+        InMemoryLogWriter in the tests folder.
+        """
+
+    def force_flush(self, timeout_millis: float = 30_000) -> bool:
+        """
+        Override this method if your writer buffers data, to write everything
+        that is buffered within the given timeout. Returns False if the
+        timeout expired.
+        """
+        return True
+
+    def shutdown(self, timeout_millis: float = 30_000) -> None:
+        """
+        Override this method to release the resources held by your writer.
+        """
+
+
+class AsyncLogWriter(abc.ABC):
+    """
+    AsyncLogWriter abstract base class with one abstract coroutine method that
+    must be implemented by the user. Wrap it in an AsyncWriterAdapter to use
+    it with an exporter; the adapter runs the coroutines on a dedicated event
+    loop thread.
+    """
+    @abc.abstractmethod
+    async def write_logs(self, serialized_logs: bytes) -> None:
+        """
+        Implement this coroutine to write the serialized protobuf message to
+        your preferred location. Writes may run concurrently, up to the
+        max_in_flight limit of the AsyncWriterAdapter.
+        """
+
+    async def force_flush(self) -> None:
+        """
+        Override this coroutine if your writer buffers data, to write
+        everything that is buffered.
+        """
+
+    async def shutdown(self) -> None:
+        """
+        Override this coroutine to release the resources held by your writer.
+        """
+
+
+class ProtoLogExporter(LogExporter):
+    """
+    Implementation of the LogExporter interface for exporting logs, e.g. with
+    a BatchLogRecordProcessor.
+
+    This implementation writes serialized
+    opentelemetry.proto.logs.v1.logs_pb2.LogsData protobuf messages
+    according to the implementation you provide to the LogWriter abstract base
+    class above.
+
+    If a memory_monitor is given, low severity log records are dropped and
+    the attributes and bodies of the others truncated under memory pressure,
+    and the writer is flushed after every batch, see MemoryPressureMonitor.
+
+    If stats are given, the exporter records its latencies, payload sizes,
+    failures and drops in them, see ExporterStats.
+    """
+    def __init__(
+        self,
+        log_writer: LogWriter,
+        memory_monitor: typing.Optional[MemoryPressureMonitor] = None,
+        stats: typing.Optional[ExporterStats] = None,
+    ):
+        super().__init__()
+        self.log_writer = log_writer
+        self._memory_monitor = memory_monitor
+        self.stats = stats
+
+    def export(
+        self, batch: typing.Sequence[LogData]
+    ) -> "LogExportResult":
+        try:
+            level = MemoryPressure.NORMAL
+            if self._memory_monitor is not None:
+                level = self._memory_monitor.level()
+                degraded = self._memory_monitor.degrade_logs(batch, level)
+                if self.stats is not None:
+                    self.stats.record_dropped(len(batch) - len(degraded))
+                batch = degraded
+            if batch or level is MemoryPressure.NORMAL:
+                self._write(self._serialize(batch), len(batch))
+            if level is not MemoryPressure.NORMAL:
+                self._memory_monitor.flush_early(self.log_writer)
+            return LogExportResult.SUCCESS
+        except Exception as exception:
+            if self.stats is not None:
+                self.stats.record_failure(exception)
+            return LogExportResult.FAILURE
+
+    def _write(self, payload: bytes, log_records: int) -> None:
+        if self.stats is None:
+            self.log_writer.write_logs(payload)
+            return
+        start = time.perf_counter()
+        self.log_writer.write_logs(payload)
+        self.stats.record_write(time.perf_counter() - start, len(payload), log_records)
+
+    def _serialize(self, batch: typing.Sequence[LogData]) -> bytes:
+        if self.stats is None:
+            return ProtoLogExporter._serialize_logs_data(batch)
+        start = time.perf_counter()
+        logs_data = LogsData(
+            resource_logs=encode_logs(batch).resource_logs # pylint: disable=no-member
+        )
+        encoded = time.perf_counter()
+        payload = logs_data.SerializeToString()
+        self.stats.record_encode(encoded - start)
+        self.stats.record_serialize(time.perf_counter() - encoded)
+        return payload
+
+    @staticmethod
+    def _serialize_logs_data(
+        batch: typing.Sequence[LogData],
+    ) -> bytes:
+        # pylint gets confused by protobuf-generated code, that's why we must
+        # disable the no-member check below.
+        return LogsData(
+            resource_logs=encode_logs(batch).resource_logs # pylint: disable=no-member
+        ).SerializeToString()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.log_writer.force_flush(timeout_millis)
+
+    def shutdown(self, timeout_millis: float = 30_000) -> None:
+        self.log_writer.shutdown(timeout_millis)
+
+
+# Imported last, the processor module refers to LogWriter.
+from snowflake.telemetry._internal.exporter.otlp.proto.logs._adaptive import (  # noqa: E402
+    AdaptiveBatchLogRecordProcessor,
+)
+
+
+__all__ = [
+    "LogWriter",
+    "AsyncLogWriter",
+    "ProtoLogExporter",
+    "AdaptiveBatchLogRecordProcessor",
+]
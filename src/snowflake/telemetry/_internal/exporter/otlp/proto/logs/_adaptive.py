@@ -0,0 +1,70 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+import time
+import typing
+
+from opentelemetry.sdk._logs import LogData, LogRecordProcessor
+from snowflake.telemetry._internal.exporter.otlp.proto._adaptive import (
+    AdaptiveBatchController,
+    _AdaptiveBatcher,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.logs import (
+    ProtoLogExporter,
+    LogWriter,
+)
+
+
+class AdaptiveBatchLogRecordProcessor(LogRecordProcessor):
+    """
+    Implementation of the LogRecordProcessor interface that batches log
+    records like the SDK's BatchLogRecordProcessor, but with a batch size
+    and a schedule delay chosen by an AdaptiveBatchController from the
+    measured encode and write latencies, and writes them as
+    opentelemetry.proto.logs.v1.logs_pb2.LogsData protobuf messages using
+    the LogWriter you provide.
+
+    Log records that arrive while max_queue_size log records are queued are
+    dropped and counted in dropped_logs.
+    """
+    def __init__(
+        self,
+        log_writer: LogWriter,
+        controller: typing.Optional[AdaptiveBatchController] = None,
+        max_queue_size: int = 16_384,
+    ):
+        self.log_writer = log_writer
+        self.controller = controller if controller is not None else AdaptiveBatchController()
+        self._batcher = _AdaptiveBatcher(
+            "AdaptiveBatchLogRecordProcessor", self._export, self.controller, max_queue_size
+        )
+
+    @property
+    def dropped_logs(self) -> int:
+        return self._batcher.dropped_items
+
+    def on_emit(self, log_data: LogData) -> None:
+        self._batcher.add(log_data)
+
+    def _export(self, batch: typing.List[LogData]) -> None:
+        start = time.perf_counter()
+        payload = ProtoLogExporter._serialize_logs_data(batch)  # pylint: disable=protected-access
+        encoded = time.perf_counter()
+        self.controller.record_encode(len(batch), encoded - start, len(payload))
+        self.log_writer.write_logs(payload)
+        # A BatchingWriter sharing the controller reports the latency of the
+        # actual write, this one only queued the payload.
+        if getattr(self.log_writer, "controller", None) is not self.controller:
+            self.controller.record_write(time.perf_counter() - encoded, len(payload))
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        deadline = time.monotonic() + timeout_millis / 1e3
+        if not self._batcher.flush(timeout_millis):
+            return False
+        return self.log_writer.force_flush(max(deadline - time.monotonic(), 0) * 1e3)
+
+    def shutdown(self, timeout_millis: float = 30_000) -> None:
+        deadline = time.monotonic() + timeout_millis / 1e3
+        self._batcher.shutdown(timeout_millis)
+        self.log_writer.shutdown(max(deadline - time.monotonic(), 0) * 1e3)
@@ -8,19 +8,39 @@ the preferred location by implementing the write_metrics() abstract method. The
 only classes that should be accessed outside of this module are:
 
 - MetricWriter
+- AsyncMetricWriter
 - ProtoMetricExporter
 
 Please see the class documentation for those classes to learn more.
 """
 
 import abc
-from typing import Dict
+import logging
+import time
+from concurrent.futures import Executor
+from typing import Dict, Optional
 
 import opentelemetry
+from snowflake.telemetry._internal.exporter.otlp.proto._deadline import (
+    Deadline,
+    DeadlineExceeded,
+    serialize_shards,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto._parallel import (
+    DEFAULT_SHARD_SIZE,
+    count_data_points,
+    metrics_shards,
+    serialize_metrics_parallel,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto._stats import ExporterStats
+from snowflake.telemetry._internal.exporter.otlp.proto.metrics._cardinality import (
+    CardinalityLimiter,
+)
 from snowflake.telemetry._internal.opentelemetry.exporter.otlp.proto.common.metrics_encoder import (
     encode_metrics,
 )
 from snowflake.telemetry._internal.opentelemetry.proto.metrics.v1.metrics_marshaler import MetricsData as PB2MetricsData
+from snowflake.telemetry._internal.serialize.wire import merge_otlp_data
 from opentelemetry.sdk.metrics.export import (
     AggregationTemporality,
     MetricExportResult,
@@ -28,6 +48,8 @@ from opentelemetry.sdk.metrics.export import (
     MetricsData,
 )
 
+_logger = logging.getLogger(__name__)
+
 
 # pylint: disable=too-few-public-methods
 class MetricWriter(abc.ABC):
@@ -43,6 +65,46 @@ class MetricWriter(abc.ABC):
         InMemoryMetricWriter in the tests folder.
         """
 
+    def force_flush(self, timeout_millis: float = 30_000) -> bool:
+        """
+        Override this method if your writer buffers data, to write everything
+        that is buffered within the given timeout. Returns False if the
+        timeout expired.
+        """
+        return True
+
+    def shutdown(self, timeout_millis: float = 30_000) -> None:
+        """
+        Override this method to release the resources held by your writer.
+        """
+
+
+class AsyncMetricWriter(abc.ABC):
+    """
+    AsyncMetricWriter abstract base class with one abstract coroutine method that
+    must be implemented by the user. Wrap it in an AsyncWriterAdapter to use
+    it with an exporter; the adapter runs the coroutines on a dedicated event
+    loop thread.
+    """
+    @abc.abstractmethod
+    async def write_metrics(self, serialized_metrics: bytes) -> None:
+        """
+        Implement this coroutine to write the serialized protobuf message to
+        your preferred location. Writes may run concurrently, up to the
+        max_in_flight limit of the AsyncWriterAdapter.
+        """
+
+    async def force_flush(self) -> None:
+        """
+        Override this coroutine if your writer buffers data, to write
+        everything that is buffered.
+        """
+
+    async def shutdown(self) -> None:
+        """
+        Override this coroutine to release the resources held by your writer.
+        """
+
 
 class ProtoMetricExporter(MetricExporter):
     """
@@ -52,6 +114,28 @@ class ProtoMetricExporter(MetricExporter):
     opentelemetry.proto.metrics.v1.metrics_pb2.MetricsData protobuf messages
     according to the implementation you provide to the MetricWriter abstract
     base class above.
+
+    If cardinality_limit is set, at most that many attribute sets are exported
+    per metric. The least recently seen attribute sets over the limit are
+    folded into a single series with the attribute otel.metric.overflow=true,
+    and the number of folded attribute sets is available as
+    overflow_count.
+
+    If an executor is given, metrics data with more than shard_size data
+    points is split into shards that are encoded in parallel on the executor.
+    Use a ProcessPoolExecutor on regular Python builds, or a
+    ThreadPoolExecutor on free-threaded Python builds.
+
+    Exports honor their timeout_millis: metrics data with more than
+    shard_size data points is encoded in shards of whole metrics, and
+    encoding stops once the timeout expires. Without an executor, the
+    resource and scope headers repeated by the shards are merged, which
+    yields the same payload as encoding the data in one piece. The shards
+    encoded in time are written as a partial payload, the other data points
+    are dropped and counted in dropped_data_points, and the export fails.
+
+    If stats are given, the exporter records its latencies, payload sizes,
+    failures and drops in them, see ExporterStats.
     """
     def __init__(
             self,
@@ -59,10 +143,33 @@ class ProtoMetricExporter(MetricExporter):
             preferred_temporality: Dict[type, AggregationTemporality] = None,
             preferred_aggregation: Dict[
                 type, "opentelemetry.sdk.metrics.view.Aggregation"
-            ] = None
+            ] = None,
+            cardinality_limit: Optional[int] = None,
+            executor: Optional[Executor] = None,
+            shard_size: int = DEFAULT_SHARD_SIZE,
+            stats: Optional[ExporterStats] = None,
     ) -> None:
         super().__init__(preferred_temporality, preferred_aggregation)
         self.metric_writer = metric_writer
+        self._cardinality_limiter = (
+            CardinalityLimiter(cardinality_limit)
+            if cardinality_limit is not None
+            else None
+        )
+        self._executor = executor
+        self._shard_size = shard_size
+        self.dropped_data_points = 0
+        self.stats = stats
+
+    @property
+    def overflow_count(self) -> int:
+        """
+        The number of attribute sets folded into overflow series so far, see
+        CardinalityLimiter.
+        """
+        if self._cardinality_limiter is None:
+            return 0
+        return self._cardinality_limiter.overflow_count
 
     def export(
             self,
@@ -70,14 +177,80 @@ class ProtoMetricExporter(MetricExporter):
             timeout_millis: float = 10_000,
             **kwargs
     ) -> MetricExportResult:
+        deadline = Deadline(timeout_millis)
         try:
-            self.metric_writer.write_metrics(
-                ProtoMetricExporter._serialize_metrics_data(metrics_data)
-            )
+            if self._cardinality_limiter is not None:
+                metrics_data = self._cardinality_limiter.apply(metrics_data)
+            data_points = count_data_points(metrics_data) if self.stats is not None else 0
+            try:
+                self._write(self._serialize(metrics_data, deadline), data_points)
+            except DeadlineExceeded as exceeded:
+                _logger.warning("Export timed out, dropping %d data points.", exceeded.dropped)
+                self.dropped_data_points += exceeded.dropped
+                if self.stats is not None:
+                    self.stats.record_failure(exceeded)
+                    self.stats.record_dropped(exceeded.dropped)
+                if exceeded.payload:
+                    self._write(exceeded.payload, data_points - exceeded.dropped)
+                return MetricExportResult.FAILURE
             return MetricExportResult.SUCCESS
-        except Exception:
+        except Exception as exception:
+            if self.stats is not None:
+                self.stats.record_failure(exception)
             return MetricExportResult.FAILURE
 
+    def _write(self, payload: bytes, data_points: int) -> None:
+        if self.stats is None:
+            self.metric_writer.write_metrics(payload)
+            return
+        start = time.perf_counter()
+        self.metric_writer.write_metrics(payload)
+        self.stats.record_write(time.perf_counter() - start, len(payload), data_points)
+
+    def _serialize(self, data: MetricsData, deadline: Optional[Deadline] = None) -> bytes:
+        start = time.perf_counter()
+        payload = self._serialize_shards(data, deadline)
+        if payload is not None:
+            if self.stats is not None:
+                self.stats.record_encode(time.perf_counter() - start)
+            return payload
+        if self.stats is None:
+            return ProtoMetricExporter._serialize_metrics_data(data)
+        pb2_data = PB2MetricsData(
+            resource_metrics=encode_metrics(data).resource_metrics # pylint: disable=no-member
+        )
+        encoded = time.perf_counter()
+        payload = pb2_data.SerializeToString()
+        self.stats.record_encode(encoded - start)
+        self.stats.record_serialize(time.perf_counter() - encoded)
+        return payload
+
+    def _serialize_shards(self, data: MetricsData, deadline: Optional[Deadline]) -> Optional[bytes]:
+        """
+        Serializes metrics data that is encoded in shards, and returns None
+        for the other.
+        """
+        if self._executor is not None:
+            return serialize_metrics_parallel(
+                self._executor, data, self._shard_size, deadline
+            )
+        if deadline is not None and deadline.bounded:
+            if deadline.expired():
+                raise DeadlineExceeded(b"", count_data_points(data))
+            shards = metrics_shards(data, self._shard_size)
+            if len(shards) > 1:
+                # Every shard repeats its resource and scope headers, which
+                # are merged again, like the CoalescingWriter does, so that
+                # the payload is the same as data encoded in one piece.
+                try:
+                    payload = serialize_shards(
+                        shards, ProtoMetricExporter._serialize_metrics_data, count_data_points, deadline
+                    )
+                except DeadlineExceeded as exceeded:
+                    raise DeadlineExceeded(merge_otlp_data([exceeded.payload]), exceeded.dropped) from None
+                return merge_otlp_data([payload])
+        return None
+
     @staticmethod
     def _serialize_metrics_data(data: MetricsData) -> bytes:
         # pylint gets confused by protobuf-generated code, that's why we must
@@ -87,13 +260,14 @@ class ProtoMetricExporter(MetricExporter):
         ).SerializeToString()
 
     def force_flush(self, timeout_millis: float = 10_000) -> bool:
-        return True
+        return self.metric_writer.force_flush(timeout_millis)
 
     def shutdown(self, timeout_millis: float = 30_000, **kwargs) -> None:
-        pass
+        self.metric_writer.shutdown(timeout_millis)
 
 
 __all__ = [
     "MetricWriter",
+    "AsyncMetricWriter",
     "ProtoMetricExporter",
 ]
@@ -0,0 +1,297 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+"""
+Attribute cardinality limiting for ProtoMetricExporter.
+
+Every distinct attribute set of a metric becomes its own data point in the
+exported payload, so a high cardinality attribute (e.g. a row id) makes both
+encoding time and payload size grow without bound. The CardinalityLimiter
+keeps the most recently seen attribute sets of every metric and folds all the
+others into a single overflow data point carrying the attribute
+otel.metric.overflow=true, as described by the OpenTelemetry specification.
+"""
+
+import dataclasses
+import logging
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Hashable, List, Sequence, Tuple
+
+from opentelemetry.sdk.metrics.export import (
+    Buckets,
+    ExponentialHistogram,
+    ExponentialHistogramDataPoint,
+    Gauge,
+    Histogram,
+    HistogramDataPoint,
+    Metric,
+    MetricsData,
+    NumberDataPoint,
+    Sum,
+)
+
+_logger = logging.getLogger(__name__)
+
+OVERFLOW_ATTRIBUTE_KEY = "otel.metric.overflow"
+_OVERFLOW_ATTRIBUTES = {OVERFLOW_ATTRIBUTE_KEY: True}
+_OVERFLOW_KEY = frozenset(_OVERFLOW_ATTRIBUTES.items())
+
+
+def _attributes_key(attributes) -> Hashable:
+    if not attributes:
+        return frozenset()
+    try:
+        return frozenset(attributes.items())
+    except TypeError:
+        # Unhashable attribute values, e.g. lists that have not been cleaned
+        # up by BoundedAttributes.
+        return frozenset((k, repr(v)) for k, v in attributes.items())
+
+
+class CardinalityLimiter:
+    """
+    Limits the number of attribute sets exported per metric.
+
+    The limit includes the overflow series, i.e. at most limit - 1 regular
+    attribute sets are exported for a metric, and all other data points are
+    merged into one data point with the attributes otel.metric.overflow=true.
+
+    Recency is tracked across exports: attribute sets that were exported
+    before keep their slot as long as they keep reporting, and new attribute
+    sets only take free slots. Attribute sets that stop reporting age out and
+    free their slot for new ones.
+
+    overflow_count counts the attribute sets that were folded: an attribute
+    set folded in consecutive exports, as with cumulative temporality, is
+    counted once, one that stops reporting and is folded again later is
+    counted again. Histogram data points whose bucket boundaries differ from
+    those of the overflow series are exported unmerged instead.
+    """
+
+    def __init__(self, limit: int):
+        if limit < 1:
+            raise ValueError("cardinality limit must be a positive integer")
+        self._limit = limit
+        self._recent: Dict[Tuple, "OrderedDict[Hashable, None]"] = {}
+        # The attribute sets of every metric folded by the last export.
+        self._folded: Dict[Tuple, FrozenSet[Hashable]] = {}
+        self._overflowed_metrics = set()
+        self._mismatched_metrics = set()
+        self.overflow_count = 0
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    def apply(self, data: MetricsData) -> MetricsData:
+        """
+        Returns the given metrics data with the attribute sets over the limit
+        folded into overflow data points. The input is returned unchanged if
+        no metric exceeds the limit.
+        """
+        changed = False
+        resource_metrics = []
+        for sdk_resource_metrics in data.resource_metrics:
+            scope_metrics = []
+            for sdk_scope_metrics in sdk_resource_metrics.scope_metrics:
+                metrics = []
+                for metric in sdk_scope_metrics.metrics:
+                    limited = self._limit_metric(
+                        (sdk_resource_metrics.resource, sdk_scope_metrics.scope, metric.name),
+                        metric,
+                    )
+                    changed = changed or limited is not metric
+                    metrics.append(limited)
+                scope_metrics.append(
+                    dataclasses.replace(sdk_scope_metrics, metrics=metrics)
+                )
+            resource_metrics.append(
+                dataclasses.replace(sdk_resource_metrics, scope_metrics=scope_metrics)
+            )
+        if not changed:
+            return data
+        return MetricsData(resource_metrics=resource_metrics)
+
+    def _limit_metric(self, metric_key: Tuple, metric: Metric) -> Metric:
+        metric_data = metric.data
+        if not isinstance(metric_data, (Sum, Gauge, Histogram, ExponentialHistogram)):
+            return metric
+        data_points = metric_data.data_points
+        keys = [_attributes_key(point.attributes) for point in data_points]
+
+        recent = self._recent.get(metric_key)
+        if recent is None:
+            recent = self._recent[metric_key] = OrderedDict()
+
+        # All attribute sets of one export are equally recent. Ties are broken
+        # in favor of attribute sets that were already known, so that a burst
+        # of new attribute sets cannot evict the established ones.
+        known = set()
+        for key in keys:
+            if key in recent:
+                known.add(key)
+            elif key != _OVERFLOW_KEY:
+                recent[key] = None
+        if known:
+            for key in [key for key in recent if key in known]:
+                recent.move_to_end(key)
+        while len(recent) > self._limit - 1:
+            recent.popitem(last=False)
+
+        if all(key in recent for key in keys):
+            self._folded.pop(metric_key, None)
+            return metric
+
+        kept = []
+        folded = []
+        for key, point in zip(keys, data_points):
+            if key in recent:
+                kept.append(point)
+            else:
+                folded.append((key, point))
+        if isinstance(metric_data, Histogram):
+            folded = self._split_mismatched_histograms(metric.name, folded, kept)
+        # An overflow series produced upstream (e.g. by the SDK's own limit)
+        # is merged as well, but is not an attribute set of its own.
+        self._report_overflow(
+            metric_key, metric.name, frozenset(key for key, _ in folded if key != _OVERFLOW_KEY)
+        )
+
+        merge = _MERGE_FUNCTIONS[type(metric_data)]
+        kept.append(merge([point for _, point in folded]))
+        return dataclasses.replace(
+            metric, data=dataclasses.replace(metric_data, data_points=kept)
+        )
+
+    def _split_mismatched_histograms(
+        self, metric_name: str, folded: List[Tuple[Hashable, HistogramDataPoint]], kept: List
+    ) -> List[Tuple[Hashable, HistogramDataPoint]]:
+        """
+        Returns the folded histogram data points with the bucket boundaries
+        of the first one, and moves the others to kept.
+        """
+        explicit_bounds = list(folded[0][1].explicit_bounds)
+        mergeable = []
+        for key, point in folded:
+            if list(point.explicit_bounds) == explicit_bounds:
+                mergeable.append((key, point))
+            else:
+                kept.append(point)
+        if len(mergeable) < len(folded) and metric_name not in self._mismatched_metrics:
+            self._mismatched_metrics.add(metric_name)
+            _logger.warning(
+                "Metric %s has histogram data points with different bucket "
+                "boundaries, %d of them were exported without being folded",
+                metric_name,
+                len(folded) - len(mergeable),
+            )
+        return mergeable
+
+    def _report_overflow(self, metric_key: Tuple, metric_name: str, keys: FrozenSet[Hashable]) -> None:
+        count = len(keys - self._folded.get(metric_key, frozenset()))
+        self._folded[metric_key] = keys
+        self.overflow_count += count
+        if metric_name not in self._overflowed_metrics:
+            self._overflowed_metrics.add(metric_name)
+            _logger.warning(
+                "Metric %s exceeded the cardinality limit of %d, %d attribute "
+                "sets were folded into the %s series",
+                metric_name,
+                self._limit,
+                count,
+                OVERFLOW_ATTRIBUTE_KEY,
+            )
+
+
+def _merge_sum(points: Sequence[NumberDataPoint]) -> NumberDataPoint:
+    return NumberDataPoint(
+        attributes=_OVERFLOW_ATTRIBUTES,
+        start_time_unix_nano=min(p.start_time_unix_nano for p in points),
+        time_unix_nano=max(p.time_unix_nano for p in points),
+        value=sum(p.value for p in points),
+    )
+
+
+def _merge_gauge(points: Sequence[NumberDataPoint]) -> NumberDataPoint:
+    # A gauge reports the last observed value, the sum is meaningless.
+    latest = max(points, key=lambda p: p.time_unix_nano)
+    return NumberDataPoint(
+        attributes=_OVERFLOW_ATTRIBUTES,
+        start_time_unix_nano=latest.start_time_unix_nano,
+        time_unix_nano=latest.time_unix_nano,
+        value=latest.value,
+    )
+
+
+def _merge_histogram(points: Sequence[HistogramDataPoint]) -> HistogramDataPoint:
+    # The points share their bucket boundaries, see _split_mismatched_histograms.
+    explicit_bounds = points[0].explicit_bounds
+    bucket_counts = [0] * len(points[0].bucket_counts)
+    for point in points:
+        for i, count in enumerate(point.bucket_counts):
+            bucket_counts[i] += count
+    return HistogramDataPoint(
+        attributes=_OVERFLOW_ATTRIBUTES,
+        start_time_unix_nano=min(p.start_time_unix_nano for p in points),
+        time_unix_nano=max(p.time_unix_nano for p in points),
+        count=sum(p.count for p in points),
+        sum=sum(p.sum for p in points),
+        bucket_counts=bucket_counts,
+        explicit_bounds=explicit_bounds,
+        min=min(p.min for p in points),
+        max=max(p.max for p in points),
+    )
+
+
+def _merge_buckets(buckets: Sequence[Tuple[Buckets, int]], scale: int) -> Buckets:
+    merged: Dict[int, int] = {}
+    for bucket, bucket_scale in buckets:
+        shift = bucket_scale - scale
+        for i, count in enumerate(bucket.bucket_counts):
+            if count:
+                index = (bucket.offset + i) >> shift
+                merged[index] = merged.get(index, 0) + count
+    if not merged:
+        return Buckets(offset=0, bucket_counts=[])
+    offset = min(merged)
+    bucket_counts: List[int] = [0] * (max(merged) - offset + 1)
+    for index, count in merged.items():
+        bucket_counts[index - offset] = count
+    return Buckets(offset=offset, bucket_counts=bucket_counts)
+
+
+def _merge_exponential_histogram(
+    points: Sequence[ExponentialHistogramDataPoint],
+) -> ExponentialHistogramDataPoint:
+    # Points with a finer scale are downscaled to the coarsest scale, which
+    # maps bucket index i at scale s to index i >> (s - scale).
+    scale = min(p.scale for p in points)
+    return ExponentialHistogramDataPoint(
+        attributes=_OVERFLOW_ATTRIBUTES,
+        start_time_unix_nano=min(p.start_time_unix_nano for p in points),
+        time_unix_nano=max(p.time_unix_nano for p in points),
+        count=sum(p.count for p in points),
+        sum=sum(p.sum for p in points),
+        scale=scale,
+        zero_count=sum(p.zero_count for p in points),
+        positive=_merge_buckets([(p.positive, p.scale) for p in points], scale),
+        negative=_merge_buckets([(p.negative, p.scale) for p in points], scale),
+        flags=0,
+        min=min(p.min for p in points),
+        max=max(p.max for p in points),
+    )
+
+
+_MERGE_FUNCTIONS = {
+    Sum: _merge_sum,
+    Gauge: _merge_gauge,
+    Histogram: _merge_histogram,
+    ExponentialHistogram: _merge_exponential_histogram,
+}
+
+
+__all__ = [
+    "CardinalityLimiter",
+    "OVERFLOW_ATTRIBUTE_KEY",
+]
@@ -8,14 +8,35 @@ the preferred location by implementing the write_span() abstract method. The
 only classes that should be accessed outside of this module are:
 
 - SpanWriter
+- AsyncSpanWriter
 - ProtoSpanExporter
+- EagerEncodingSpanProcessor
+- AdaptiveBatchSpanProcessor
 
 Please see the class documentation for those classes to learn more.
 """
 
 import abc
+import logging
+import time
 import typing
+from concurrent.futures import Executor
 
+from snowflake.telemetry._internal.exporter.otlp.proto._deadline import (
+    Deadline,
+    DeadlineExceeded,
+    serialize_shards,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto._memory_pressure import (
+    MemoryPressure,
+    MemoryPressureMonitor,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto._parallel import (
+    DEFAULT_SHARD_SIZE,
+    serialize_spans_parallel,
+    span_shards,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto._stats import ExporterStats
 from snowflake.telemetry._internal.opentelemetry.exporter.otlp.proto.common.trace_encoder import (
     encode_spans,
 )
@@ -26,6 +47,8 @@ from opentelemetry.sdk.trace.export import (
     SpanExporter,
 )
 
+_logger = logging.getLogger(__name__)
+
 
 # pylint: disable=too-few-public-methods
 class SpanWriter(abc.ABC):
@@ -41,6 +64,46 @@ class SpanWriter(abc.ABC):
         InMemorySpanWriter in the tests folder.
         """
 
+    def force_flush(self, timeout_millis: float = 30_000) -> bool:
+        """
+        Override this method if your writer buffers data, to write everything
+        that is buffered within the given timeout. Returns False if the
+        timeout expired.
+        """
+        return True
+
+    def shutdown(self, timeout_millis: float = 30_000) -> None:
+        """
+        Override this method to release the resources held by your writer.
+        """
+
+
+class AsyncSpanWriter(abc.ABC):
+    """
+    AsyncSpanWriter abstract base class with one abstract coroutine method that
+    must be implemented by the user. Wrap it in an AsyncWriterAdapter to use
+    it with an exporter; the adapter runs the coroutines on a dedicated event
+    loop thread.
+    """
+    @abc.abstractmethod
+    async def write_span(self, serialized_spans: bytes) -> None:
+        """
+        Implement this coroutine to write the serialized protobuf message to
+        your preferred location. Writes may run concurrently, up to the
+        max_in_flight limit of the AsyncWriterAdapter.
+        """
+
+    async def force_flush(self) -> None:
+        """
+        Override this coroutine if your writer buffers data, to write
+        everything that is buffered.
+        """
+
+    async def shutdown(self) -> None:
+        """
+        Override this coroutine to release the resources held by your writer.
+        """
+
 
 class ProtoSpanExporter(SpanExporter):
     """
@@ -50,22 +113,131 @@ class ProtoSpanExporter(SpanExporter):
     opentelemetry.proto.trace.v1.trace_pb2.TracesData protobuf messages
     according to the implementation you provide to the SpanWriter abstract base
     class above.
+
+    If an executor is given, batches larger than shard_size spans are split
+    into shards that are encoded in parallel on the executor. Use a
+    ProcessPoolExecutor on regular Python builds, or a ThreadPoolExecutor on
+    free-threaded Python builds.
+
+    If group_similar_spans is set, the spans of a batch are ordered by trace
+    id and name before they are encoded, which places similar spans next to
+    each other and improves the compression ratio of the payload.
+
+    If a memory_monitor is given, spans are sampled and their attributes
+    truncated under memory pressure, and the writer is flushed after every
+    batch, see MemoryPressureMonitor.
+
+    If export_timeout_millis is set, batches larger than shard_size spans
+    are encoded in shards, and encoding stops once the timeout expires. The
+    shards encoded in time are written as a partial payload, the other spans
+    are dropped and counted in dropped_spans, and the export fails.
+
+    If stats are given, the exporter records its latencies, payload sizes,
+    failures and drops in them, see ExporterStats.
     """
-    def __init__(self, span_writer: SpanWriter):
+    def __init__(
+        self,
+        span_writer: SpanWriter,
+        executor: typing.Optional[Executor] = None,
+        shard_size: int = DEFAULT_SHARD_SIZE,
+        group_similar_spans: bool = False,
+        memory_monitor: typing.Optional[MemoryPressureMonitor] = None,
+        export_timeout_millis: typing.Optional[float] = None,
+        stats: typing.Optional[ExporterStats] = None,
+    ):
         super().__init__()
         self.span_writer = span_writer
+        self._memory_monitor = memory_monitor
+        self._executor = executor
+        self._shard_size = shard_size
+        self._group_similar_spans = group_similar_spans
+        self._export_timeout_millis = export_timeout_millis
+        self.dropped_spans = 0
+        self.stats = stats
 
     def export(
         self, spans: typing.Sequence[ReadableSpan]
     ) -> "SpanExportResult":
+        deadline = Deadline(self._export_timeout_millis)
         try:
-            self.span_writer.write_span(
-                ProtoSpanExporter._serialize_traces_data(spans)
-            )
-            return SpanExportResult.SUCCESS
-        except Exception:
+            level = MemoryPressure.NORMAL
+            if self._memory_monitor is not None:
+                level = self._memory_monitor.level()
+                degraded = self._memory_monitor.degrade_spans(spans, level)
+                if self.stats is not None:
+                    self.stats.record_dropped(len(spans) - len(degraded))
+                spans = degraded
+            result = SpanExportResult.SUCCESS
+            if spans or level is MemoryPressure.NORMAL:
+                try:
+                    self._write(self._serialize(spans, deadline), len(spans))
+                except DeadlineExceeded as exceeded:
+                    _logger.warning(
+                        "Export timed out, dropping %d of %d spans.", exceeded.dropped, len(spans)
+                    )
+                    self.dropped_spans += exceeded.dropped
+                    if self.stats is not None:
+                        self.stats.record_failure(exceeded)
+                        self.stats.record_dropped(exceeded.dropped)
+                    if exceeded.payload:
+                        self._write(exceeded.payload, len(spans) - exceeded.dropped)
+                    result = SpanExportResult.FAILURE
+            if level is not MemoryPressure.NORMAL:
+                self._memory_monitor.flush_early(self.span_writer)
+            return result
+        except Exception as exception:
+            if self.stats is not None:
+                self.stats.record_failure(exception)
             return SpanExportResult.FAILURE
 
+    def _write(self, payload: bytes, spans: int) -> None:
+        if self.stats is None:
+            self.span_writer.write_span(payload)
+            return
+        start = time.perf_counter()
+        self.span_writer.write_span(payload)
+        self.stats.record_write(time.perf_counter() - start, len(payload), spans)
+
+    def _serialize(self, spans: typing.Sequence[ReadableSpan], deadline: typing.Optional[Deadline] = None) -> bytes:
+        if self._group_similar_spans:
+            spans = sorted(spans, key=lambda span: (span.context.trace_id, span.name))
+        start = time.perf_counter()
+        payload = self._serialize_shards(spans, deadline)
+        if payload is not None:
+            if self.stats is not None:
+                self.stats.record_encode(time.perf_counter() - start)
+            return payload
+        if self.stats is None:
+            return ProtoSpanExporter._serialize_traces_data(spans)
+        traces_data = TracesData(
+            resource_spans=encode_spans(spans).resource_spans # pylint: disable=no-member
+        )
+        encoded = time.perf_counter()
+        payload = traces_data.SerializeToString()
+        self.stats.record_encode(encoded - start)
+        self.stats.record_serialize(time.perf_counter() - encoded)
+        return payload
+
+    def _serialize_shards(
+        self, spans: typing.Sequence[ReadableSpan], deadline: typing.Optional[Deadline]
+    ) -> typing.Optional[bytes]:
+        """
+        Serializes batches that are encoded in shards, and returns None for
+        the others.
+        """
+        if self._executor is not None and len(spans) > self._shard_size:
+            return serialize_spans_parallel(
+                self._executor, spans, self._shard_size, deadline
+            )
+        if deadline is not None and deadline.bounded:
+            if deadline.expired():
+                raise DeadlineExceeded(b"", len(spans))
+            if len(spans) > self._shard_size:
+                return serialize_shards(
+                    span_shards(spans, self._shard_size), ProtoSpanExporter._serialize_traces_data, len, deadline
+                )
+        return None
+
     @staticmethod
     def _serialize_traces_data(
         sdk_spans: typing.Sequence[ReadableSpan],
@@ -76,11 +248,26 @@ class ProtoSpanExporter(SpanExporter):
             resource_spans=encode_spans(sdk_spans).resource_spans # pylint: disable=no-member
         ).SerializeToString()
 
-    def shutdown(self) -> None:
-        pass
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.span_writer.force_flush(timeout_millis)
+
+    def shutdown(self, timeout_millis: float = 30_000) -> None:
+        self.span_writer.shutdown(timeout_millis)
+
+
+# Imported last, the processor modules refer to SpanWriter.
+from snowflake.telemetry._internal.exporter.otlp.proto.traces._eager_encoding import (  # noqa: E402
+    EagerEncodingSpanProcessor,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.traces._adaptive import (  # noqa: E402
+    AdaptiveBatchSpanProcessor,
+)
 
 
 __all__ = [
     "SpanWriter",
+    "AsyncSpanWriter",
     "ProtoSpanExporter",
+    "EagerEncodingSpanProcessor",
+    "AdaptiveBatchSpanProcessor",
 ]
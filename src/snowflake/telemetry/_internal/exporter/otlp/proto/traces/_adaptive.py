@@ -0,0 +1,77 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+import time
+import typing
+
+from opentelemetry.context import Context
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor
+from snowflake.telemetry._internal.exporter.otlp.proto._adaptive import (
+    AdaptiveBatchController,
+    _AdaptiveBatcher,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import (
+    ProtoSpanExporter,
+    SpanWriter,
+)
+
+
+class AdaptiveBatchSpanProcessor(SpanProcessor):
+    """
+    Implementation of the SpanProcessor interface that batches spans like
+    the SDK's BatchSpanProcessor, but with a batch size and a schedule delay
+    chosen by an AdaptiveBatchController from the measured encode and write
+    latencies, and writes them as
+    opentelemetry.proto.trace.v1.trace_pb2.TracesData protobuf messages
+    using the SpanWriter you provide.
+
+    Spans that arrive while max_queue_size spans are queued are dropped and
+    counted in dropped_spans.
+    """
+    def __init__(
+        self,
+        span_writer: SpanWriter,
+        controller: typing.Optional[AdaptiveBatchController] = None,
+        max_queue_size: int = 16_384,
+    ):
+        self.span_writer = span_writer
+        self.controller = controller if controller is not None else AdaptiveBatchController()
+        self._batcher = _AdaptiveBatcher(
+            "AdaptiveBatchSpanProcessor", self._export, self.controller, max_queue_size
+        )
+
+    @property
+    def dropped_spans(self) -> int:
+        return self._batcher.dropped_items
+
+    def on_start(
+        self, span: Span, parent_context: typing.Optional[Context] = None
+    ) -> None:
+        pass
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if span.context.trace_flags.sampled:
+            self._batcher.add(span)
+
+    def _export(self, spans: typing.List[ReadableSpan]) -> None:
+        start = time.perf_counter()
+        payload = ProtoSpanExporter._serialize_traces_data(spans)  # pylint: disable=protected-access
+        encoded = time.perf_counter()
+        self.controller.record_encode(len(spans), encoded - start, len(payload))
+        self.span_writer.write_span(payload)
+        # A BatchingWriter sharing the controller reports the latency of the
+        # actual write, this one only queued the payload.
+        if getattr(self.span_writer, "controller", None) is not self.controller:
+            self.controller.record_write(time.perf_counter() - encoded, len(payload))
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        deadline = time.monotonic() + timeout_millis / 1e3
+        if not self._batcher.flush(timeout_millis):
+            return False
+        return self.span_writer.force_flush(max(deadline - time.monotonic(), 0) * 1e3)
+
+    def shutdown(self, timeout_millis: float = 30_000) -> None:
+        deadline = time.monotonic() + timeout_millis / 1e3
+        self._batcher.shutdown(timeout_millis)
+        self.span_writer.shutdown(max(deadline - time.monotonic(), 0) * 1e3)
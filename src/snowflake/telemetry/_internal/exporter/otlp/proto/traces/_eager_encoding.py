@@ -0,0 +1,240 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+"""
+A span processor that encodes every span as soon as it ends.
+
+The ProtoSpanExporter encodes a whole batch when it is exported, which keeps
+all the ReadableSpan objects of the batch alive until then and concentrates
+the encoding cost in one latency spike at flush time. The
+EagerEncodingSpanProcessor serializes each span into its Span message in
+on_end and drops the ReadableSpan right away. Exporting then only
+concatenates the buffered span bytes under the cached resource and scope
+headers.
+"""
+
+import logging
+import threading
+import time
+import typing
+
+from opentelemetry.context import (
+    _SUPPRESS_INSTRUMENTATION_KEY,
+    Context,
+    attach,
+    detach,
+    set_value,
+)
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor
+from opentelemetry.sdk.util.instrumentation import InstrumentationScope
+from snowflake.telemetry._internal import fork
+from snowflake.telemetry._internal.exporter.otlp.proto._memory_pressure import (
+    EARLY_FLUSHES,
+    MemoryPressure,
+    MemoryPressureMonitor,
+)
+from snowflake.telemetry._internal.opentelemetry.exporter.otlp.proto.common._internal import (
+    _encode_instrumentation_scope,
+    _encode_resource,
+)
+from snowflake.telemetry._internal.opentelemetry.exporter.otlp.proto.common._internal.trace_encoder import (
+    _encode_span,
+)
+from snowflake.telemetry._internal.serialize import Varint
+
+if typing.TYPE_CHECKING:
+    from snowflake.telemetry._internal.exporter.otlp.proto.traces import SpanWriter
+
+_logger = logging.getLogger(__name__)
+
+# Field tags of TracesData.resource_spans, ResourceSpans.resource,
+# ResourceSpans.scope_spans, ScopeSpans.scope, ScopeSpans.spans and the
+# schema_url fields, which all share the same field numbers.
+_TAG_FIELD_1 = b"\n"
+_TAG_FIELD_2 = b"\x12"
+_TAG_FIELD_3 = b"\x1a"
+
+
+def _write_length_delimited(out: bytearray, tag: bytes, data: bytes) -> None:
+    out += tag
+    Varint.write_varint_u32(out, len(data))
+    out += data
+
+
+class EagerEncodingSpanProcessor(SpanProcessor):
+    """
+    Implementation of the SpanProcessor interface that serializes spans as
+    soon as they end and writes them as
+    opentelemetry.proto.trace.v1.trace_pb2.TracesData protobuf messages
+    using the SpanWriter you provide.
+
+    A TracesData message is written when max_export_batch_size spans or
+    max_buffer_bytes of serialized spans are buffered, and on force_flush()
+    and shutdown(). The output is the same as the output of a
+    ProtoSpanExporter for the same spans.
+
+    If a memory_monitor is given, the buffered spans count towards its
+    buffer watermarks. Under memory pressure, spans are sampled and their
+    attributes truncated before they are encoded, and every span is written
+    right away, see MemoryPressureMonitor.
+    """
+    def __init__(
+        self,
+        span_writer: "SpanWriter",
+        max_export_batch_size: int = 512,
+        max_buffer_bytes: int = 4 * 1024 * 1024,
+        memory_monitor: typing.Optional[MemoryPressureMonitor] = None,
+    ):
+        self.span_writer = span_writer
+        self._memory_monitor = memory_monitor
+        self._max_export_batch_size = max_export_batch_size
+        self._max_buffer_bytes = max_buffer_bytes
+        self._lock = threading.Lock()
+        # Serializes writes, so that batches are written in order.
+        self._export_lock = threading.Lock()
+        self._buffer: typing.Dict[
+            Resource, typing.Dict[InstrumentationScope, typing.List[bytes]]
+        ] = {}
+        self._buffered_spans = 0
+        self._buffered_bytes = 0
+        self._resource_headers: typing.Dict[Resource, typing.Tuple[bytes, bytes]] = {}
+        self._scope_headers: typing.Dict[InstrumentationScope, typing.Tuple[bytes, bytes]] = {}
+        self._shutdown = False
+        if memory_monitor is not None:
+            memory_monitor.add_buffer(lambda: self._buffered_bytes)
+        fork.register(self)
+
+    def _at_fork_reinit(self) -> None:
+        # The parent exports the spans it buffered.
+        self._lock = threading.Lock()
+        self._export_lock = threading.Lock()
+        self._buffer = {}
+        self._buffered_spans = 0
+        self._buffered_bytes = 0
+
+    def on_start(
+        self, span: Span, parent_context: typing.Optional[Context] = None
+    ) -> None:
+        pass
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if self._shutdown or not span.context.trace_flags.sampled:
+            return
+        level = MemoryPressure.NORMAL
+        if self._memory_monitor is not None:
+            level = self._memory_monitor.level()
+            degraded = self._memory_monitor.degrade_spans((span,), level)
+            if not degraded:
+                return
+            span = degraded[0]
+        try:
+            serialized_span = _encode_span(span).SerializeToString()
+        # pylint: disable=broad-exception-caught
+        except Exception:
+            _logger.exception("Exception while encoding Span.")
+            return
+        resource = span.resource
+        scope = span.instrumentation_scope or None
+        with self._lock:
+            scopes = self._buffer.get(resource)
+            if scopes is None:
+                scopes = self._buffer[resource] = {}
+            spans = scopes.get(scope)
+            if spans is None:
+                spans = scopes[scope] = []
+            spans.append(serialized_span)
+            self._buffered_spans += 1
+            self._buffered_bytes += len(serialized_span)
+            full = (
+                self._buffered_spans >= self._max_export_batch_size
+                or self._buffered_bytes >= self._max_buffer_bytes
+            )
+        if full:
+            self._export()
+        elif level is not MemoryPressure.NORMAL:
+            self._memory_monitor.count(EARLY_FLUSHES)
+            self._export()
+
+    def _take_buffer(self):
+        with self._lock:
+            buffer = self._buffer
+            self._buffer = {}
+            self._buffered_spans = 0
+            self._buffered_bytes = 0
+        return buffer
+
+    def _export(self) -> bool:
+        with self._export_lock:
+            buffer = self._take_buffer()
+            if not buffer:
+                return True
+            token = attach(set_value(_SUPPRESS_INSTRUMENTATION_KEY, True))
+            try:
+                self.span_writer.write_span(self._serialize_traces_data(buffer))
+                return True
+            # pylint: disable=broad-exception-caught
+            except Exception:
+                _logger.exception("Exception while exporting Span.")
+                return False
+            finally:
+                detach(token)
+
+    def _resource_header(self, resource: Resource) -> typing.Tuple[bytes, bytes]:
+        header = self._resource_headers.get(resource)
+        if header is None:
+            prefix = bytearray()
+            _write_length_delimited(
+                prefix, _TAG_FIELD_1, _encode_resource(resource).SerializeToString()
+            )
+            suffix = bytearray()
+            if resource.schema_url:
+                _write_length_delimited(suffix, _TAG_FIELD_3, resource.schema_url.encode("utf-8"))
+            header = self._resource_headers[resource] = (bytes(prefix), bytes(suffix))
+        return header
+
+    def _scope_header(
+        self, scope: typing.Optional[InstrumentationScope]
+    ) -> typing.Tuple[bytes, bytes]:
+        header = self._scope_headers.get(scope)
+        if header is None:
+            prefix = bytearray()
+            _write_length_delimited(
+                prefix, _TAG_FIELD_1, _encode_instrumentation_scope(scope).SerializeToString()
+            )
+            suffix = bytearray()
+            if scope is not None and scope.schema_url:
+                _write_length_delimited(suffix, _TAG_FIELD_3, scope.schema_url.encode("utf-8"))
+            header = self._scope_headers[scope] = (bytes(prefix), bytes(suffix))
+        return header
+
+    def _serialize_traces_data(self, buffer) -> bytes:
+        out = bytearray()
+        for resource, scopes in buffer.items():
+            resource_prefix, resource_suffix = self._resource_header(resource)
+            resource_spans = bytearray(resource_prefix)
+            for scope, spans in scopes.items():
+                scope_prefix, scope_suffix = self._scope_header(scope)
+                scope_spans = bytearray(scope_prefix)
+                for serialized_span in spans:
+                    _write_length_delimited(scope_spans, _TAG_FIELD_2, serialized_span)
+                scope_spans += scope_suffix
+                _write_length_delimited(resource_spans, _TAG_FIELD_2, scope_spans)
+            resource_spans += resource_suffix
+            _write_length_delimited(out, _TAG_FIELD_1, resource_spans)
+        return bytes(out)
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        deadline = time.monotonic() + timeout_millis / 1e3
+        if not self._export():
+            return False
+        return self.span_writer.force_flush(max(deadline - time.monotonic(), 0) * 1e3)
+
+    def shutdown(self, timeout_millis: float = 30_000) -> None:
+        deadline = time.monotonic() + timeout_millis / 1e3
+        self._shutdown = True
+        self._export()
+        self.span_writer.shutdown(max(deadline - time.monotonic(), 0) * 1e3)
+        self._resource_headers.clear()
+        self._scope_headers.clear()
@@ -0,0 +1,116 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+"""
+This module provides SpanWriter, MetricWriter and LogWriter implementations
+that wrap the writer you provide to change how and when the serialized
+protobuf messages are written, and that write them to local files. The only
+classes that should be accessed outside of this module are:
+
+- AdaptiveBatchController
+- BatchingWriter
+- BackpressurePolicy
+- AsyncWriterAdapter
+- CoalescingWriter
+- CompressingWriter
+- Compression
+- ExporterStats
+- HistogramSnapshot
+- MemoryPressure
+- MemoryPressureMonitor
+- MultiplexedStreamReader
+- MultiplexingWriter
+- TeeWriter
+- SegmentFileWriter
+- SegmentReader
+- SharedMemoryRingReader
+- SharedMemoryRingWriter
+- SpillingWriter
+- SyncPolicy
+- TraceIndexingWriter
+- TraceIndex
+
+Please see the class documentation for those classes to learn more.
+"""
+
+from snowflake.telemetry._internal.exporter.otlp.proto._adaptive import (
+    AdaptiveBatchController,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto._memory_pressure import (
+    MemoryPressure,
+    MemoryPressureMonitor,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto._stats import (
+    ExporterStats,
+    HistogramSnapshot,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.writers._async import (
+    AsyncWriterAdapter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.writers._batching import (
+    BackpressurePolicy,
+    BatchingWriter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.writers._coalescing import (
+    CoalescingWriter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.writers._compression import (
+    Compression,
+    CompressingWriter,
+    decompress,
+    otlp_zlib_dictionary,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.writers._multiplex import (
+    MultiplexedStreamReader,
+    MultiplexingWriter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.writers._segment import (
+    SegmentFileWriter,
+    SegmentReader,
+    SyncPolicy,
+    segment_files,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.writers._shared_memory import (
+    SharedMemoryRingReader,
+    SharedMemoryRingWriter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.writers._spill import (
+    SpillingWriter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.writers._tee import (
+    TeeWriter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.writers._trace_index import (
+    TraceIndex,
+    TraceIndexingWriter,
+)
+
+
+__all__ = [
+    "AdaptiveBatchController",
+    "AsyncWriterAdapter",
+    "BackpressurePolicy",
+    "BatchingWriter",
+    "CoalescingWriter",
+    "Compression",
+    "CompressingWriter",
+    "decompress",
+    "ExporterStats",
+    "HistogramSnapshot",
+    "MemoryPressure",
+    "MemoryPressureMonitor",
+    "MultiplexedStreamReader",
+    "MultiplexingWriter",
+    "otlp_zlib_dictionary",
+    "segment_files",
+    "SegmentFileWriter",
+    "SegmentReader",
+    "SharedMemoryRingReader",
+    "SharedMemoryRingWriter",
+    "SpillingWriter",
+    "SyncPolicy",
+    "TeeWriter",
+    "TraceIndex",
+    "TraceIndexingWriter",
+]
@@ -0,0 +1,182 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+import asyncio
+import logging
+import threading
+import time
+import typing
+
+from snowflake.telemetry._internal import fork
+from snowflake.telemetry._internal.exporter.otlp.proto.logs import (
+    AsyncLogWriter,
+    LogWriter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.metrics import (
+    AsyncMetricWriter,
+    MetricWriter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import (
+    AsyncSpanWriter,
+    SpanWriter,
+)
+
+_logger = logging.getLogger(__name__)
+
+
+class AsyncWriterAdapter(SpanWriter, MetricWriter, LogWriter):
+    """
+    A SpanWriter, MetricWriter and LogWriter that writes serialized payloads
+    with the AsyncSpanWriter/AsyncMetricWriter/AsyncLogWriter you provide.
+
+    The coroutines run on an event loop in a dedicated thread, which is
+    started with the first write. Writes return as soon as the coroutine is
+    scheduled, so up to max_in_flight writes overlap. When that many writes
+    are in flight, a write blocks until one finishes, or drops the payload
+    after submit_timeout_millis if it is set. Dropped and failed payloads are
+    counted in dropped_payloads and failed_payloads.
+    """
+    def __init__(
+        self,
+        writer: typing.Union[AsyncSpanWriter, AsyncMetricWriter, AsyncLogWriter],
+        max_in_flight: int = 16,
+        submit_timeout_millis: typing.Optional[float] = None,
+    ):
+        if max_in_flight <= 0:
+            raise ValueError("max_in_flight must be a positive integer")
+        self._writer = writer
+        self._max_in_flight = max_in_flight
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._submit_timeout = (
+            submit_timeout_millis / 1e3 if submit_timeout_millis is not None else None
+        )
+        self._lock = threading.Lock()
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._loop: typing.Optional[asyncio.AbstractEventLoop] = None
+        self._thread: typing.Optional[threading.Thread] = None
+        self._shutdown = False
+        self.dropped_payloads = 0
+        self.failed_payloads = 0
+        fork.register(self)
+
+    def _at_fork_reinit(self) -> None:
+        # The event loop thread only exists in the parent, which completes
+        # the writes in flight. A new loop is started with the next write.
+        self._slots = threading.BoundedSemaphore(self._max_in_flight)
+        self._lock = threading.Lock()
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._loop = None
+        self._thread = None
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def write_span(self, serialized_spans: bytes) -> None:
+        self._submit(self._writer.write_span, serialized_spans)
+
+    def write_metrics(self, serialized_metrics: bytes) -> None:
+        self._submit(self._writer.write_metrics, serialized_metrics)
+
+    def write_logs(self, serialized_logs: bytes) -> None:
+        self._submit(self._writer.write_logs, serialized_logs)
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    name="AsyncWriterAdapter",
+                    target=self._run_loop,
+                    args=(loop,),
+                    daemon=True,
+                )
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    def _submit(self, write: typing.Callable[[bytes], typing.Awaitable[None]], payload: bytes) -> None:
+        if self._shutdown or not self._slots.acquire(timeout=self._submit_timeout):
+            with self._condition:
+                self.dropped_payloads += 1
+            return
+        with self._condition:
+            self._in_flight += 1
+        try:
+            future = asyncio.run_coroutine_threadsafe(write(payload), self._ensure_loop())
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._on_done)
+
+    def _release(self) -> None:
+        self._slots.release()
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def _on_done(self, future) -> None:
+        try:
+            if future.cancelled():
+                with self._condition:
+                    self.failed_payloads += 1
+            elif future.exception() is not None:
+                _logger.error(
+                    "Exception while writing serialized payload.",
+                    exc_info=future.exception(),
+                )
+                with self._condition:
+                    self.failed_payloads += 1
+        finally:
+            self._release()
+
+    def _wait_until_drained(self, deadline: float) -> bool:
+        with self._condition:
+            while self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def _run_on_loop(self, coroutine, deadline: float) -> bool:
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._ensure_loop())
+        try:
+            future.result(max(deadline - time.monotonic(), 0))
+            return True
+        except Exception:  # pylint: disable=broad-exception-caught
+            future.cancel()
+            _logger.exception("Exception while flushing or shutting down the writer.")
+            return False
+
+    def force_flush(self, timeout_millis: float = 30_000) -> bool:
+        deadline = time.monotonic() + timeout_millis / 1e3
+        if not self._wait_until_drained(deadline):
+            return False
+        if self._loop is None:
+            return True
+        return self._run_on_loop(self._writer.force_flush(), deadline)
+
+    def shutdown(self, timeout_millis: float = 30_000) -> None:
+        deadline = time.monotonic() + timeout_millis / 1e3
+        with self._lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+        self._wait_until_drained(deadline)
+        # The writer is shut down even if nothing was written, which needs
+        # the loop.
+        self._run_on_loop(self._writer.shutdown(), deadline)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(max(deadline - time.monotonic(), 0))
@@ -0,0 +1,222 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+import collections
+import enum
+import logging
+import threading
+import time
+import typing
+
+from snowflake.telemetry._internal import fork
+from snowflake.telemetry._internal.exporter.otlp.proto._adaptive import (
+    AdaptiveBatchController,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.logs import LogWriter
+from snowflake.telemetry._internal.exporter.otlp.proto.metrics import MetricWriter
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import SpanWriter
+
+_logger = logging.getLogger(__name__)
+
+
+class BackpressurePolicy(enum.Enum):
+    """
+    What a BatchingWriter does with a new payload when its queue is full.
+    """
+    # Wait for room in the queue, for at most block_timeout_millis.
+    BLOCK = "block"
+    # Drop the new payload.
+    DROP_NEWEST = "drop_newest"
+    # Drop the oldest queued payload to make room for the new one.
+    DROP_OLDEST = "drop_oldest"
+
+
+class BatchingWriter(SpanWriter, MetricWriter, LogWriter):
+    """
+    A SpanWriter, MetricWriter and LogWriter that queues serialized payloads
+    and writes them with the writer you provide on a background thread.
+
+    Exporters return as soon as a payload is queued, so the next batch is
+    encoded while the previous one is being written, and a slow writer no
+    longer stalls the SDK's export thread. The queue is bounded by
+    max_queue_size payloads and max_queue_bytes bytes; the policy decides
+    what happens when it is full. Dropped and failed payloads are counted in
+    dropped_payloads and failed_payloads.
+
+    force_flush() waits until all queued payloads are written, and shutdown()
+    writes what it can within its timeout, discards the rest and stops the
+    background thread. Both are propagated to the wrapped writer.
+
+    If a controller is given, the latency of every write is reported to it,
+    see AdaptiveBatchController.
+    """
+    def __init__(
+        self,
+        writer: typing.Union[SpanWriter, MetricWriter, LogWriter],
+        max_queue_size: int = 2048,
+        max_queue_bytes: int = 64 * 1024 * 1024,
+        policy: BackpressurePolicy = BackpressurePolicy.DROP_NEWEST,
+        block_timeout_millis: typing.Optional[float] = None,
+        controller: typing.Optional[AdaptiveBatchController] = None,
+    ):
+        if max_queue_size <= 0:
+            raise ValueError("max_queue_size must be a positive integer")
+        self._writer = writer
+        self.controller = controller
+        self._max_queue_size = max_queue_size
+        self._max_queue_bytes = max_queue_bytes
+        self._policy = policy
+        self._block_timeout = (
+            block_timeout_millis / 1e3 if block_timeout_millis is not None else None
+        )
+        self._condition = threading.Condition(threading.Lock())
+        self._queue: typing.Deque[typing.Tuple[typing.Callable[[bytes], None], bytes]] = collections.deque()
+        self._queue_bytes = 0
+        self._in_flight = False
+        self._worker: typing.Optional[threading.Thread] = None
+        self._shutdown = False
+        self.dropped_payloads = 0
+        self.failed_payloads = 0
+        fork.register(self)
+
+    def _at_fork_reinit(self) -> None:
+        # The parent writes the payloads it queued, the worker thread is
+        # started again with the next write.
+        self._condition = threading.Condition(threading.Lock())
+        self._queue.clear()
+        self._queue_bytes = 0
+        self._in_flight = False
+        self._worker = None
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    @property
+    def queue_bytes(self) -> int:
+        return self._queue_bytes
+
+    def write_span(self, serialized_spans: bytes) -> None:
+        self._enqueue(self._writer.write_span, serialized_spans)
+
+    def write_metrics(self, serialized_metrics: bytes) -> None:
+        self._enqueue(self._writer.write_metrics, serialized_metrics)
+
+    def write_logs(self, serialized_logs: bytes) -> None:
+        self._enqueue(self._writer.write_logs, serialized_logs)
+
+    def _is_full(self, size: int) -> bool:
+        if not self._queue:
+            # A payload larger than max_queue_bytes is still accepted into an
+            # empty queue, it could never be written otherwise.
+            return False
+        return (
+            len(self._queue) >= self._max_queue_size
+            or self._queue_bytes + size > self._max_queue_bytes
+        )
+
+    def _enqueue(self, write: typing.Callable[[bytes], None], payload: bytes) -> None:
+        size = len(payload)
+        with self._condition:
+            if self._shutdown:
+                self.dropped_payloads += 1
+                return
+            if self._worker is None:
+                self._start_worker()
+            if self._is_full(size):
+                if self._policy is BackpressurePolicy.DROP_NEWEST:
+                    self.dropped_payloads += 1
+                    return
+                if self._policy is BackpressurePolicy.DROP_OLDEST:
+                    while self._is_full(size):
+                        _, dropped = self._queue.popleft()
+                        self._queue_bytes -= len(dropped)
+                        self.dropped_payloads += 1
+                else:
+                    deadline = (
+                        time.monotonic() + self._block_timeout
+                        if self._block_timeout is not None
+                        else None
+                    )
+                    while self._is_full(size) and not self._shutdown:
+                        remaining = deadline - time.monotonic() if deadline is not None else None
+                        if remaining is not None and remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                    if self._is_full(size) or self._shutdown:
+                        self.dropped_payloads += 1
+                        return
+            self._queue.append((write, payload))
+            self._queue_bytes += size
+            self._condition.notify_all()
+
+    def _start_worker(self) -> None:
+        self._worker = threading.Thread(
+            name="BatchingWriter", target=self._run, daemon=True
+        )
+        self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._queue and not self._shutdown:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                write, payload = self._queue.popleft()
+                self._queue_bytes -= len(payload)
+                self._in_flight = True
+                self._condition.notify_all()
+            try:
+                start = time.perf_counter()
+                write(payload)
+                if self.controller is not None:
+                    self.controller.record_write(time.perf_counter() - start, len(payload))
+            # pylint: disable=broad-exception-caught
+            except Exception:
+                _logger.exception("Exception while writing serialized payload.")
+                with self._condition:
+                    self.failed_payloads += 1
+            finally:
+                with self._condition:
+                    self._in_flight = False
+                    self._condition.notify_all()
+
+    def _wait_until_drained(self, deadline: float) -> bool:
+        with self._condition:
+            while self._queue or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def force_flush(self, timeout_millis: float = 30_000) -> bool:
+        deadline = time.monotonic() + timeout_millis / 1e3
+        if not self._wait_until_drained(deadline):
+            return False
+        remaining_millis = max(deadline - time.monotonic(), 0) * 1e3
+        return self._writer.force_flush(remaining_millis)
+
+    def shutdown(self, timeout_millis: float = 30_000) -> None:
+        deadline = time.monotonic() + timeout_millis / 1e3
+        with self._condition:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            self._condition.notify_all()
+        self._wait_until_drained(deadline)
+        with self._condition:
+            if self._queue:
+                _logger.warning(
+                    "Discarding %d payloads that could not be written before the shutdown timeout.",
+                    len(self._queue),
+                )
+                self.dropped_payloads += len(self._queue)
+                self._queue.clear()
+                self._queue_bytes = 0
+                self._condition.notify_all()
+        if self._worker is not None:
+            self._worker.join(max(deadline - time.monotonic(), 0))
+        self._writer.shutdown(max(deadline - time.monotonic(), 0) * 1e3)
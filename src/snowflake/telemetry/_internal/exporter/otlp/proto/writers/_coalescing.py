@@ -0,0 +1,170 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+import logging
+import threading
+import time
+import typing
+
+from snowflake.telemetry._internal import fork
+from snowflake.telemetry._internal.exporter.otlp.proto.logs import LogWriter
+from snowflake.telemetry._internal.exporter.otlp.proto.metrics import MetricWriter
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import SpanWriter
+from snowflake.telemetry._internal.serialize.wire import merge_otlp_data
+
+_logger = logging.getLogger(__name__)
+
+
+class _Buffer:
+    __slots__ = ("write", "payloads", "size", "deadline")
+
+    def __init__(self, write: typing.Callable[[bytes], None]):
+        self.write = write
+        self.payloads: typing.List[bytes] = []
+        self.size = 0
+        self.deadline = 0.0
+
+
+class CoalescingWriter(SpanWriter, MetricWriter, LogWriter):
+    """
+    A SpanWriter, MetricWriter and LogWriter that merges many small payloads
+    into one before passing it to the writer you provide.
+
+    Payloads are buffered per signal until max_bytes are buffered or the
+    oldest buffered payload is max_delay_millis old. Serialized TracesData,
+    MetricsData and LogsData messages only contain a repeated field, so
+    concatenating them yields a valid message. If deduplicate is set, the
+    spans, metrics or log records of identical resources and scopes are
+    additionally grouped under a single resource and scope header, which
+    removes the headers repeated by every small payload.
+
+    force_flush() writes the buffered payloads right away. Failed writes are
+    counted in failed_payloads.
+    """
+    def __init__(
+        self,
+        writer: typing.Union[SpanWriter, MetricWriter, LogWriter],
+        max_bytes: int = 1024 * 1024,
+        max_delay_millis: float = 5_000,
+        deduplicate: bool = True,
+    ):
+        self._writer = writer
+        self._max_bytes = max_bytes
+        self._max_delay = max_delay_millis / 1e3
+        self._deduplicate = deduplicate
+        self._condition = threading.Condition(threading.Lock())
+        # Serializes writes, so that merged payloads are written in order.
+        self._write_lock = threading.Lock()
+        self._buffers: typing.Dict[str, _Buffer] = {}
+        self._timer: typing.Optional[threading.Thread] = None
+        self._shutdown = False
+        self.failed_payloads = 0
+        fork.register(self)
+
+    def _at_fork_reinit(self) -> None:
+        # The parent writes the payloads it buffered, the timer thread is
+        # started again with the next write.
+        self._condition = threading.Condition(threading.Lock())
+        self._write_lock = threading.Lock()
+        self._buffers = {}
+        self._timer = None
+
+    def write_span(self, serialized_spans: bytes) -> None:
+        self._add("spans", self._writer.write_span, serialized_spans)
+
+    def write_metrics(self, serialized_metrics: bytes) -> None:
+        self._add("metrics", self._writer.write_metrics, serialized_metrics)
+
+    def write_logs(self, serialized_logs: bytes) -> None:
+        self._add("logs", self._writer.write_logs, serialized_logs)
+
+    def _add(self, signal: str, write: typing.Callable[[bytes], None], payload: bytes) -> None:
+        with self._condition:
+            if self._shutdown:
+                write_now = True
+            else:
+                write_now = False
+                buffer = self._buffers.get(signal)
+                if buffer is None:
+                    buffer = self._buffers[signal] = _Buffer(write)
+                if not buffer.payloads:
+                    buffer.deadline = time.monotonic() + self._max_delay
+                    if self._timer is None:
+                        self._start_timer()
+                    self._condition.notify_all()
+                buffer.payloads.append(payload)
+                buffer.size += len(payload)
+                full = buffer.size >= self._max_bytes
+        if write_now:
+            write(payload)
+        elif full:
+            self._flush(signal)
+
+    def _start_timer(self) -> None:
+        self._timer = threading.Thread(
+            name="CoalescingWriter", target=self._run_timer, daemon=True
+        )
+        self._timer.start()
+
+    def _run_timer(self) -> None:
+        while True:
+            with self._condition:
+                while True:
+                    if self._shutdown:
+                        return
+                    deadlines = [
+                        (buffer.deadline, signal)
+                        for signal, buffer in self._buffers.items()
+                        if buffer.payloads
+                    ]
+                    if deadlines:
+                        deadline, signal = min(deadlines)
+                        timeout = deadline - time.monotonic()
+                        if timeout <= 0:
+                            break
+                    else:
+                        timeout = None
+                    self._condition.wait(timeout)
+            self._flush(signal)
+
+    def _flush(self, signal: str) -> bool:
+        with self._write_lock:
+            with self._condition:
+                buffer = self._buffers.get(signal)
+                if buffer is None or not buffer.payloads:
+                    return True
+                payloads = buffer.payloads
+                buffer.payloads = []
+                buffer.size = 0
+            try:
+                if len(payloads) == 1:
+                    merged = payloads[0]
+                elif self._deduplicate:
+                    merged = merge_otlp_data(payloads)
+                else:
+                    merged = b"".join(payloads)
+                buffer.write(merged)
+                return True
+            # pylint: disable=broad-exception-caught
+            except Exception:
+                _logger.exception("Exception while writing coalesced payloads.")
+                with self._condition:
+                    self.failed_payloads += len(payloads)
+                return False
+
+    def force_flush(self, timeout_millis: float = 30_000) -> bool:
+        deadline = time.monotonic() + timeout_millis / 1e3
+        flushed = all([self._flush(signal) for signal in list(self._buffers)])
+        return self._writer.force_flush(max(deadline - time.monotonic(), 0) * 1e3) and flushed
+
+    def shutdown(self, timeout_millis: float = 30_000) -> None:
+        with self._condition:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            self._condition.notify_all()
+        deadline = time.monotonic() + timeout_millis / 1e3
+        for signal in list(self._buffers):
+            self._flush(signal)
+        self._writer.shutdown(max(deadline - time.monotonic(), 0) * 1e3)
@@ -0,0 +1,198 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+import enum
+import functools
+import gzip
+import lzma
+import typing
+import zlib
+
+from snowflake.telemetry._internal.exporter.otlp.proto.logs import LogWriter
+from snowflake.telemetry._internal.exporter.otlp.proto.metrics import MetricWriter
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import SpanWriter
+from snowflake.telemetry._internal.opentelemetry.proto.common.v1.common_marshaler import (
+    AnyValue,
+    InstrumentationScope,
+    KeyValue,
+)
+from snowflake.telemetry._internal.opentelemetry.proto.resource.v1.resource_marshaler import Resource
+from snowflake.telemetry._internal.opentelemetry.proto.trace.v1.trace_marshaler import (
+    ResourceSpans,
+    ScopeSpans,
+    Span,
+    Status,
+    TracesData,
+)
+
+# Attribute keys that Snowflake sets on the resource of every UDF, UDTF and
+# stored procedure, followed by common semantic convention keys.
+_SNOWFLAKE_RESOURCE_ATTRIBUTES = (
+    "snow.release.version",
+    "snow.executable.runtime.version",
+    "snow.executable.id",
+    "snow.executable.name",
+    "snow.executable.type",
+    "snow.owner.id",
+    "snow.owner.name",
+    "snow.database.id",
+    "snow.database.name",
+    "snow.schema.id",
+    "snow.schema.name",
+    "snow.warehouse.id",
+    "snow.warehouse.name",
+    "snow.session.role.primary.id",
+    "snow.session.role.primary.name",
+    "snow.user.id",
+    "snow.user.name",
+    "snow.session.id",
+    "snow.query.id",
+    "db.user",
+    "telemetry.sdk.version",
+    "telemetry.sdk.name",
+    "telemetry.sdk.language",
+    "service.name",
+)
+
+_COMMON_ATTRIBUTES = (
+    "exception.escaped",
+    "exception.stacktrace",
+    "exception.message",
+    "exception.type",
+    "thread.name",
+    "thread.id",
+    "code.namespace",
+    "code.filepath",
+    "code.function",
+    "code.lineno",
+)
+
+_COMMON_VALUES = (
+    "Traceback (most recent call last):\n  File \"",
+    "opentelemetry",
+    "snowflake-telemetry-python",
+    "PROCEDURE",
+    "FUNCTION",
+    "TABLE_FUNCTION",
+    "python",
+)
+
+
+@functools.lru_cache(maxsize=None)
+def otlp_zlib_dictionary() -> bytes:
+    """
+    Returns the zlib preset dictionary used by CompressingWriter.
+
+    The dictionary is a serialized TracesData message carrying the common
+    OTLP and Snowflake attribute keys, so that it contains the attribute
+    keys together with the field tags and lengths around them, the way they
+    appear in real payloads. zlib matches the end of the dictionary most
+    cheaply, so the most common content comes last.
+    """
+    def key_values(keys, value):
+        return [KeyValue(key=key, value=AnyValue(string_value=value)) for key in keys]
+
+    sample = TracesData(
+        resource_spans=[
+            ResourceSpans(
+                resource=Resource(attributes=key_values(_SNOWFLAKE_RESOURCE_ATTRIBUTES, "")),
+                scope_spans=[
+                    ScopeSpans(
+                        scope=InstrumentationScope(name="snow.telemetry", version=""),
+                        spans=[
+                            Span(
+                                name="snow.auto_instrumented",
+                                attributes=key_values(_COMMON_ATTRIBUTES, ""),
+                                status=Status(),
+                            )
+                        ],
+                    )
+                ],
+            )
+        ]
+    )
+    return "".join(_COMMON_VALUES).encode("utf-8") + sample.SerializeToString()
+
+
+class Compression(enum.Enum):
+    ZLIB = "zlib"
+    GZIP = "gzip"
+    LZMA = "lzma"
+
+
+def decompress(
+    data: bytes,
+    compression: Compression = Compression.ZLIB,
+    zdict: typing.Optional[bytes] = None,
+) -> bytes:
+    """
+    Decompresses a payload written by a CompressingWriter. Pass the same
+    zdict the writer was configured with; zlib payloads compressed with the
+    default dictionary are detected automatically.
+    """
+    if compression is Compression.GZIP:
+        return gzip.decompress(data)
+    if compression is Compression.LZMA:
+        return lzma.decompress(data)
+    # The FDICT bit of the zlib header tells whether a dictionary was used.
+    if zdict is None and len(data) > 1 and data[1] & 0x20:
+        zdict = otlp_zlib_dictionary()
+    decompressor = zlib.decompressobj(zdict=zdict) if zdict else zlib.decompressobj()
+    return decompressor.decompress(data) + decompressor.flush()
+
+
+class CompressingWriter(SpanWriter, MetricWriter, LogWriter):
+    """
+    A SpanWriter, MetricWriter and LogWriter that compresses serialized
+    payloads before passing them to the writer you provide.
+
+    zlib, gzip and lzma are supported, with the level given as the zlib/gzip
+    compression level or the lzma preset. Small payloads compress poorly on
+    their own, so zlib uses a preset dictionary of common OTLP and Snowflake
+    attribute keys by default, see otlp_zlib_dictionary(). Pass zdict to use
+    your own dictionary, or an empty zdict to disable it. Use decompress()
+    to read the payloads back.
+    """
+    def __init__(
+        self,
+        writer: typing.Union[SpanWriter, MetricWriter, LogWriter],
+        compression: Compression = Compression.ZLIB,
+        level: int = 6,
+        zdict: typing.Optional[bytes] = None,
+    ):
+        self._writer = writer
+        self._compression = compression
+        self._level = level
+        self._compressor_template = None
+        if compression is Compression.ZLIB:
+            if zdict is None:
+                zdict = otlp_zlib_dictionary()
+            # Loading the dictionary is the expensive part of creating a
+            # compressor, a primed template is copied for every payload.
+            self._compressor_template = (
+                zlib.compressobj(level, zdict=zdict) if zdict else zlib.compressobj(level)
+            )
+
+    def compress(self, data: bytes) -> bytes:
+        if self._compression is Compression.GZIP:
+            return gzip.compress(data, compresslevel=self._level)
+        if self._compression is Compression.LZMA:
+            return lzma.compress(data, preset=self._level)
+        compressor = self._compressor_template.copy()
+        return compressor.compress(data) + compressor.flush()
+
+    def write_span(self, serialized_spans: bytes) -> None:
+        self._writer.write_span(self.compress(serialized_spans))
+
+    def write_metrics(self, serialized_metrics: bytes) -> None:
+        self._writer.write_metrics(self.compress(serialized_metrics))
+
+    def write_logs(self, serialized_logs: bytes) -> None:
+        self._writer.write_logs(self.compress(serialized_logs))
+
+    def force_flush(self, timeout_millis: float = 30_000) -> bool:
+        return self._writer.force_flush(timeout_millis)
+
+    def shutdown(self, timeout_millis: float = 30_000) -> None:
+        self._writer.shutdown(timeout_millis)
@@ -0,0 +1,328 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+import logging
+import threading
+import time
+import typing
+
+from snowflake.telemetry._internal import fork
+from snowflake.telemetry._internal.exporter.otlp.proto.logs import LogWriter
+from snowflake.telemetry._internal.exporter.otlp.proto.metrics import MetricWriter
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import SpanWriter
+from snowflake.telemetry._internal.exporter.otlp.proto.writers._segment import (
+    LOGS,
+    METRICS,
+    SPANS,
+)
+from snowflake.telemetry._internal.serialize import Varint
+from snowflake.telemetry._internal.serialize.wire import (
+    WIRE_TYPE_LEN,
+    WIRE_TYPE_VARINT,
+    iter_fields,
+    read_varint,
+    write_length_delimited,
+)
+
+_logger = logging.getLogger(__name__)
+
+# Every frame is a tag, the length of its body as a varint and the body.
+# Signal frames hold a TracesData, MetricsData or LogsData message in which
+# the resource of every ResourceXxx entry may be replaced by a reference to
+# a resource frame, whose body is the index of the resource as a varint and
+# the resource field. Index 0 starts a new resource table.
+_SIGNALS = (SPANS, METRICS, LOGS)
+_TAGS = {signal: tag for tag, signal in enumerate(_SIGNALS)}
+_RESOURCE_TAG = len(_SIGNALS)
+_WRITE_METHODS = {SPANS: "write_span", METRICS: "write_metrics", LOGS: "write_logs"}
+
+_TAG_1 = b"\n"
+# ResourceSpans, ResourceMetrics and ResourceLogs only use field numbers 1
+# to 3, field 15 holds the resource reference as a varint.
+_RESOURCE_REF_FIELD = 15
+_RESOURCE_REF_TAG = bytes([_RESOURCE_REF_FIELD << 3 | WIRE_TYPE_VARINT])
+
+
+def _write_frame(out: bytearray, tag: int, body: typing.Union[bytes, bytearray]) -> None:
+    out.append(tag)
+    Varint.write_varint_u32(out, len(body))
+    out += body
+
+
+class MultiplexingWriter(SpanWriter, MetricWriter, LogWriter):
+    """
+    A SpanWriter, MetricWriter and LogWriter that writes the payloads of all
+    signals to a single stream, so that the three proto exporters share one
+    buffer, one flush timer and one file handle.
+
+    Payloads are framed in the order they are written, with a tag naming
+    their signal, and buffered until max_bytes are buffered or the oldest
+    buffered frame is max_delay_millis old. The buffer is then written to
+    stream with a single write() call. If deduplicate_resources is set, a
+    resource written several times within one flush, e.g. by the span and
+    the log exporter of the same process, is only written once and
+    referenced by the following frames.
+
+    stream is a binary file object, or the path of a file to append to. Use
+    MultiplexedStreamReader to read the payloads back. Failed writes are
+    counted in failed_payloads.
+    """
+    def __init__(
+        self,
+        stream: typing.Union[str, typing.BinaryIO],
+        max_bytes: int = 1024 * 1024,
+        max_delay_millis: float = 5_000,
+        deduplicate_resources: bool = True,
+    ):
+        if isinstance(stream, str):
+            self._stream = open(stream, "ab")  # pylint: disable=consider-using-with
+            self._owns_stream = True
+        else:
+            self._stream = stream
+            self._owns_stream = False
+        self._max_bytes = max_bytes
+        self._max_delay = max_delay_millis / 1e3
+        self._deduplicate_resources = deduplicate_resources
+        self._condition = threading.Condition(threading.Lock())
+        # Serializes writes, so that buffers are written in order.
+        self._write_lock = threading.Lock()
+        self._buffer = bytearray()
+        self._buffered_payloads = 0
+        self._deadline = 0.0
+        self._resources: typing.Dict[bytes, int] = {}
+        self._timer: typing.Optional[threading.Thread] = None
+        self._shutdown = False
+        self.failed_payloads = 0
+        fork.register(self)
+
+    def _at_fork_reinit(self) -> None:
+        # The parent writes the frames it buffered, the timer thread is
+        # started again with the next write.
+        self._condition = threading.Condition(threading.Lock())
+        self._write_lock = threading.Lock()
+        self._buffer = bytearray()
+        self._buffered_payloads = 0
+        self._resources = {}
+        self._timer = None
+
+    def write_span(self, serialized_spans: bytes) -> None:
+        self._add(SPANS, serialized_spans)
+
+    def write_metrics(self, serialized_metrics: bytes) -> None:
+        self._add(METRICS, serialized_metrics)
+
+    def write_logs(self, serialized_logs: bytes) -> None:
+        self._add(LOGS, serialized_logs)
+
+    def _add(self, signal: str, payload: bytes) -> None:
+        if not payload:
+            return
+        with self._condition:
+            if self._shutdown:
+                raise ValueError("MultiplexingWriter is shut down")
+            if not self._buffer:
+                self._deadline = time.monotonic() + self._max_delay
+                if self._timer is None:
+                    self._start_timer()
+                self._condition.notify_all()
+            if self._deduplicate_resources:
+                payload = self._replace_resources(payload)
+            _write_frame(self._buffer, _TAGS[signal], payload)
+            self._buffered_payloads += 1
+            full = len(self._buffer) >= self._max_bytes
+        if full:
+            self._flush()
+
+    def _replace_resources(self, payload: bytes) -> bytearray:
+        # Writes a resource frame for every resource seen for the first time
+        # in this flush, and returns the payload with all resources replaced
+        # by references.
+        data = memoryview(payload)
+        out = bytearray()
+        for field_number, wire_type, field_start, value_start, field_end in iter_fields(data):
+            if field_number != 1 or wire_type != WIRE_TYPE_LEN:
+                out += data[field_start:field_end]
+                continue
+            body = bytearray()
+            for inner_number, inner_type, inner_start, _, inner_end in iter_fields(data, value_start, field_end):
+                if inner_number != 1 or inner_type != WIRE_TYPE_LEN:
+                    body += data[inner_start:inner_end]
+                    continue
+                resource = bytes(data[inner_start:inner_end])
+                index = self._resources.get(resource)
+                if index is None:
+                    index = self._resources[resource] = len(self._resources)
+                    frame_body = bytearray()
+                    Varint.write_varint_u32(frame_body, index)
+                    frame_body += resource
+                    _write_frame(self._buffer, _RESOURCE_TAG, frame_body)
+                body += _RESOURCE_REF_TAG
+                Varint.write_varint_u32(body, index)
+            write_length_delimited(out, _TAG_1, body)
+        return out
+
+    def _start_timer(self) -> None:
+        self._timer = threading.Thread(
+            name="MultiplexingWriter", target=self._run_timer, daemon=True
+        )
+        self._timer.start()
+
+    def _run_timer(self) -> None:
+        while True:
+            with self._condition:
+                while True:
+                    if self._shutdown:
+                        return
+                    if self._buffer:
+                        timeout = self._deadline - time.monotonic()
+                        if timeout <= 0:
+                            break
+                    else:
+                        timeout = None
+                    self._condition.wait(timeout)
+            self._flush()
+
+    def _flush(self) -> bool:
+        with self._write_lock:
+            with self._condition:
+                if not self._buffer:
+                    return True
+                buffer = self._buffer
+                payloads = self._buffered_payloads
+                self._buffer = bytearray()
+                self._buffered_payloads = 0
+                # The next flush starts a new resource table, so that every
+                # flush can be read on its own.
+                self._resources = {}
+            try:
+                self._stream.write(buffer)
+                self._stream.flush()
+                return True
+            # pylint: disable=broad-exception-caught
+            except Exception:
+                _logger.exception("Exception while writing multiplexed payloads.")
+                with self._condition:
+                    self.failed_payloads += payloads
+                return False
+
+    def force_flush(self, timeout_millis: float = 30_000) -> bool:
+        return self._flush()
+
+    def shutdown(self, timeout_millis: float = 30_000) -> None:
+        with self._condition:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            self._condition.notify_all()
+        self._flush()
+        if self._owns_stream:
+            self._stream.close()
+
+
+class MultiplexedStreamReader:
+    """
+    Reads the payloads written by a MultiplexingWriter from a binary file
+    object, or from the file at a path.
+
+    Iterating yields the signal and the payload of every frame in the order
+    they were written, with the resources restored, so every payload is a
+    complete TracesData, MetricsData or LogsData message. A frame cut short
+    at the end of the stream, e.g. by a crash, ends the iteration. drain()
+    writes the payloads with a SpanWriter, MetricWriter and LogWriter.
+    """
+    def __init__(self, stream: typing.Union[str, typing.BinaryIO]):
+        if isinstance(stream, str):
+            self._stream = open(stream, "rb")  # pylint: disable=consider-using-with
+            self._owns_stream = True
+        else:
+            self._stream = stream
+            self._owns_stream = False
+        self._resources: typing.Dict[int, bytes] = {}
+
+    def __enter__(self) -> "MultiplexedStreamReader":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __iter__(self) -> typing.Iterator[typing.Tuple[str, bytes]]:
+        while True:
+            record = self.read()
+            if record is None:
+                return
+            yield record
+
+    def _read_frame(self) -> typing.Optional[typing.Tuple[int, bytes]]:
+        header = self._stream.read(1)
+        if not header:
+            return None
+        length = 0
+        shift = 0
+        while True:
+            byte = self._stream.read(1)
+            if not byte:
+                return None
+            length |= (byte[0] & 0x7F) << shift
+            if byte[0] < 128:
+                break
+            shift += 7
+        body = self._stream.read(length)
+        if len(body) < length:
+            return None
+        return header[0], body
+
+    def read(self) -> typing.Optional[typing.Tuple[str, bytes]]:
+        """
+        Returns the signal and the payload of the next frame, or None at the
+        end of the stream.
+        """
+        while True:
+            frame = self._read_frame()
+            if frame is None:
+                return None
+            tag, body = frame
+            if tag == _RESOURCE_TAG:
+                index, start = read_varint(body, 0)
+                if index == 0:
+                    self._resources = {}
+                self._resources[index] = body[start:]
+            elif tag < len(_SIGNALS):
+                return _SIGNALS[tag], self._restore_resources(body)
+            else:
+                raise ValueError(f"unknown frame tag {tag}")
+
+    def _restore_resources(self, body: bytes) -> bytes:
+        data = memoryview(body)
+        out = bytearray()
+        for field_number, wire_type, field_start, value_start, field_end in iter_fields(data):
+            if field_number != 1 or wire_type != WIRE_TYPE_LEN:
+                out += data[field_start:field_end]
+                continue
+            entry = bytearray()
+            for inner_number, inner_type, inner_start, inner_value, inner_end in iter_fields(data, value_start, field_end):
+                if inner_number == _RESOURCE_REF_FIELD and inner_type == WIRE_TYPE_VARINT:
+                    index, _ = read_varint(data, inner_value)
+                    try:
+                        entry += self._resources[index]
+                    except KeyError:
+                        raise ValueError(f"reference to unknown resource {index}") from None
+                else:
+                    entry += data[inner_start:inner_end]
+            write_length_delimited(out, _TAG_1, entry)
+        return bytes(out)
+
+    def drain(self, writer: typing.Union[SpanWriter, MetricWriter, LogWriter]) -> int:
+        """
+        Writes the remaining payloads with writer and returns how many were
+        written.
+        """
+        count = 0
+        for signal, payload in self:
+            getattr(writer, _WRITE_METHODS[signal])(payload)
+            count += 1
+        return count
+
+    def close(self) -> None:
+        if self._owns_stream:
+            self._stream.close()
@@ -0,0 +1,329 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+import enum
+import mmap
+import os
+import re
+import threading
+import time
+import typing
+
+from snowflake.telemetry._internal import fork
+from snowflake.telemetry._internal.exporter.otlp.proto.logs import LogWriter
+from snowflake.telemetry._internal.exporter.otlp.proto.metrics import MetricWriter
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import SpanWriter
+from snowflake.telemetry._internal.serialize import Varint
+from snowflake.telemetry._internal.serialize.wire import read_varint
+
+SPANS = "spans"
+METRICS = "metrics"
+LOGS = "logs"
+
+_SEGMENT_SUFFIX = ".segment"
+_SEGMENT_NAME = re.compile(r"^(?P<signal>[a-z]+)-(?P<sequence>\d+)\.segment$")
+
+
+class SyncPolicy(enum.Enum):
+    """
+    When a SegmentFileWriter flushes written payloads to disk.
+    """
+    # Leave it to the operating system, segments are flushed when they are
+    # closed and on force_flush().
+    NONE = "none"
+    # After every payload.
+    ALWAYS = "always"
+    # At most once every sync_interval_millis, checked when writing.
+    INTERVAL = "interval"
+
+
+def segment_files(directory: str, signal: str) -> typing.List[str]:
+    """
+    Returns the paths of the segment files of a signal in directory, in the
+    order they were written.
+    """
+    segments = []
+    for name in os.listdir(directory):
+        match = _SEGMENT_NAME.match(name)
+        if match and match.group("signal") == signal:
+            segments.append((int(match.group("sequence")), os.path.join(directory, name)))
+    return [path for _, path in sorted(segments)]
+
+
+class _Segment:
+    """An open, preallocated and memory-mapped segment file."""
+
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.created = time.monotonic()
+        self.position = 0
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o644)
+        try:
+            os.ftruncate(self._fd, size)
+            self.map = mmap.mmap(self._fd, size)
+        except BaseException:
+            os.close(self._fd)
+            raise
+
+    @property
+    def remaining(self) -> int:
+        return len(self.map) - self.position
+
+    def append(self, prefix: bytes, payload: bytes) -> int:
+        offset = self.position
+        start = offset + len(prefix)
+        end = start + len(payload)
+        # The length is written last: until then the frame reads as the
+        # zero padding that marks the end of the segment, so a reader never
+        # sees a torn frame.
+        self.map[start:end] = payload
+        self.map[offset:start] = prefix
+        self.position = end
+        return offset
+
+    def sync(self) -> None:
+        self.map.flush()
+
+    def close(self) -> None:
+        self.map.flush()
+        self.map.close()
+        # Trim the preallocated space that was not used.
+        os.ftruncate(self._fd, self.position)
+        os.close(self._fd)
+
+    def abandon(self) -> None:
+        """Releases the segment without touching the file."""
+        self.map.close()
+        os.close(self._fd)
+
+
+class SegmentFileWriter(SpanWriter, MetricWriter, LogWriter):
+    """
+    A SpanWriter, MetricWriter and LogWriter that appends serialized
+    payloads to segment files in a directory.
+
+    Each signal is written to its own sequence of segment files named
+    <signal>-<sequence>.segment, in which every payload is framed with its
+    length as a varint, the way protobuf writeDelimitedTo() does. Segments
+    are preallocated to segment_size bytes and written through a memory
+    map; a new segment is started when a payload does not fit, or when the
+    current one is older than max_segment_age_millis. Closed segments are
+    trimmed to their written length. sync_policy decides how often the
+    written data is flushed to disk.
+
+    Use SegmentReader to read the payloads back.
+    """
+    def __init__(
+        self,
+        directory: str,
+        segment_size: int = 64 * 1024 * 1024,
+        max_segment_age_millis: typing.Optional[float] = None,
+        sync_policy: SyncPolicy = SyncPolicy.INTERVAL,
+        sync_interval_millis: float = 1_000,
+    ):
+        if segment_size <= 0:
+            raise ValueError("segment_size must be a positive integer")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._segment_size = segment_size
+        self._max_segment_age = (
+            max_segment_age_millis / 1e3 if max_segment_age_millis is not None else None
+        )
+        self._sync_policy = sync_policy
+        self._sync_interval = sync_interval_millis / 1e3
+        self._lock = threading.Lock()
+        self._segments: typing.Dict[str, _Segment] = {}
+        self._next_sequence: typing.Dict[str, int] = {}
+        self._last_sync = time.monotonic()
+        self._unsynced = False
+        self._shutdown = False
+        fork.register(self)
+
+    def _at_fork_reinit(self) -> None:
+        # The segments being written belong to the parent. The child starts
+        # its own, numbered after the ones it finds in the directory.
+        self._lock = threading.Lock()
+        for segment in self._segments.values():
+            segment.abandon()
+        self._segments = {}
+        self._next_sequence = {}
+
+    def write_span(self, serialized_spans: bytes) -> None:
+        self.append(SPANS, serialized_spans)
+
+    def write_metrics(self, serialized_metrics: bytes) -> None:
+        self.append(METRICS, serialized_metrics)
+
+    def write_logs(self, serialized_logs: bytes) -> None:
+        self.append(LOGS, serialized_logs)
+
+    def append(self, signal: str, payload: bytes) -> typing.Optional[typing.Tuple[str, int]]:
+        """
+        Appends a payload to the current segment of signal and returns the
+        segment path and the offset of its frame. Empty payloads carry no
+        data and are not written, None is returned for them.
+        """
+        if not payload:
+            return None
+        with self._lock:
+            return self._append_locked(signal, payload)
+
+    def _append_locked(self, signal: str, payload: bytes) -> typing.Tuple[str, int]:
+        prefix = bytearray()
+        Varint.write_varint_u32(prefix, len(payload))
+        frame_size = len(prefix) + len(payload)
+        if self._shutdown:
+            raise ValueError("SegmentFileWriter is shut down")
+        segment = self._segments.get(signal)
+        if segment is not None and (
+            segment.remaining < frame_size
+            or (
+                self._max_segment_age is not None
+                and time.monotonic() - segment.created >= self._max_segment_age
+            )
+        ):
+            self._close_segment(signal, segment)
+            segment = None
+        if segment is None:
+            segment = self._segments[signal] = self._open_segment(signal, frame_size)
+        offset = segment.append(bytes(prefix), payload)
+        self._unsynced = True
+        if self._sync_policy is SyncPolicy.ALWAYS or (
+            self._sync_policy is SyncPolicy.INTERVAL
+            and time.monotonic() - self._last_sync >= self._sync_interval
+        ):
+            self._sync()
+        return segment.path, offset
+
+    def _close_segment(self, signal: str, segment: _Segment) -> None:
+        segment.close()
+
+    def current_segment(self, signal: str) -> typing.Optional[str]:
+        """Returns the path of the segment being written for signal, if any."""
+        with self._lock:
+            segment = self._segments.get(signal)
+            return segment.path if segment is not None else None
+
+    def rotate(self, signal: str) -> None:
+        """
+        Closes the segment being written for signal. The next payload
+        starts a new segment.
+        """
+        with self._lock:
+            segment = self._segments.pop(signal, None)
+            if segment is not None:
+                self._close_segment(signal, segment)
+
+    def _open_segment(self, signal: str, frame_size: int) -> _Segment:
+        sequence = self._next_sequence.get(signal)
+        if sequence is None:
+            # Continue after the segments left by a previous writer.
+            existing = segment_files(self.directory, signal)
+            sequence = (
+                int(_SEGMENT_NAME.match(os.path.basename(existing[-1])).group("sequence")) + 1
+                if existing
+                else 0
+            )
+        while True:
+            self._next_sequence[signal] = sequence + 1
+            path = os.path.join(self.directory, f"{signal}-{sequence:012d}{_SEGMENT_SUFFIX}")
+            try:
+                # A payload larger than segment_size gets a segment of its own.
+                return _Segment(path, max(self._segment_size, frame_size))
+            except FileExistsError:
+                # Created by another process writing to the same directory,
+                # e.g. the parent of a forked child.
+                sequence += 1
+
+    def _sync(self) -> None:
+        for segment in self._segments.values():
+            segment.sync()
+        self._last_sync = time.monotonic()
+        self._unsynced = False
+
+    def force_flush(self, timeout_millis: float = 30_000) -> bool:
+        with self._lock:
+            if self._unsynced:
+                self._sync()
+        return True
+
+    def shutdown(self, timeout_millis: float = 30_000) -> None:
+        with self._lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            for signal, segment in self._segments.items():
+                self._close_segment(signal, segment)
+            self._segments.clear()
+
+
+class SegmentReader:
+    """
+    Reads the payloads of a segment file written by a SegmentFileWriter
+    through a read-only memory map.
+
+    Iterating yields every payload as a memoryview of the map, without
+    copying it. The views must be released, or no longer be referenced,
+    when the reader is closed; copy them with bytes() to keep them longer.
+    Segments that are still being
+    written, or were left behind by a crash, are read up to the last
+    complete payload.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            # mmap cannot map empty files.
+            self._map = mmap.mmap(file.fileno(), size, access=mmap.ACCESS_READ) if size else None
+        self._view = memoryview(self._map) if self._map is not None else memoryview(b"")
+
+    def __enter__(self) -> "SegmentReader":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __iter__(self) -> typing.Iterator[memoryview]:
+        for _, payload in self.frames():
+            yield payload
+
+    def frames(self, offset: int = 0) -> typing.Iterator[typing.Tuple[int, memoryview]]:
+        """
+        Yields the offset and payload of every frame, starting with the
+        frame at offset.
+        """
+        view = self._view
+        end = len(view)
+        while offset < end:
+            try:
+                length, start = read_varint(view, offset)
+            except ValueError:
+                return
+            if length == 0 or start + length > end:
+                # Zero padding or a frame cut short, the end of the data.
+                return
+            yield offset, view[start:start + length]
+            offset = start + length
+
+    def read(self, offset: int) -> memoryview:
+        """Returns the payload of the frame at offset."""
+        for _, payload in self.frames(offset):
+            return payload
+        raise ValueError(f"no payload at offset {offset} of {self.path}")
+
+    def close(self) -> None:
+        """
+        Unmaps the segment. Raises BufferError, and leaves the segment
+        mapped, if payloads read from it are still referenced; release them
+        and close the reader again.
+        """
+        self._view.release()
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                raise BufferError(
+                    f"cannot close {self.path}: payloads read from it are still referenced, "
+                    "release them or copy them with bytes() first"
+                ) from None
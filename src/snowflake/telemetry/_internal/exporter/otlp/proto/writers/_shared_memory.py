@@ -0,0 +1,233 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+import struct
+import sys
+import threading
+import typing
+from multiprocessing import resource_tracker, shared_memory
+
+from snowflake.telemetry._internal import fork
+from snowflake.telemetry._internal.exporter.otlp.proto.logs import LogWriter
+from snowflake.telemetry._internal.exporter.otlp.proto.metrics import MetricWriter
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import SpanWriter
+from snowflake.telemetry._internal.exporter.otlp.proto.writers._segment import (
+    LOGS,
+    METRICS,
+    SPANS,
+)
+
+# The header keeps the positions on separate cache lines, so that the
+# producer and the consumer do not invalidate each other's cache line.
+_MAGIC = b"OTLPRNG1"
+_CAPACITY = struct.Struct("<Q")
+_CAPACITY_OFFSET = 8
+_POSITION = struct.Struct("<Q")
+_WRITE_POSITION_OFFSET = 64
+_READ_POSITION_OFFSET = 128
+_HEADER_SIZE = 192
+
+# Every record is the payload length, a signal tag and the payload.
+_RECORD_HEADER = struct.Struct("<IB")
+_SIGNALS = (SPANS, METRICS, LOGS)
+_TAGS = {signal: tag for tag, signal in enumerate(_SIGNALS)}
+_WRITE_METHODS = {SPANS: "write_span", METRICS: "write_metrics", LOGS: "write_logs"}
+
+
+def _open_shared_memory(name: typing.Optional[str], create: bool, capacity: int) -> shared_memory.SharedMemory:
+    if create:
+        memory = shared_memory.SharedMemory(name, create=True, size=_HEADER_SIZE + capacity)
+        memory.buf[:_HEADER_SIZE] = bytes(_HEADER_SIZE)
+        _CAPACITY.pack_into(memory.buf, _CAPACITY_OFFSET, capacity)
+        memory.buf[:len(_MAGIC)] = _MAGIC
+        return memory
+    if sys.version_info >= (3, 13):
+        memory = shared_memory.SharedMemory(name, track=False)
+    else:
+        memory = shared_memory.SharedMemory(name)
+        # Before Python 3.13, attaching registers the segment with the
+        # resource tracker, which unlinks it when this process exits.
+        resource_tracker.unregister(memory._name, "shared_memory")  # pylint: disable=protected-access
+    if bytes(memory.buf[:len(_MAGIC)]) != _MAGIC:
+        memory.close()
+        raise ValueError(f"{name} is not a telemetry ring buffer")
+    return memory
+
+
+class _Ring:
+    def __init__(self, name: typing.Optional[str], create: bool, capacity: int):
+        if create and capacity <= _RECORD_HEADER.size:
+            raise ValueError("capacity is too small")
+        self._memory = _open_shared_memory(name, create, capacity)
+        self._owner = create
+        self.name = self._memory.name
+        self.buf = self._memory.buf
+        self.capacity = _CAPACITY.unpack_from(self.buf, _CAPACITY_OFFSET)[0]
+
+    def position(self, offset: int) -> int:
+        return _POSITION.unpack_from(self.buf, offset)[0]
+
+    def publish(self, offset: int, position: int) -> None:
+        # A single aligned 8 byte store, the other process never sees a
+        # partially updated position.
+        _POSITION.pack_into(self.buf, offset, position)
+
+    def copy_in(self, position: int, data: bytes) -> None:
+        data = memoryview(data)
+        start = position % self.capacity
+        first = min(len(data), self.capacity - start)
+        self.buf[_HEADER_SIZE + start:_HEADER_SIZE + start + first] = data[:first]
+        if first < len(data):
+            self.buf[_HEADER_SIZE:_HEADER_SIZE + len(data) - first] = data[first:]
+
+    def copy_out(self, position: int, size: int) -> bytes:
+        start = position % self.capacity
+        first = min(size, self.capacity - start)
+        data = bytes(self.buf[_HEADER_SIZE + start:_HEADER_SIZE + start + first])
+        if first < size:
+            data += bytes(self.buf[_HEADER_SIZE:_HEADER_SIZE + size - first])
+        return data
+
+    def close(self) -> None:
+        del self.buf
+        self._memory.close()
+        if self._owner:
+            self._memory.unlink()
+
+    def detach(self) -> None:
+        """Closes the ring without unlinking it, even if it created it."""
+        self._owner = False
+        self.close()
+
+
+class SharedMemoryRingWriter(SpanWriter, MetricWriter, LogWriter):
+    """
+    A SpanWriter, MetricWriter and LogWriter that hands serialized payloads
+    to another process through a ring buffer in shared memory.
+
+    Writing a payload only copies it into the ring, so exporting takes
+    microseconds, and the process reading the ring with a
+    SharedMemoryRingReader does the slow I/O. The ring supports a single
+    producer and a single consumer without locks: the producer only updates
+    the write position after the record is copied, and the consumer only
+    updates the read position after the record is read. Use one ring per
+    process; the threads of a process are serialized with a lock. Payloads
+    that do not fit in the free space of the ring are dropped and counted
+    in dropped_payloads, so a stalled reader never blocks the writer.
+
+    With create=True, the writer creates the ring with name (a random name
+    if None) and capacity, and unlinks it on shutdown(). Otherwise it
+    attaches to the ring created by the reader.
+
+    The ring has a single producer, so a forked child detaches from it and
+    drops its payloads; create a new writer in the child instead.
+    """
+    def __init__(
+        self,
+        name: typing.Optional[str] = None,
+        capacity: int = 8 * 1024 * 1024,
+        create: bool = True,
+    ):
+        self._ring = _Ring(name, create, capacity)
+        self.name = self._ring.name
+        self._lock = threading.Lock()
+        self._shutdown = False
+        self.dropped_payloads = 0
+        fork.register(self)
+
+    def _at_fork_reinit(self) -> None:
+        self._lock = threading.Lock()
+        if not self._shutdown:
+            self._shutdown = True
+            self._ring.detach()
+
+    def write_span(self, serialized_spans: bytes) -> None:
+        self._write(SPANS, serialized_spans)
+
+    def write_metrics(self, serialized_metrics: bytes) -> None:
+        self._write(METRICS, serialized_metrics)
+
+    def write_logs(self, serialized_logs: bytes) -> None:
+        self._write(LOGS, serialized_logs)
+
+    def _write(self, signal: str, payload: bytes) -> None:
+        ring = self._ring
+        size = _RECORD_HEADER.size + len(payload)
+        with self._lock:
+            if self._shutdown:
+                self.dropped_payloads += 1
+                return
+            write_position = ring.position(_WRITE_POSITION_OFFSET)
+            free = ring.capacity - (write_position - ring.position(_READ_POSITION_OFFSET))
+            if size > free:
+                self.dropped_payloads += 1
+                return
+            ring.copy_in(write_position, _RECORD_HEADER.pack(len(payload), _TAGS[signal]))
+            ring.copy_in(write_position + _RECORD_HEADER.size, payload)
+            ring.publish(_WRITE_POSITION_OFFSET, write_position + size)
+
+    def shutdown(self, timeout_millis: float = 30_000) -> None:
+        with self._lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            self._ring.close()
+
+
+class SharedMemoryRingReader:
+    """
+    Reads the payloads written to a shared memory ring buffer by a
+    SharedMemoryRingWriter in another process.
+
+    read() returns the signal and the payload of the next record, or None
+    when the ring is empty. drain() writes all available payloads with a
+    SpanWriter, MetricWriter and LogWriter, e.g. one that compresses and
+    uploads them.
+
+    With create=True, the reader creates the ring with name and capacity,
+    and unlinks it on close(). Otherwise it attaches to the ring created by
+    the writer.
+    """
+    def __init__(
+        self,
+        name: typing.Optional[str] = None,
+        capacity: int = 8 * 1024 * 1024,
+        create: bool = False,
+    ):
+        self._ring = _Ring(name, create, capacity)
+        self.name = self._ring.name
+
+    def __enter__(self) -> "SharedMemoryRingReader":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def read(self) -> typing.Optional[typing.Tuple[str, bytes]]:
+        ring = self._ring
+        read_position = ring.position(_READ_POSITION_OFFSET)
+        if read_position == ring.position(_WRITE_POSITION_OFFSET):
+            return None
+        length, tag = _RECORD_HEADER.unpack(ring.copy_out(read_position, _RECORD_HEADER.size))
+        payload = ring.copy_out(read_position + _RECORD_HEADER.size, length)
+        ring.publish(_READ_POSITION_OFFSET, read_position + _RECORD_HEADER.size + length)
+        return _SIGNALS[tag], payload
+
+    def drain(self, writer: typing.Union[SpanWriter, MetricWriter, LogWriter], max_payloads: typing.Optional[int] = None) -> int:
+        """
+        Writes the available payloads, at most max_payloads, with writer and
+        returns how many were written.
+        """
+        count = 0
+        while max_payloads is None or count < max_payloads:
+            record = self.read()
+            if record is None:
+                break
+            signal, payload = record
+            getattr(writer, _WRITE_METHODS[signal])(payload)
+            count += 1
+        return count
+
+    def close(self) -> None:
+        self._ring.close()
@@ -0,0 +1,457 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+import collections
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import typing
+
+from snowflake.telemetry._internal import fork
+from snowflake.telemetry._internal.exporter.otlp.proto.logs import LogWriter
+from snowflake.telemetry._internal.exporter.otlp.proto.metrics import MetricWriter
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import SpanWriter
+from snowflake.telemetry._internal.exporter.otlp.proto.writers._segment import (
+    SegmentFileWriter,
+    SegmentReader,
+    SyncPolicy,
+    segment_files,
+)
+from snowflake.telemetry._internal.serialize import Varint
+
+_logger = logging.getLogger(__name__)
+
+_WAL = "wal"
+_CHECKPOINT = "wal.checkpoint"
+_FORK_DIRECTORY = re.compile(r"^fork-(?P<pid>\d+)$")
+
+# The first byte of every WAL frame tells which writer method it goes to.
+_METHODS = ("write_span", "write_metrics", "write_logs")
+_TAGS = {method: bytes([tag]) for tag, method in enumerate(_METHODS)}
+
+_RETRY_INITIAL_DELAY = 0.1
+_RETRY_MAX_DELAY = 30.0
+
+
+def _frame_size(payload_size: int) -> int:
+    return Varint.size_varint_u32(payload_size) + payload_size
+
+
+class SpillingWriter(SpanWriter, MetricWriter, LogWriter):
+    """
+    A SpanWriter, MetricWriter and LogWriter that writes serialized payloads
+    with the writer you provide on a background thread, and spills them to a
+    write-ahead log on disk when the writer falls behind or fails.
+
+    Up to max_memory_payloads and max_memory_bytes are queued in memory.
+    Once the memory queue is full, payloads are appended to segment files in
+    directory instead, and keep going to disk until the log is replayed, so
+    that the writer receives all payloads in order. Failed writes are
+    retried with exponential backoff. The log is capped at max_disk_bytes,
+    payloads that do not fit are dropped; with max_age_millis, segments
+    that have not been written to for longer are dropped instead of being
+    replayed. Dropped payloads are counted in dropped_payloads.
+
+    The replay position is checkpointed after every payload. On shutdown,
+    payloads that could not be written in time are left in the log, and a
+    SpillingWriter created later with the same directory replays them
+    first, in the order they were received, including the payload that was
+    being written. Payloads may be written twice if the process crashes or
+    shuts down during a write.
+
+    A forked child neither writes the payloads queued by its parent nor
+    replays its log, it spills to the fork-<pid> subdirectory of directory
+    instead, which is only created once the child spills and is removed
+    when the child shuts down with nothing left to replay. Payloads left in
+    the fork-<pid> subdirectories of processes that are no longer running
+    are moved to the log of a SpillingWriter created later with directory,
+    and replayed by it.
+    """
+    def __init__(
+        self,
+        writer: typing.Union[SpanWriter, MetricWriter, LogWriter],
+        directory: str,
+        max_memory_payloads: int = 64,
+        max_memory_bytes: int = 8 * 1024 * 1024,
+        max_disk_bytes: int = 1024 * 1024 * 1024,
+        max_age_millis: typing.Optional[float] = None,
+        segment_size: int = 16 * 1024 * 1024,
+        sync_policy: SyncPolicy = SyncPolicy.INTERVAL,
+    ):
+        self._writer = writer
+        self._root = directory
+        self._directory = directory
+        self._max_memory_payloads = max_memory_payloads
+        self._max_memory_bytes = max_memory_bytes
+        self._max_disk_bytes = max_disk_bytes
+        self._max_age = max_age_millis / 1e3 if max_age_millis is not None else None
+        self._segment_size = segment_size
+        self._sync_policy = sync_policy
+        self._wal: typing.Optional[SegmentFileWriter] = SegmentFileWriter(
+            directory, segment_size=segment_size, sync_policy=sync_policy
+        )
+        self._condition = threading.Condition(threading.Lock())
+        self._memory: typing.Deque[typing.Tuple[str, bytes]] = collections.deque()
+        self._memory_bytes = 0
+        self._disk_payloads = 0
+        self._disk_bytes = 0
+        self._in_flight = False
+        # Whether the first payload of the memory queue is also the first
+        # payload of the log.
+        self._head_spilled = False
+        # Replay state, only used by the worker thread.
+        self._reader: typing.Optional[SegmentReader] = None
+        self._reader_offset = 0
+        self._worker: typing.Optional[threading.Thread] = None
+        self._shutdown = False
+        self.dropped_payloads = 0
+        self._recover()
+        fork.register(self)
+
+    def _at_fork_reinit(self) -> None:
+        self._condition = threading.Condition(threading.Lock())
+        self._memory = collections.deque()
+        self._memory_bytes = 0
+        self._in_flight = False
+        self._head_spilled = False
+        self._worker = None
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+        # The log of the parent is replayed by the parent only. The log of
+        # the child is created with its first spilled payload, next to the
+        # logs of the other children, even those of nested forks.
+        self._directory = os.path.join(self._root, f"fork-{os.getpid()}")
+        self._wal = None
+        self._disk_payloads = 0
+        self._disk_bytes = 0
+
+    @property
+    def disk_payloads(self) -> int:
+        return self._disk_payloads
+
+    @property
+    def disk_bytes(self) -> int:
+        return self._disk_bytes
+
+    def write_span(self, serialized_spans: bytes) -> None:
+        self._enqueue("write_span", serialized_spans)
+
+    def write_metrics(self, serialized_metrics: bytes) -> None:
+        self._enqueue("write_metrics", serialized_metrics)
+
+    def write_logs(self, serialized_logs: bytes) -> None:
+        self._enqueue("write_logs", serialized_logs)
+
+    def _recover(self) -> None:
+        for path, offset in self._unreplayed_segments(self._directory):
+            with SegmentReader(path) as reader:
+                sizes = [_frame_size(len(frame)) for _, frame in reader.frames(offset)]
+            self._disk_payloads += len(sizes)
+            self._disk_bytes += sum(sizes)
+        if self._disk_payloads:
+            _logger.info("Replaying %d payloads left in %s.", self._disk_payloads, self._directory)
+        self._adopt_fork_logs()
+        if self._disk_payloads:
+            self._start_worker()
+
+    def _unreplayed_segments(self, directory: str) -> typing.List[typing.Tuple[str, int]]:
+        """
+        Returns the segments of the log in directory with the offset of
+        their first payload that is not replayed yet.
+        """
+        checkpoint = self._read_checkpoint(directory)
+        return [
+            (path, checkpoint[1] if checkpoint and checkpoint[0] == os.path.basename(path) else 0)
+            for path in segment_files(directory, _WAL)
+        ]
+
+    def _adopt_fork_logs(self) -> None:
+        """
+        Moves the payloads left by forked children that are no longer
+        running to the log, and removes their directories.
+        """
+        for name in sorted(os.listdir(self._directory)):
+            match = _FORK_DIRECTORY.match(name)
+            directory = os.path.join(self._directory, name)
+            if match is None or not os.path.isdir(directory) or _is_running(int(match.group("pid"))):
+                continue
+            adopted = 0
+            with self._condition:
+                for path, offset in self._unreplayed_segments(directory):
+                    with SegmentReader(path) as reader:
+                        for _, frame in reader.frames(offset):
+                            method, payload = _METHODS[frame[0]], bytes(frame[1:])
+                            del frame
+                            if self._append(method, payload):
+                                adopted += 1
+                            else:
+                                self.dropped_payloads += 1
+            if adopted:
+                _logger.info("Replaying %d payloads left by a forked process in %s.", adopted, directory)
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def _log(self) -> SegmentFileWriter:
+        if self._wal is None:
+            self._wal = SegmentFileWriter(
+                self._directory, segment_size=self._segment_size, sync_policy=self._sync_policy
+            )
+        return self._wal
+
+    def _read_checkpoint(self, directory: str) -> typing.Optional[typing.Tuple[str, int]]:
+        try:
+            with open(os.path.join(directory, _CHECKPOINT), "r", encoding="utf-8") as file:
+                name, offset = file.read().split()
+            return name, int(offset)
+        except (OSError, ValueError):
+            return None
+
+    def _write_checkpoint(self, path: str, offset: int) -> None:
+        checkpoint = os.path.join(self._directory, _CHECKPOINT)
+        with open(checkpoint + ".tmp", "w", encoding="utf-8") as file:
+            file.write(f"{os.path.basename(path)} {offset}")
+        os.replace(checkpoint + ".tmp", checkpoint)
+
+    def _enqueue(self, method: str, payload: bytes) -> None:
+        with self._condition:
+            if self._shutdown:
+                self.dropped_payloads += 1
+                return
+            if self._worker is None:
+                self._start_worker()
+            if not self._disk_payloads and (
+                not self._memory
+                or (
+                    len(self._memory) < self._max_memory_payloads
+                    and self._memory_bytes + len(payload) <= self._max_memory_bytes
+                )
+            ):
+                self._memory.append((method, payload))
+                self._memory_bytes += len(payload)
+                self._condition.notify_all()
+                return
+            if self._memory:
+                # Everything queued after the payload being written moves
+                # to disk too, so that the log holds all the newer payloads
+                # in order. The payload being written stays queued, but is
+                # added to the log first, so that it keeps its place if the
+                # write does not complete before shutdown.
+                in_flight = self._memory.popleft() if self._in_flight else None
+                if self._head_spilled:
+                    if in_flight is None:
+                        # Its write failed, it is replayed from the log.
+                        self._memory.popleft()
+                        self._head_spilled = False
+                elif in_flight is not None and not self._disk_payloads:
+                    self._head_spilled = self._append(*in_flight)
+                while self._memory:
+                    queued_method, queued_payload = self._memory.popleft()
+                    self._spill(queued_method, queued_payload)
+                if in_flight is not None:
+                    self._memory.append(in_flight)
+                self._memory_bytes = len(in_flight[1]) if in_flight is not None else 0
+            self._spill(method, payload)
+
+    def _spill(self, method: str, payload: bytes) -> None:
+        if not self._append(method, payload):
+            self.dropped_payloads += 1
+
+    def _append(self, method: str, payload: bytes) -> bool:
+        """Appends a payload to the log, returning whether it fit."""
+        size = _frame_size(len(payload) + 1)
+        if self._disk_bytes + size > self._max_disk_bytes:
+            return False
+        try:
+            self._log().append(_WAL, _TAGS[method] + payload)
+        # pylint: disable=broad-exception-caught
+        except Exception:
+            _logger.exception("Exception while spilling serialized payload to disk.")
+            return False
+        self._disk_payloads += 1
+        self._disk_bytes += size
+        self._condition.notify_all()
+        return True
+
+    def _start_worker(self) -> None:
+        self._worker = threading.Thread(
+            name="SpillingWriter", target=self._run, daemon=True
+        )
+        self._worker.start()
+
+    def _next_disk_payload(self) -> typing.Optional[typing.Tuple[str, bytes, int]]:
+        """
+        Returns the next payload of the log with the offset of the frame
+        after it, without consuming it.
+        """
+        while True:
+            if self._reader is None:
+                paths = segment_files(self._directory, _WAL)
+                if not paths:
+                    return None
+                if paths[0] == self._wal.current_segment(_WAL):
+                    # Segments are only read once they are closed.
+                    self._wal.rotate(_WAL)
+                checkpoint = self._read_checkpoint(self._directory)
+                self._reader = SegmentReader(paths[0])
+                self._reader_offset = (
+                    checkpoint[1] if checkpoint and checkpoint[0] == os.path.basename(paths[0]) else 0
+                )
+                if self._max_age is not None and time.time() - os.path.getmtime(paths[0]) > self._max_age:
+                    self._discard_segment()
+                    continue
+            for offset, frame in self._reader.frames(self._reader_offset):
+                next_offset = offset + _frame_size(len(frame))
+                method, payload = _METHODS[frame[0]], bytes(frame[1:])
+                del frame
+                return method, payload, next_offset
+            self._close_segment()
+
+    def _skip_disk_payload(self) -> None:
+        """
+        Consumes the first payload of the log, which was written from
+        memory.
+        """
+        next_payload = self._next_disk_payload()
+        if next_payload is not None:
+            _, payload, next_offset = next_payload
+            self._reader_offset = next_offset
+            self._write_checkpoint(self._reader.path, next_offset)
+        with self._condition:
+            if next_payload is not None:
+                self._disk_payloads -= 1
+                self._disk_bytes -= _frame_size(len(payload) + 1)
+            self._in_flight = False
+            self._condition.notify_all()
+
+    def _discard_segment(self) -> None:
+        sizes = [_frame_size(len(frame)) for _, frame in self._reader.frames(self._reader_offset)]
+        _logger.warning("Dropping %d payloads older than max_age_millis from %s.", len(sizes), self._reader.path)
+        with self._condition:
+            self._disk_payloads -= len(sizes)
+            self._disk_bytes -= sum(sizes)
+            self.dropped_payloads += len(sizes)
+            self._condition.notify_all()
+        self._close_segment()
+
+    def _close_segment(self) -> None:
+        path = self._reader.path
+        self._reader.close()
+        self._reader = None
+        os.remove(path)
+
+    def _run(self) -> None:
+        retry_delay = _RETRY_INITIAL_DELAY
+        while True:
+            with self._condition:
+                while not self._memory and not self._disk_payloads and not self._shutdown:
+                    self._condition.wait()
+                if self._shutdown:
+                    return
+                item = self._memory[0] if self._memory else None
+                self._in_flight = True
+            if item is not None:
+                method, payload = item
+            else:
+                next_payload = self._next_disk_payload()
+                if next_payload is None:
+                    # Only happens when the log files were removed.
+                    with self._condition:
+                        self._disk_payloads = 0
+                        self._disk_bytes = 0
+                        self._in_flight = False
+                        self._condition.notify_all()
+                    continue
+                method, payload, next_offset = next_payload
+            try:
+                getattr(self._writer, method)(payload)
+            # pylint: disable=broad-exception-caught
+            except Exception:
+                _logger.exception("Exception while writing serialized payload, retrying in %.1fs.", retry_delay)
+                with self._condition:
+                    self._in_flight = False
+                    self._condition.notify_all()
+                    self._condition.wait_for(lambda: self._shutdown, retry_delay)
+                retry_delay = min(retry_delay * 2, _RETRY_MAX_DELAY)
+                continue
+            retry_delay = _RETRY_INITIAL_DELAY
+            if item is None:
+                self._reader_offset = next_offset
+                self._write_checkpoint(self._reader.path, next_offset)
+            skip = False
+            with self._condition:
+                if item is not None:
+                    if self._memory and self._memory[0] is item:
+                        self._memory.popleft()
+                        self._memory_bytes -= len(payload)
+                        skip, self._head_spilled = self._head_spilled, False
+                else:
+                    self._disk_payloads -= 1
+                    self._disk_bytes -= _frame_size(len(payload) + 1)
+                self._in_flight = skip
+                self._condition.notify_all()
+            if skip:
+                self._skip_disk_payload()
+
+    def force_flush(self, timeout_millis: float = 30_000) -> bool:
+        deadline = time.monotonic() + timeout_millis / 1e3
+        with self._condition:
+            while self._memory or self._disk_payloads or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        remaining_millis = max(deadline - time.monotonic(), 0) * 1e3
+        return self._writer.force_flush(remaining_millis) and (
+            self._wal is None or self._wal.force_flush(remaining_millis)
+        )
+
+    def shutdown(self, timeout_millis: float = 30_000) -> None:
+        deadline = time.monotonic() + timeout_millis / 1e3
+        self.force_flush(timeout_millis)
+        with self._condition:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            self._condition.notify_all()
+        if self._worker is not None:
+            self._worker.join(max(deadline - time.monotonic(), 0))
+        with self._condition:
+            # Whatever is left is replayed by the next SpillingWriter.
+            memory = list(self._memory)
+            if self._head_spilled:
+                # Already first in the log.
+                del memory[0]
+                self._head_spilled = False
+            self._memory.clear()
+            self._memory_bytes = 0
+            for method, payload in memory:
+                self._spill(method, payload)
+            if self._memory or self._disk_payloads:
+                _logger.warning(
+                    "%d payloads are left in %s to be written later.",
+                    self._disk_payloads,
+                    self._directory,
+                )
+        if self._reader is not None and not (self._worker and self._worker.is_alive()):
+            self._reader.close()
+            self._reader = None
+        if self._wal is not None:
+            self._wal.shutdown()
+            if self._directory != self._root and not self._disk_payloads:
+                # Nothing is left in the log of this forked child.
+                shutil.rmtree(self._directory, ignore_errors=True)
+        self._writer.shutdown(max(deadline - time.monotonic(), 0) * 1e3)
+
+
+def _is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
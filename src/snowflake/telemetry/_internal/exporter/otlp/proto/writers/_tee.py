@@ -0,0 +1,76 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+import time
+import typing
+
+from snowflake.telemetry._internal.exporter.otlp.proto.logs import LogWriter
+from snowflake.telemetry._internal.exporter.otlp.proto.metrics import MetricWriter
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import SpanWriter
+from snowflake.telemetry._internal.exporter.otlp.proto.writers._batching import (
+    BackpressurePolicy,
+    BatchingWriter,
+)
+
+
+class TeeWriter(SpanWriter, MetricWriter, LogWriter):
+    """
+    A SpanWriter, MetricWriter and LogWriter that writes every serialized
+    payload to several writers, so that spans, metrics and logs are
+    serialized once for all of them.
+
+    Each writer gets its own queue and background thread, see
+    BatchingWriter: the writers run concurrently and share the same
+    immutable bytes object, and a slow or failing writer only fills or
+    fails its own queue without delaying the others. Writers that are
+    already BatchingWriters are used as is, which lets you choose a queue
+    size and policy per writer, e.g. BackpressurePolicy.BLOCK for the
+    primary sink and the default DROP_NEWEST for a debug sink. The other
+    writers are wrapped with the given queue settings.
+
+    Use sinks to read the dropped and failed payload counters of each
+    writer.
+    """
+    def __init__(
+        self,
+        writers: typing.Sequence[typing.Union[SpanWriter, MetricWriter, LogWriter]],
+        max_queue_size: int = 2048,
+        max_queue_bytes: int = 64 * 1024 * 1024,
+        policy: BackpressurePolicy = BackpressurePolicy.DROP_NEWEST,
+    ):
+        if not writers:
+            raise ValueError("TeeWriter requires at least one writer")
+        self.sinks: typing.List[BatchingWriter] = [
+            writer
+            if isinstance(writer, BatchingWriter)
+            else BatchingWriter(writer, max_queue_size, max_queue_bytes, policy)
+            for writer in writers
+        ]
+
+    def write_span(self, serialized_spans: bytes) -> None:
+        for sink in self.sinks:
+            sink.write_span(serialized_spans)
+
+    def write_metrics(self, serialized_metrics: bytes) -> None:
+        for sink in self.sinks:
+            sink.write_metrics(serialized_metrics)
+
+    def write_logs(self, serialized_logs: bytes) -> None:
+        for sink in self.sinks:
+            sink.write_logs(serialized_logs)
+
+    def force_flush(self, timeout_millis: float = 30_000) -> bool:
+        # The sinks drain concurrently, so waiting for them one after the
+        # other takes as long as the slowest one.
+        deadline = time.monotonic() + timeout_millis / 1e3
+        flushed = True
+        for sink in self.sinks:
+            remaining_millis = max(deadline - time.monotonic(), 0) * 1e3
+            flushed = sink.force_flush(remaining_millis) and flushed
+        return flushed
+
+    def shutdown(self, timeout_millis: float = 30_000) -> None:
+        deadline = time.monotonic() + timeout_millis / 1e3
+        for sink in self.sinks:
+            sink.shutdown(max(deadline - time.monotonic(), 0) * 1e3)
@@ -0,0 +1,210 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+import itertools
+import mmap
+import os
+import struct
+import typing
+
+from snowflake.telemetry._internal.exporter.otlp.proto.writers._segment import (
+    SPANS,
+    SegmentFileWriter,
+    SegmentReader,
+    _Segment,
+    segment_files,
+)
+from snowflake.telemetry._internal.serialize.wire import (
+    WIRE_TYPE_LEN,
+    filter_otlp_data,
+    iter_fields,
+    iter_otlp_items,
+    merge_otlp_data,
+)
+
+# The length of the segment data covered by the index, followed by the
+# records: trace_id, frame offset. Big endian, so that records sort by
+# trace_id.
+_HEADER = struct.Struct(">Q")
+_RECORD = struct.Struct(">16sQ")
+_INDEX_SUFFIX = ".index"
+
+TraceId = typing.Union[int, bytes]
+
+
+def _trace_id_bytes(trace_id: TraceId) -> bytes:
+    if isinstance(trace_id, int):
+        return trace_id.to_bytes(16, "big")
+    return bytes(trace_id)
+
+
+def _span_trace_id(span: memoryview) -> bytes:
+    for field_number, wire_type, _, value_start, field_end in iter_fields(span):
+        if field_number == 1 and wire_type == WIRE_TYPE_LEN:
+            return bytes(span[value_start:field_end])
+    return b""
+
+
+def span_trace_ids(serialized_spans: bytes) -> typing.List[bytes]:
+    """
+    Returns the distinct trace ids of the spans in a serialized TracesData
+    message, in the order they first appear.
+    """
+    return list(dict.fromkeys(_span_trace_id(span) for span in iter_otlp_items(serialized_spans)))
+
+
+def index_path(segment_path: str) -> str:
+    """Returns the path of the trace index of a segment file."""
+    return os.path.splitext(segment_path)[0] + _INDEX_SUFFIX
+
+
+def _scan_segment(segment_path: str, offset: int = 0) -> typing.List[typing.Tuple[bytes, int]]:
+    with SegmentReader(segment_path) as reader:
+        return [
+            (trace_id, frame_offset)
+            for frame_offset, payload in reader.frames(offset)
+            for trace_id in span_trace_ids(payload)
+        ]
+
+
+def write_index(
+    segment_path: str,
+    entries: typing.Iterable[typing.Tuple[bytes, int]],
+    indexed_length: int,
+) -> None:
+    """
+    Writes the sorted trace index of the first indexed_length bytes of a
+    segment file. The index is replaced atomically, so that readers never
+    see a partial index.
+    """
+    path = index_path(segment_path)
+    records = b"".join(_RECORD.pack(trace_id, offset) for trace_id, offset in sorted(entries))
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(_HEADER.pack(indexed_length) + records)
+    os.replace(tmp_path, path)
+
+
+def _search_index(path: str, trace_id: bytes) -> typing.Tuple[typing.List[int], int]:
+    """
+    Returns the frame offsets of trace_id in the index and the length of
+    the segment data the index covers.
+    """
+    with open(path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if size < _HEADER.size:
+            return [], 0
+        if size < _HEADER.size + _RECORD.size:
+            (indexed_length,) = _HEADER.unpack(file.read(_HEADER.size))
+            return [], indexed_length
+        with mmap.mmap(file.fileno(), size, access=mmap.ACCESS_READ) as records:
+            (indexed_length,) = _HEADER.unpack_from(records)
+            # Finds the first record of trace_id with a binary search.
+            low, high = 0, (size - _HEADER.size) // _RECORD.size
+            while low < high:
+                middle = (low + high) // 2
+                start = _HEADER.size + middle * _RECORD.size
+                if records[start:start + 16] < trace_id:
+                    low = middle + 1
+                else:
+                    high = middle
+            offsets = []
+            for position in range(_HEADER.size + low * _RECORD.size, size, _RECORD.size):
+                record_trace_id, offset = _RECORD.unpack_from(records, position)
+                if record_trace_id != trace_id:
+                    break
+                offsets.append(offset)
+            return offsets, indexed_length
+
+
+class TraceIndexingWriter(SegmentFileWriter):
+    """
+    A SegmentFileWriter that maintains a trace index next to every span
+    segment, to find the spans of a trace without scanning the segments.
+
+    The trace ids of every payload are collected while it is written. The
+    index of a segment is a sorted array of (trace_id, offset) records
+    written to <signal>-<sequence>.index when the segment is closed and on
+    force_flush(), together with the length of the segment data it covers.
+    Use TraceIndex to query it.
+    """
+    def __init__(self, directory: str, **kwargs):
+        super().__init__(directory, **kwargs)
+        self._index_entries: typing.Dict[str, typing.List[typing.Tuple[bytes, int]]] = {}
+
+    def _at_fork_reinit(self) -> None:
+        super()._at_fork_reinit()
+        self._index_entries = {}
+
+    def write_span(self, serialized_spans: bytes) -> None:
+        if not serialized_spans:
+            return
+        trace_ids = span_trace_ids(serialized_spans)
+        with self._lock:
+            path, offset = self._append_locked(SPANS, serialized_spans)
+            self._index_entries.setdefault(path, []).extend(
+                (trace_id, offset) for trace_id in trace_ids
+            )
+
+    def _close_segment(self, signal: str, segment: _Segment) -> None:
+        super()._close_segment(signal, segment)
+        entries = self._index_entries.pop(segment.path, None)
+        if entries is not None:
+            write_index(segment.path, entries, segment.position)
+
+    def force_flush(self, timeout_millis: float = 30_000) -> bool:
+        flushed = super().force_flush(timeout_millis)
+        with self._lock:
+            for segment in self._segments.values():
+                entries = self._index_entries.get(segment.path)
+                if entries is not None:
+                    write_index(segment.path, entries, segment.position)
+        return flushed
+
+
+class TraceIndex:
+    """
+    Finds the spans of a trace in the span segments of a directory written
+    by a TraceIndexingWriter.
+
+    Each segment index is searched with a binary search over a memory map.
+    The part of a segment written after its index, e.g. after the last
+    force_flush() of a segment that is still open or was left behind by a
+    crash, is scanned, as are segments without an index.
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def locate(self, trace_id: TraceId) -> typing.List[typing.Tuple[str, int]]:
+        """
+        Returns the segment path and frame offset of every payload that
+        contains spans of the trace, in the order they were written.
+        """
+        trace_id = _trace_id_bytes(trace_id)
+        locations = []
+        for segment_path in segment_files(self.directory, SPANS):
+            path = index_path(segment_path)
+            offsets, indexed_length = _search_index(path, trace_id) if os.path.exists(path) else ([], 0)
+            offsets.extend(
+                offset for entry_trace_id, offset in _scan_segment(segment_path, indexed_length)
+                if entry_trace_id == trace_id
+            )
+            locations.extend((segment_path, offset) for offset in sorted(offsets))
+        return locations
+
+    def read_trace(self, trace_id: TraceId) -> bytes:
+        """
+        Returns a serialized TracesData message with all the spans of the
+        trace, grouped by resource and scope.
+        """
+        trace_id = _trace_id_bytes(trace_id)
+
+        def in_trace(span: memoryview) -> bool:
+            return _span_trace_id(span) == trace_id
+
+        payloads = []
+        for segment_path, locations in itertools.groupby(self.locate(trace_id), key=lambda location: location[0]):
+            with SegmentReader(segment_path) as reader:
+                payloads.extend(filter_otlp_data(reader.read(offset), in_trace) for _, offset in locations)
+        return merge_otlp_data(payloads)
@@ -0,0 +1,55 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+"""
+Reinitialization of exporters, writers and id generators in forked children.
+
+os.fork() copies the buffers, caches, locks and random state of the parent
+into the child, but none of its threads. Left alone, the child exports the
+payloads the parent buffered a second time, waits forever on locks held by
+threads that only exist in the parent, and generates the same trace ids as
+the parent.
+
+Objects that hold such state call register() and implement
+_at_fork_reinit(), which is called in the child right after a fork, like the
+method of the same name of the threading locks. It discards what was
+inherited and leaves background threads to be started again lazily.
+"""
+
+import logging
+import os
+import threading
+import typing
+import weakref
+
+_logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_instances: "weakref.WeakSet[typing.Any]" = weakref.WeakSet()
+
+
+def register(instance: typing.Any) -> None:
+    """
+    Calls instance._at_fork_reinit() in the child after every fork, for as
+    long as instance is alive.
+    """
+    with _lock:
+        _instances.add(instance)
+
+
+def _reinit_in_child() -> None:
+    global _lock  # pylint: disable=global-statement
+    # Another thread may have held the lock during the fork.
+    _lock = threading.Lock()
+    for instance in list(_instances):
+        try:
+            instance._at_fork_reinit()  # pylint: disable=protected-access
+        # pylint: disable=broad-exception-caught
+        except Exception:
+            _logger.exception("Exception while reinitializing %s after fork.", type(instance).__name__)
+
+
+# os.register_at_fork() does not exist on Windows, which has no fork.
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_in_child)
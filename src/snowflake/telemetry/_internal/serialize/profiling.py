@@ -0,0 +1,263 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+"""
+Per message class profiling of the generated marshalers.
+
+enable() replaces the __init__, calculate_size and write_to methods of every
+generated MessageMarshaler class with instrumented versions that count the
+objects constructed, the bytes written and the calls and time spent in
+calculate_size and write_to. disable() puts the generated methods back, so
+profiling costs nothing while it is off. report() formats the counts as a
+table:
+
+    from snowflake.telemetry._internal.serialize import profiling
+
+    with profiling.profile():
+        exporter.export(spans)
+    print(profiling.report())
+
+The time of a method includes the time spent in the same method of the
+nested messages, the self time does not. Messages of the same class nested
+in each other, e.g. AnyValue in ArrayValue, count their time once per level.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import functools
+import importlib
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Type
+
+from snowflake.telemetry._internal.serialize import MessageMarshaler
+
+_MARSHALER_MODULES = (
+    "snowflake.telemetry._internal.opentelemetry.proto.common.v1.common_marshaler",
+    "snowflake.telemetry._internal.opentelemetry.proto.resource.v1.resource_marshaler",
+    "snowflake.telemetry._internal.opentelemetry.proto.trace.v1.trace_marshaler",
+    "snowflake.telemetry._internal.opentelemetry.proto.metrics.v1.metrics_marshaler",
+    "snowflake.telemetry._internal.opentelemetry.proto.logs.v1.logs_marshaler",
+    "snowflake.telemetry._internal.opentelemetry.proto.collector.trace.v1.trace_service_marshaler",
+    "snowflake.telemetry._internal.opentelemetry.proto.collector.metrics.v1.metrics_service_marshaler",
+    "snowflake.telemetry._internal.opentelemetry.proto.collector.logs.v1.logs_service_marshaler",
+)
+
+_COLUMNS = ("objects", "bytes", "size calls", "size s", "write calls", "write s", "self s")
+
+
+class MarshalerProfile(NamedTuple):
+    """The counts of one message class."""
+    objects: int
+    bytes_written: int
+    size_calls: int
+    size_seconds: float
+    write_calls: int
+    write_seconds: float
+    self_seconds: float
+
+
+class _Counts:
+    __slots__ = (
+        "objects", "bytes_written", "size_calls", "size_seconds",
+        "write_calls", "write_seconds", "self_seconds",
+    )
+
+    def __init__(self):
+        self.objects = 0
+        self.bytes_written = 0
+        self.size_calls = 0
+        self.size_seconds = 0.0
+        self.write_calls = 0
+        self.write_seconds = 0.0
+        self.self_seconds = 0.0
+
+
+_lock = threading.Lock()
+_local = threading.local()
+_counts: Dict[Type[MessageMarshaler], _Counts] = {}
+# The generated methods of the instrumented classes.
+_originals: Dict[Type[MessageMarshaler], Dict[str, Callable]] = {}
+
+
+def _marshaler_classes() -> List[Type[MessageMarshaler]]:
+    for module in _MARSHALER_MODULES:
+        importlib.import_module(module)
+    classes = []
+    pending = list(MessageMarshaler.__subclasses__())
+    while pending:
+        cls = pending.pop()
+        classes.append(cls)
+        pending.extend(cls.__subclasses__())
+    return classes
+
+
+def _children_time() -> List[float]:
+    # One entry per instrumented call on the stack of this thread, summing
+    # up the time of the calls it made.
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _instrument_init(counts: _Counts, init: Callable) -> Callable:
+    @functools.wraps(init)
+    def __init__(self, *args, **kwargs):
+        init(self, *args, **kwargs)
+        with _lock:
+            counts.objects += 1
+    return __init__
+
+
+def _instrument_calculate_size(counts: _Counts, calculate_size: Callable) -> Callable:
+    @functools.wraps(calculate_size)
+    def calculate_size_wrapper(self):
+        stack = _children_time()
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return calculate_size(self)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            with _lock:
+                counts.size_calls += 1
+                counts.size_seconds += elapsed
+                counts.self_seconds += elapsed - children
+    return calculate_size_wrapper
+
+
+def _instrument_write_to(counts: _Counts, write_to: Callable) -> Callable:
+    @functools.wraps(write_to)
+    def write_to_wrapper(self, out):
+        stack = _children_time()
+        stack.append(0.0)
+        before = len(out)
+        start = time.perf_counter()
+        try:
+            return write_to(self, out)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            with _lock:
+                counts.write_calls += 1
+                counts.write_seconds += elapsed
+                counts.self_seconds += elapsed - children
+                counts.bytes_written += len(out) - before
+    return write_to_wrapper
+
+
+def enable() -> None:
+    """
+    Instruments the generated marshaler classes. Counting continues where
+    it stopped if profiling was enabled before, see reset().
+    """
+    with _lock:
+        if _originals:
+            return
+        for cls in _marshaler_classes():
+            originals = {
+                name: cls.__dict__[name]
+                for name in ("__init__", "calculate_size", "write_to")
+                if name in cls.__dict__
+            }
+            if not originals:
+                continue
+            counts = _counts.setdefault(cls, _Counts())
+            _originals[cls] = originals
+            if "__init__" in originals:
+                cls.__init__ = _instrument_init(counts, originals["__init__"])
+            if "calculate_size" in originals:
+                cls.calculate_size = _instrument_calculate_size(counts, originals["calculate_size"])
+            if "write_to" in originals:
+                cls.write_to = _instrument_write_to(counts, originals["write_to"])
+
+
+def disable() -> None:
+    """Restores the generated methods, keeping the counts."""
+    with _lock:
+        for cls, originals in _originals.items():
+            for name, method in originals.items():
+                setattr(cls, name, method)
+        _originals.clear()
+
+
+def is_enabled() -> bool:
+    return bool(_originals)
+
+
+def reset() -> None:
+    """Sets all counts back to zero."""
+    with _lock:
+        for counts in _counts.values():
+            counts.__init__()
+
+
+@contextlib.contextmanager
+def profile(reset_counts: bool = True) -> Iterator[None]:
+    """Profiles the marshalers for the duration of the with block."""
+    if reset_counts:
+        reset()
+    enable()
+    try:
+        yield
+    finally:
+        disable()
+
+
+def snapshot() -> Dict[str, MarshalerProfile]:
+    """
+    Returns the counts of every message class that was used, by qualified
+    class name.
+    """
+    with _lock:
+        return {
+            cls.__qualname__: MarshalerProfile(
+                counts.objects,
+                counts.bytes_written,
+                counts.size_calls,
+                counts.size_seconds,
+                counts.write_calls,
+                counts.write_seconds,
+                counts.self_seconds,
+            )
+            for cls, counts in _counts.items()
+            if counts.objects or counts.size_calls or counts.write_calls
+        }
+
+
+def report(limit: Optional[int] = None) -> str:
+    """
+    Returns the counts as a table, the message classes with the highest
+    self time first.
+    """
+    rows = sorted(snapshot().items(), key=lambda item: item[1].self_seconds, reverse=True)
+    if limit is not None:
+        rows = rows[:limit]
+    cells = [("class",) + _COLUMNS]
+    for name, counts in rows:
+        cells.append((
+            name,
+            str(counts.objects),
+            str(counts.bytes_written),
+            str(counts.size_calls),
+            f"{counts.size_seconds:.6f}",
+            str(counts.write_calls),
+            f"{counts.write_seconds:.6f}",
+            f"{counts.self_seconds:.6f}",
+        ))
+    widths = [max(len(row[column]) for row in cells) for column in range(len(cells[0]))]
+    return "\n".join(
+        "  ".join(
+            cell.ljust(width) if column == 0 else cell.rjust(width)
+            for column, (cell, width) in enumerate(zip(row, widths))
+        )
+        for row in cells
+    )
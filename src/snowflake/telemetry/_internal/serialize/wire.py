@@ -0,0 +1,231 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+"""
+Helpers to work with serialized protobuf messages without deserializing
+them into marshaler objects.
+
+The OTLP data messages (TracesData, MetricsData and LogsData) share the same
+layout on the wire:
+
+    XxxData:          repeated ResourceXxx = 1
+    ResourceXxx:      Resource resource = 1, repeated ScopeXxx = 2, string schema_url = 3
+    ScopeXxx:         InstrumentationScope scope = 1, repeated Xxx = 2, string schema_url = 3
+
+which lets the functions in this module handle all signals the same way.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from snowflake.telemetry._internal.serialize import Varint
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+WIRE_TYPE_VARINT = 0
+WIRE_TYPE_I64 = 1
+WIRE_TYPE_LEN = 2
+WIRE_TYPE_I32 = 5
+
+
+def read_varint(data: Buffer, pos: int) -> Tuple[int, int]:
+    """
+    Decodes the varint starting at pos. Returns the value and the position
+    right after the varint.
+    """
+    result = 0
+    shift = 0
+    try:
+        while True:
+            b = data[pos]
+            pos += 1
+            result |= (b & 0x7F) << shift
+            if b < 128:
+                return result, pos
+            shift += 7
+    except IndexError:
+        raise ValueError("truncated varint") from None
+
+
+def iter_fields(data: Buffer, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, int, int, int, int]]:
+    """
+    Iterates over the fields of the serialized message in data[start:end].
+    Yields (field_number, wire_type, field_start, value_start, field_end)
+    for every field, where data[field_start:field_end] is the whole field
+    including its tag, and data[value_start:field_end] is the value of a
+    length delimited field.
+    """
+    pos = start
+    end = len(data) if end is None else end
+    while pos < end:
+        field_start = pos
+        key, pos = read_varint(data, pos)
+        wire_type = key & 7
+        if wire_type == WIRE_TYPE_LEN:
+            length, pos = read_varint(data, pos)
+            value_start = pos
+            pos += length
+        elif wire_type == WIRE_TYPE_VARINT:
+            value_start = pos
+            _, pos = read_varint(data, pos)
+        elif wire_type == WIRE_TYPE_I64:
+            value_start = pos
+            pos += 8
+        elif wire_type == WIRE_TYPE_I32:
+            value_start = pos
+            pos += 4
+        else:
+            raise ValueError(f"unsupported wire type {wire_type}")
+        if pos > end:
+            raise ValueError("truncated message")
+        yield key >> 3, wire_type, field_start, value_start, pos
+
+
+def write_length_delimited(out: bytearray, tag: bytes, data: Buffer) -> None:
+    out += tag
+    Varint.write_varint_u32(out, len(data))
+    out += data
+
+
+_TAG_1 = b"\n"
+_TAG_2 = b"\x12"
+
+
+class _Group:
+    """
+    A ResourceXxx or ScopeXxx message split into its header fields (the
+    resource or scope and the schema_url) and its repeated children.
+    """
+    __slots__ = ("header", "trailer", "children")
+
+    def __init__(self, header: bytes, trailer: bytes, children):
+        self.header = header
+        self.trailer = trailer
+        self.children = children
+
+
+def _split_group(data: memoryview, start: int, end: int) -> Optional[Tuple[bytes, bytes, List[Tuple[int, int]]]]:
+    header = b""
+    trailer = b""
+    children = []
+    for field_number, wire_type, field_start, value_start, field_end in iter_fields(data, start, end):
+        if wire_type != WIRE_TYPE_LEN:
+            return None
+        if field_number == 1:
+            header = bytes(data[field_start:field_end])
+        elif field_number == 2:
+            children.append((value_start, field_end))
+        elif field_number == 3:
+            trailer = bytes(data[field_start:field_end])
+        else:
+            return None
+    return header, trailer, children
+
+
+def merge_otlp_data(payloads: Sequence[Buffer]) -> bytes:
+    """
+    Merges serialized TracesData, MetricsData or LogsData messages of the
+    same signal into one message, in which all the spans, metrics or log
+    records that share an identical resource (and schema_url) and an
+    identical instrumentation scope (and schema_url) are grouped under a
+    single ResourceXxx and ScopeXxx header.
+
+    The order of the items is preserved within each resource and scope.
+    Entries with fields this function does not know about are copied as is.
+    """
+    resources: Dict[Tuple[bytes, bytes], _Group] = {}
+    order: List[Union[_Group, bytes]] = []
+    for payload in payloads:
+        data = memoryview(payload)
+        for field_number, wire_type, field_start, value_start, field_end in iter_fields(data):
+            split = None
+            if field_number == 1 and wire_type == WIRE_TYPE_LEN:
+                split = _split_group(data, value_start, field_end)
+            if split is None:
+                order.append(bytes(data[field_start:field_end]))
+                continue
+            header, trailer, scopes = split
+            resource = resources.get((header, trailer))
+            if resource is None:
+                resource = resources[(header, trailer)] = _Group(header, trailer, {})
+                order.append(resource)
+            for scope_start, scope_end in scopes:
+                scope_split = _split_group(data, scope_start, scope_end)
+                if scope_split is None:
+                    # Copied as is into a scope of its own.
+                    resource.children[object()] = _Group(bytes(data[scope_start:scope_end]), b"", [])
+                    continue
+                scope_header, scope_trailer, items = scope_split
+                scope = resource.children.get((scope_header, scope_trailer))
+                if scope is None:
+                    scope = resource.children[(scope_header, scope_trailer)] = _Group(scope_header, scope_trailer, [])
+                scope.children.extend(data[item_start:item_end] for item_start, item_end in items)
+
+    out = bytearray()
+    for entry in order:
+        if isinstance(entry, bytes):
+            out += entry
+            continue
+        resource_body = bytearray(entry.header)
+        for scope in entry.children.values():
+            scope_body = bytearray(scope.header)
+            for item in scope.children:
+                write_length_delimited(scope_body, _TAG_2, item)
+            scope_body += scope.trailer
+            write_length_delimited(resource_body, _TAG_2, scope_body)
+        resource_body += entry.trailer
+        write_length_delimited(out, _TAG_1, resource_body)
+    return bytes(out)
+
+
+def iter_otlp_items(payload: Buffer) -> Iterator[memoryview]:
+    """
+    Iterates over the spans, metrics or log records of a serialized
+    TracesData, MetricsData or LogsData message, without copying them.
+    """
+    data = memoryview(payload)
+    for field_number, wire_type, _, value_start, field_end in iter_fields(data):
+        if field_number != 1 or wire_type != WIRE_TYPE_LEN:
+            continue
+        for field_number, wire_type, _, scope_start, scope_end in iter_fields(data, value_start, field_end):
+            if field_number != 2 or wire_type != WIRE_TYPE_LEN:
+                continue
+            for field_number, wire_type, _, item_start, item_end in iter_fields(data, scope_start, scope_end):
+                if field_number == 2 and wire_type == WIRE_TYPE_LEN:
+                    yield data[item_start:item_end]
+
+
+def filter_otlp_data(payload: Buffer, predicate: Callable[[memoryview], bool]) -> bytes:
+    """
+    Returns a copy of a serialized TracesData, MetricsData or LogsData
+    message that only contains the spans, metrics or log records for which
+    predicate returns True. Scopes and resources left without items are
+    dropped.
+    """
+    data = memoryview(payload)
+    out = bytearray()
+    for field_number, wire_type, _, value_start, field_end in iter_fields(data):
+        split = None
+        if field_number == 1 and wire_type == WIRE_TYPE_LEN:
+            split = _split_group(data, value_start, field_end)
+        if split is None:
+            continue
+        header, trailer, scopes = split
+        resource_body = bytearray()
+        for scope_start, scope_end in scopes:
+            scope_split = _split_group(data, scope_start, scope_end)
+            if scope_split is None:
+                continue
+            scope_header, scope_trailer, items = scope_split
+            scope_body = bytearray()
+            for item_start, item_end in items:
+                item = data[item_start:item_end]
+                if predicate(item):
+                    write_length_delimited(scope_body, _TAG_2, item)
+            if scope_body:
+                write_length_delimited(resource_body, _TAG_2, scope_header + scope_body + scope_trailer)
+        if resource_body:
+            write_length_delimited(out, _TAG_1, header + resource_body + trailer)
+    return bytes(out)
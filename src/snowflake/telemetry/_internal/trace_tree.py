@@ -0,0 +1,299 @@
+#
+# Copyright (c) 2012-2026 Snowflake Computing Inc. All rights reserved.
+#
+
+"""
+Assembles spans into parent/child trees.
+
+A TraceForest holds the spans of any number of traces in parallel arrays
+indexed by the position of the span, with the children of every span in one
+array sliced by offsets, so millions of spans take a few dozen bytes each.
+The spans are linked in two passes over the arrays, which does not depend
+on the order they arrive in, and every traversal uses an explicit stack, so
+deep traces do not run into the recursion limit:
+
+    forest = TraceForest.from_spans(spans)
+    for root in forest.roots:
+        print([forest.name(span) for span in forest.critical_path(root)])
+"""
+
+import array
+import struct
+import typing
+
+from opentelemetry.sdk.trace import ReadableSpan
+from snowflake.telemetry._internal.serialize.wire import (
+    WIRE_TYPE_I64,
+    WIRE_TYPE_LEN,
+    Buffer,
+    iter_fields,
+    iter_otlp_items,
+)
+
+_fixed64 = struct.Struct("<Q").unpack_from
+
+
+class NameStats(typing.NamedTuple):
+    """The aggregates of the spans of one name, durations in nanoseconds."""
+    count: int
+    total_duration: int
+    self_time: int
+    max_duration: int
+
+
+class TraceForest:
+    """
+    The spans of one or more traces, linked into trees.
+
+    Spans are referred to by their index, the order they were added in.
+    parents[i] is the index of the parent of span i, or -1 for roots.
+    Spans whose parent is not among the spans, and spans of a parent cycle
+    in corrupt data, become roots and are also listed in orphans.
+    Children are ordered by start time.
+    """
+    def __init__(self):
+        self.names: typing.List[str] = []
+        self._name_indexes: typing.Dict[typing.Any, int] = {}
+        self._span_names = array.array("I")
+        self._trace_ids_high = array.array("Q")
+        self._trace_ids_low = array.array("Q")
+        self._span_ids = array.array("Q")
+        self._parent_span_ids = array.array("Q")
+        self.start_times = array.array("Q")
+        self.end_times = array.array("Q")
+        self.parents = array.array("q")
+        self.roots = array.array("I")
+        self.orphans = array.array("I")
+        self._child_offsets = array.array("I", [0])
+        self._children = array.array("I")
+
+    @classmethod
+    def from_spans(cls, spans: typing.Iterable[ReadableSpan]) -> "TraceForest":
+        forest = cls()
+        for span in spans:
+            context = span.context
+            start = span.start_time or 0
+            forest._add(
+                context.trace_id,
+                context.span_id,
+                span.parent.span_id if span.parent is not None else 0,
+                span.name,
+                span.name,
+                start,
+                span.end_time or start,
+            )
+        forest._link()
+        return forest
+
+    @classmethod
+    def from_traces_data(cls, payloads: typing.Union[Buffer, typing.Iterable[Buffer]]) -> "TraceForest":
+        """
+        Builds the trees from serialized TracesData messages, reading only
+        the ids, names and times of the spans.
+        """
+        if isinstance(payloads, (bytes, bytearray, memoryview)):
+            payloads = (payloads,)
+        forest = cls()
+        for payload in payloads:
+            for span in iter_otlp_items(payload):
+                trace_id = span_id = parent_span_id = start = end = 0
+                name = b""
+                for field_number, wire_type, _, value_start, field_end in iter_fields(span):
+                    if wire_type == WIRE_TYPE_LEN:
+                        if field_number == 1:
+                            trace_id = int.from_bytes(span[value_start:field_end], "big")
+                        elif field_number == 2:
+                            span_id = int.from_bytes(span[value_start:field_end], "big")
+                        elif field_number == 4:
+                            parent_span_id = int.from_bytes(span[value_start:field_end], "big")
+                        elif field_number == 5:
+                            name = bytes(span[value_start:field_end])
+                    elif wire_type == WIRE_TYPE_I64:
+                        if field_number == 7:
+                            (start,) = _fixed64(span, value_start)
+                        elif field_number == 8:
+                            (end,) = _fixed64(span, value_start)
+                forest._add(trace_id, span_id, parent_span_id, name, None, start, end or start)
+        forest._link()
+        return forest
+
+    def _add(
+        self,
+        trace_id: int,
+        span_id: int,
+        parent_span_id: int,
+        name_key: typing.Any,
+        name: typing.Optional[str],
+        start: int,
+        end: int,
+    ) -> None:
+        # Names are interned by their str or, for serialized spans, their
+        # UTF-8 bytes, which are only decoded once per distinct name.
+        name_index = self._name_indexes.get(name_key)
+        if name_index is None:
+            name_index = self._name_indexes[name_key] = len(self.names)
+            self.names.append(name if name is not None else name_key.decode("utf-8", "replace"))
+        self._span_names.append(name_index)
+        self._trace_ids_high.append(trace_id >> 64)
+        self._trace_ids_low.append(trace_id & 0xFFFFFFFFFFFFFFFF)
+        self._span_ids.append(span_id)
+        self._parent_span_ids.append(parent_span_id)
+        self.start_times.append(start)
+        self.end_times.append(max(end, start))
+
+    def _link(self) -> None:
+        count = len(self._span_ids)
+        high, low = self._trace_ids_high, self._trace_ids_low
+        span_ids, parent_span_ids = self._span_ids, self._parent_span_ids
+
+        # Span ids are only unique within a trace.
+        indexes: typing.Dict[int, int] = {}
+        for i in range(count):
+            indexes.setdefault((high[i] << 128) | (low[i] << 64) | span_ids[i], i)
+        parents = array.array("q", [-1]) * count
+        orphans = []
+        for i in range(count):
+            parent_span_id = parent_span_ids[i]
+            if not parent_span_id:
+                continue
+            parent = indexes.get((high[i] << 128) | (low[i] << 64) | parent_span_id)
+            if parent is None or parent == i:
+                orphans.append(i)
+            else:
+                parents[i] = parent
+        del indexes
+
+        # Breaks parent cycles, by following the parents of every span until
+        # a span that was seen before: a span on the same walk closes a cycle.
+        state = bytearray(count)
+        for i in range(count):
+            path = []
+            j = i
+            while j >= 0 and not state[j]:
+                state[j] = 1
+                path.append(j)
+                j = parents[j]
+            if j >= 0 and state[j] == 1:
+                parents[j] = -1
+                orphans.append(j)
+            for j in path:
+                state[j] = 2
+
+        offsets = array.array("I", [0]) * (count + 1)
+        for parent in parents:
+            if parent >= 0:
+                offsets[parent + 1] += 1
+        for i in range(count):
+            offsets[i + 1] += offsets[i]
+        children = array.array("I", [0]) * offsets[count]
+        cursors = offsets[:count]
+        for i, parent in enumerate(parents):
+            if parent >= 0:
+                children[cursors[parent]] = i
+                cursors[parent] += 1
+        start_times = self.start_times
+        for i in range(count):
+            first, last = offsets[i], offsets[i + 1]
+            if last - first > 1:
+                children[first:last] = array.array("I", sorted(children[first:last], key=start_times.__getitem__))
+
+        self.parents = parents
+        self.roots = array.array("I", (i for i in range(count) if parents[i] < 0))
+        self.orphans = array.array("I", sorted(orphans))
+        self._child_offsets = offsets
+        self._children = children
+
+    def __len__(self) -> int:
+        return len(self._span_ids)
+
+    def name(self, span: int) -> str:
+        return self.names[self._span_names[span]]
+
+    def trace_id(self, span: int) -> int:
+        return (self._trace_ids_high[span] << 64) | self._trace_ids_low[span]
+
+    def span_id(self, span: int) -> int:
+        return self._span_ids[span]
+
+    def duration(self, span: int) -> int:
+        return self.end_times[span] - self.start_times[span]
+
+    def children(self, span: int) -> array.array:
+        return self._children[self._child_offsets[span]:self._child_offsets[span + 1]]
+
+    def walk(self, root: int) -> typing.Iterator[typing.Tuple[int, int]]:
+        """
+        Iterates over the spans of the tree below root, root included,
+        depth first. Yields (span, depth).
+        """
+        offsets, children = self._child_offsets, self._children
+        stack = [(root, 0)]
+        while stack:
+            span, depth = stack.pop()
+            yield span, depth
+            stack.extend((children[i], depth + 1) for i in range(offsets[span + 1] - 1, offsets[span] - 1, -1))
+
+    def self_times(self) -> array.array:
+        """
+        Returns the self time of every span: its duration minus the time
+        covered by at least one of its children, clipped to the span.
+        """
+        start_times, end_times = self.start_times, self.end_times
+        offsets, children = self._child_offsets, self._children
+        result = array.array("Q", [0]) * len(self)
+        for span in range(len(self)):
+            start, end = start_times[span], end_times[span]
+            covered = 0
+            covered_start = covered_end = start
+            for i in range(offsets[span], offsets[span + 1]):
+                child = children[i]
+                child_start = max(start_times[child], start)
+                child_end = min(end_times[child], end)
+                if child_end <= child_start:
+                    continue
+                # The children are ordered by start time.
+                if child_start > covered_end:
+                    covered += covered_end - covered_start
+                    covered_start, covered_end = child_start, child_end
+                elif child_end > covered_end:
+                    covered_end = child_end
+            covered += covered_end - covered_start
+            result[span] = end - start - covered
+        return result
+
+    def critical_path(self, root: int) -> typing.List[int]:
+        """
+        Returns the spans of the critical path below root: starting at the
+        root, the child that ended last, which the parent waited for the
+        longest, down to a leaf.
+        """
+        end_times = self.end_times
+        path = [root]
+        span = root
+        while True:
+            children = self.children(span)
+            if not children:
+                return path
+            span = max(children, key=end_times.__getitem__)
+            path.append(span)
+
+    def name_stats(self) -> typing.Dict[str, NameStats]:
+        """Returns the count, total and maximum duration and self time by span name."""
+        self_times = self.self_times()
+        counts = [0] * len(self.names)
+        totals = [0] * len(self.names)
+        self_totals = [0] * len(self.names)
+        maximums = [0] * len(self.names)
+        start_times, end_times = self.start_times, self.end_times
+        for span, name in enumerate(self._span_names):
+            duration = end_times[span] - start_times[span]
+            counts[name] += 1
+            totals[name] += duration
+            self_totals[name] += self_times[span]
+            if duration > maximums[name]:
+                maximums[name] = duration
+        return {
+            name: NameStats(counts[i], totals[i], self_totals[i], maximums[i])
+            for i, name in enumerate(self.names)
+            if counts[i]
+        }
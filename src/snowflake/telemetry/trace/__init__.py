@@ -7,11 +7,27 @@ import random
 
 from opentelemetry import trace
 from opentelemetry.sdk.trace import RandomIdGenerator
+from snowflake.telemetry._internal import fork
 
 # Generator that returns
 #   trace_id: the given (inherited) trace id on the first call to generate_trace_id, and a Snowflake trace_id on subsequent calls
 #   span_id: a random span_id
+# Ids come from a random generator of its own, which is reseeded in forked
+# children so that they do not generate the same ids as their parent.
 class SnowflakeTraceIdGenerator(RandomIdGenerator):
+    def __init__(self):
+        self._random = random.Random()
+        fork.register(self)
+
+    def _at_fork_reinit(self) -> None:
+        self._random.seed()
+
+    def generate_span_id(self) -> int:
+        span_id = self._random.getrandbits(64)
+        while span_id == trace.INVALID_SPAN_ID:
+            span_id = self._random.getrandbits(64)
+        return span_id
+
     def generate_trace_id(self) -> int:
         trace_id = trace.INVALID_TRACE_ID
         while trace_id == trace.INVALID_TRACE_ID:
@@ -19,7 +35,7 @@ class SnowflakeTraceIdGenerator(RandomIdGenerator):
             timestamp_in_minutes = int(time.time()) // 60
             # Convert and pad to 4 bytes
             timestamp_bytes = timestamp_in_minutes.to_bytes(4, byteorder='big', signed=False)
-            suffix_bytes = random.getrandbits(96).to_bytes(12, byteorder='big', signed=False)
+            suffix_bytes = self._random.getrandbits(96).to_bytes(12, byteorder='big', signed=False)
             trace_id = int.from_bytes(timestamp_bytes + suffix_bytes, byteorder='big', signed=False)
         return trace_id
 
@@ -0,0 +1,142 @@
+import logging
+import time
+import unittest
+
+from opentelemetry.sdk._logs import LoggerProvider, LoggingHandler
+from opentelemetry.sdk.trace import TracerProvider
+from snowflake.telemetry._internal.exporter.otlp.proto.logs import (
+    AdaptiveBatchLogRecordProcessor,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import (
+    AdaptiveBatchSpanProcessor,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.writers import (
+    AdaptiveBatchController,
+    BatchingWriter,
+)
+from snowflake.telemetry.test.logs_test_utils import InMemoryLogWriter
+from snowflake.telemetry.test.traces_test_utils import InMemorySpanWriter
+
+
+def _span_names(writer):
+    return [
+        span.name
+        for traces_data in writer.get_finished_protos()
+        for resource_spans in traces_data.resource_spans
+        for scope_spans in resource_spans.scope_spans
+        for span in scope_spans.spans
+    ]
+
+
+def _simulate(controller, encode_fixed, encode_per_item, write_fixed, write_per_byte, bytes_per_item, rounds=30):
+    for _ in range(rounds):
+        items = controller.batch_size
+        controller.record_encode(items, encode_fixed + encode_per_item * items, bytes_per_item * items)
+        controller.record_write(write_fixed + write_per_byte * bytes_per_item * items, bytes_per_item * items)
+
+
+class TestAdaptiveBatchController(unittest.TestCase):
+    def test_grows_when_batches_are_cheap(self):
+        controller = AdaptiveBatchController(target_latency_millis=100, initial_batch_size=64, max_batch_size=4096)
+        _simulate(controller, 0, 1e-6, 0.001, 1e-9, 100)
+        self.assertEqual(controller.batch_size, 4096)
+
+    def test_shrinks_to_target_latency(self):
+        controller = AdaptiveBatchController(target_latency_millis=100, initial_batch_size=4096)
+        # 1ms per item, so batches of 100 items take 100ms.
+        _simulate(controller, 0, 5e-4, 0, 5e-6, 100)
+        self.assertAlmostEqual(controller.batch_size, 100, delta=5)
+
+    def test_fixed_cost_is_separated_from_item_cost(self):
+        controller = AdaptiveBatchController(target_latency_millis=100, initial_batch_size=32)
+        # A 50ms round trip per write leaves 50ms for 0.5ms items.
+        for items in (32, 64, 128, 32, 64, 128):
+            controller.record_encode(items, 2.5e-4 * items, 100 * items)
+            controller.record_write(0.05 + 2.5e-6 * 100 * items, 100 * items)
+        _simulate(controller, 0, 2.5e-4, 0.05, 2.5e-6, 100)
+        self.assertAlmostEqual(controller.batch_size, 100, delta=5)
+
+    def test_keeps_up_with_arrivals(self):
+        controller = AdaptiveBatchController(target_latency_millis=40, initial_batch_size=512, max_batch_size=8192)
+        # The 50ms write already misses the target, batches must still
+        # amortize it over enough of the 5000 items arriving per second.
+        for _ in range(30):
+            items = controller.batch_size
+            controller.record_arrivals(5000, 1)
+            controller.record_encode(items, 0, 100 * items)
+            controller.record_write(0.05 + 1e-6 * 100 * items, 100 * items)
+        self.assertAlmostEqual(controller.batch_size, 500, delta=10)
+        self.assertAlmostEqual(controller.interval_millis, 100, delta=5)
+
+    def test_flush_interval(self):
+        controller = AdaptiveBatchController(initial_batch_size=100, min_interval_millis=100, max_interval_millis=5000)
+        controller.record_arrivals(1, 1)
+        self.assertEqual(controller.interval_millis, 5000)
+        for _ in range(50):
+            controller.record_arrivals(500, 1)
+        self.assertAlmostEqual(controller.interval_millis, 200, delta=1)
+        for _ in range(50):
+            controller.record_arrivals(1_000_000, 1)
+        self.assertEqual(controller.interval_millis, 100)
+
+    def test_invalid_bounds(self):
+        with self.assertRaises(ValueError):
+            AdaptiveBatchController(min_batch_size=10, max_batch_size=5)
+
+
+class TestAdaptiveBatchProcessors(unittest.TestCase):
+    def test_span_processor(self):
+        writer = InMemorySpanWriter()
+        controller = AdaptiveBatchController(initial_batch_size=16, min_batch_size=1)
+        processor = AdaptiveBatchSpanProcessor(writer, controller)
+        tracer_provider = TracerProvider()
+        tracer_provider.add_span_processor(processor)
+        tracer = tracer_provider.get_tracer(__name__)
+        for i in range(100):
+            with tracer.start_as_current_span(f"span{i}"):
+                pass
+        self.assertTrue(processor.force_flush())
+        self.assertEqual(_span_names(writer), [f"span{i}" for i in range(100)])
+        self.assertEqual(processor.dropped_spans, 0)
+        tracer_provider.shutdown()
+
+    def test_span_processor_flushes_on_interval(self):
+        writer = InMemorySpanWriter()
+        controller = AdaptiveBatchController(initial_interval_millis=10, min_interval_millis=10, max_interval_millis=10)
+        tracer_provider = TracerProvider()
+        tracer_provider.add_span_processor(AdaptiveBatchSpanProcessor(writer, controller))
+        with tracer_provider.get_tracer(__name__).start_as_current_span("span"):
+            pass
+        deadline = time.monotonic() + 5
+        while not _span_names(writer) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(_span_names(writer)), 1)
+        tracer_provider.shutdown()
+
+    def test_log_processor_with_batching_writer(self):
+        writer = InMemoryLogWriter()
+        controller = AdaptiveBatchController()
+        batching_writer = BatchingWriter(writer, controller=controller)
+        logger_provider = LoggerProvider()
+        logger_provider.add_log_record_processor(AdaptiveBatchLogRecordProcessor(batching_writer, controller))
+        logger = logging.getLogger("test_adaptive_batching")
+        logger.propagate = False
+        handler = LoggingHandler(logger_provider=logger_provider)
+        logger.addHandler(handler)
+        try:
+            for i in range(10):
+                logger.warning("log %d", i)
+            self.assertTrue(logger_provider.force_flush())
+        finally:
+            logger.removeHandler(handler)
+            logger_provider.shutdown()
+        bodies = [
+            record.body.string_value
+            for logs_data in writer.get_finished_protos()
+            for resource_logs in logs_data.resource_logs
+            for scope_logs in resource_logs.scope_logs
+            for record in scope_logs.log_records
+        ]
+        self.assertEqual(bodies, [f"log {i}" for i in range(10)])
+        # The BatchingWriter reported the write latency.
+        self.assertIsNotNone(controller._write.coefficients())
@@ -0,0 +1,118 @@
+import asyncio
+import threading
+import unittest
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from snowflake.telemetry._internal.exporter.otlp.proto.logs import (
+    AsyncLogWriter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.metrics import (
+    AsyncMetricWriter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import (
+    AsyncSpanWriter,
+    ProtoSpanExporter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.writers import (
+    AsyncWriterAdapter,
+)
+
+
+class _RecordingAsyncWriter(AsyncSpanWriter, AsyncMetricWriter, AsyncLogWriter):
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.spans = []
+        self.metrics = []
+        self.logs = []
+        self.concurrent = 0
+        self.max_concurrent = 0
+        self.threads = set()
+        self.flushed = False
+        self.shut_down = False
+
+    async def _write(self, payloads, payload):
+        self.threads.add(threading.current_thread().name)
+        self.concurrent += 1
+        self.max_concurrent = max(self.max_concurrent, self.concurrent)
+        await asyncio.sleep(self.delay)
+        self.concurrent -= 1
+        payloads.append(payload)
+
+    async def write_span(self, serialized_spans: bytes) -> None:
+        await self._write(self.spans, serialized_spans)
+
+    async def write_metrics(self, serialized_metrics: bytes) -> None:
+        await self._write(self.metrics, serialized_metrics)
+
+    async def write_logs(self, serialized_logs: bytes) -> None:
+        await self._write(self.logs, serialized_logs)
+
+    async def force_flush(self) -> None:
+        self.flushed = True
+
+    async def shutdown(self) -> None:
+        self.shut_down = True
+
+
+class TestAsyncWriterAdapter(unittest.TestCase):
+    def test_writes_overlap_up_to_max_in_flight(self):
+        writer = _RecordingAsyncWriter(delay=0.02)
+        adapter = AsyncWriterAdapter(writer, max_in_flight=4)
+        for i in range(12):
+            adapter.write_span(b"span%d" % i)
+        adapter.write_metrics(b"metric")
+        adapter.write_logs(b"logs")
+        self.assertTrue(adapter.force_flush())
+        self.assertEqual(sorted(writer.spans), sorted(b"span%d" % i for i in range(12)))
+        self.assertEqual(writer.metrics, [b"metric"])
+        self.assertEqual(writer.logs, [b"logs"])
+        self.assertEqual(writer.max_concurrent, 4)
+        self.assertEqual(writer.threads, {"AsyncWriterAdapter"})
+        self.assertTrue(writer.flushed)
+        adapter.shutdown()
+        self.assertTrue(writer.shut_down)
+
+    def test_shutdown_without_writes(self):
+        writer = _RecordingAsyncWriter()
+        adapter = AsyncWriterAdapter(writer)
+        adapter.shutdown()
+        self.assertTrue(writer.shut_down)
+        self.assertFalse(adapter._thread.is_alive())
+
+    def test_submit_timeout_drops_payloads(self):
+        writer = _RecordingAsyncWriter(delay=0.2)
+        adapter = AsyncWriterAdapter(writer, max_in_flight=1, submit_timeout_millis=10)
+        adapter.write_span(b"first")
+        adapter.write_span(b"second")
+        self.assertEqual(adapter.dropped_payloads, 1)
+        self.assertFalse(adapter.force_flush(timeout_millis=10))
+        self.assertTrue(adapter.force_flush())
+        self.assertEqual(writer.spans, [b"first"])
+        adapter.shutdown()
+
+    def test_failures_are_counted(self):
+        class _FailingAsyncWriter(AsyncSpanWriter):
+            async def write_span(self, serialized_spans: bytes) -> None:
+                raise IOError("broken sink")
+
+        adapter = AsyncWriterAdapter(_FailingAsyncWriter())
+        with self.assertLogs(level="ERROR"):
+            adapter.write_span(b"span")
+            self.assertTrue(adapter.force_flush())
+        self.assertEqual(adapter.failed_payloads, 1)
+        adapter.shutdown()
+
+    def test_with_proto_span_exporter(self):
+        writer = _RecordingAsyncWriter()
+        adapter = AsyncWriterAdapter(writer)
+        exporter = ProtoSpanExporter(adapter)
+        tracer_provider = TracerProvider()
+        tracer_provider.add_span_processor(SimpleSpanProcessor(exporter))
+        with tracer_provider.get_tracer("test").start_as_current_span("span"):
+            pass
+        self.assertTrue(exporter.force_flush())
+        self.assertEqual(len(writer.spans), 1)
+        tracer_provider.shutdown()
+        self.assertTrue(writer.shut_down)
+        self.assertFalse(adapter._thread.is_alive())
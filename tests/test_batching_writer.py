@@ -0,0 +1,156 @@
+import threading
+import unittest
+
+from snowflake.telemetry._internal.exporter.otlp.proto.metrics import (
+    MetricWriter,
+    ProtoMetricExporter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import (
+    ProtoSpanExporter,
+    SpanWriter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.writers import (
+    BackpressurePolicy,
+    BatchingWriter,
+)
+
+
+class _BlockingWriter(SpanWriter, MetricWriter):
+    """Records payloads, and blocks every write until it is released."""
+
+    def __init__(self, blocked=True):
+        self.spans = []
+        self.metrics = []
+        self.release = threading.Event()
+        if not blocked:
+            self.release.set()
+        self.writing = threading.Event()
+        self.flushed = False
+        self.shut_down = False
+
+    def write_span(self, serialized_spans: bytes) -> None:
+        self.writing.set()
+        self.release.wait()
+        self.spans.append(serialized_spans)
+
+    def write_metrics(self, serialized_metrics: bytes) -> None:
+        self.writing.set()
+        self.release.wait()
+        self.metrics.append(serialized_metrics)
+
+    def force_flush(self, timeout_millis: float = 30_000) -> bool:
+        self.flushed = True
+        return True
+
+    def shutdown(self, timeout_millis: float = 30_000) -> None:
+        self.shut_down = True
+
+
+class TestBatchingWriter(unittest.TestCase):
+    def test_writes_in_order_on_background_thread(self):
+        writer = _BlockingWriter(blocked=False)
+        batching_writer = BatchingWriter(writer)
+        for i in range(100):
+            batching_writer.write_span(b"span%d" % i)
+            batching_writer.write_metrics(b"metric%d" % i)
+        self.assertTrue(batching_writer.force_flush())
+        self.assertEqual(writer.spans, [b"span%d" % i for i in range(100)])
+        self.assertEqual(writer.metrics, [b"metric%d" % i for i in range(100)])
+        self.assertTrue(writer.flushed)
+        batching_writer.shutdown()
+        self.assertTrue(writer.shut_down)
+
+    def test_force_flush_timeout(self):
+        writer = _BlockingWriter()
+        batching_writer = BatchingWriter(writer)
+        batching_writer.write_span(b"span")
+        self.assertFalse(batching_writer.force_flush(timeout_millis=10))
+        writer.release.set()
+        self.assertTrue(batching_writer.force_flush())
+
+    def test_drop_newest(self):
+        writer = _BlockingWriter()
+        batching_writer = BatchingWriter(writer, max_queue_size=2)
+        batching_writer.write_span(b"0")
+        writer.writing.wait()
+        for i in range(1, 5):
+            batching_writer.write_span(b"%d" % i)
+        self.assertEqual(batching_writer.dropped_payloads, 2)
+        writer.release.set()
+        batching_writer.force_flush()
+        self.assertEqual(writer.spans, [b"0", b"1", b"2"])
+
+    def test_drop_oldest(self):
+        writer = _BlockingWriter()
+        batching_writer = BatchingWriter(
+            writer, max_queue_size=2, policy=BackpressurePolicy.DROP_OLDEST
+        )
+        batching_writer.write_span(b"0")
+        writer.writing.wait()
+        for i in range(1, 5):
+            batching_writer.write_span(b"%d" % i)
+        self.assertEqual(batching_writer.dropped_payloads, 2)
+        writer.release.set()
+        batching_writer.force_flush()
+        self.assertEqual(writer.spans, [b"0", b"3", b"4"])
+
+    def test_max_queue_bytes(self):
+        writer = _BlockingWriter()
+        batching_writer = BatchingWriter(writer, max_queue_bytes=10)
+        batching_writer.write_span(b"0")
+        writer.writing.wait()
+        batching_writer.write_span(b"x" * 8)
+        batching_writer.write_span(b"x" * 8)
+        self.assertEqual(batching_writer.dropped_payloads, 1)
+        self.assertEqual(batching_writer.queue_bytes, 8)
+        writer.release.set()
+
+    def test_block_with_timeout(self):
+        writer = _BlockingWriter()
+        batching_writer = BatchingWriter(
+            writer, max_queue_size=1, policy=BackpressurePolicy.BLOCK, block_timeout_millis=20
+        )
+        batching_writer.write_span(b"0")
+        writer.writing.wait()
+        batching_writer.write_span(b"1")
+        batching_writer.write_span(b"2")
+        self.assertEqual(batching_writer.dropped_payloads, 1)
+        writer.release.set()
+        batching_writer.write_span(b"3")
+        batching_writer.force_flush()
+        self.assertEqual(writer.spans, [b"0", b"1", b"3"])
+
+    def test_shutdown_discards_after_timeout(self):
+        writer = _BlockingWriter()
+        batching_writer = BatchingWriter(writer)
+        for i in range(3):
+            batching_writer.write_span(b"%d" % i)
+        writer.writing.wait()
+        batching_writer.shutdown(timeout_millis=10)
+        self.assertEqual(batching_writer.dropped_payloads, 2)
+        self.assertTrue(writer.shut_down)
+        batching_writer.write_span(b"after shutdown")
+        self.assertEqual(batching_writer.dropped_payloads, 3)
+        writer.release.set()
+
+    def test_writer_failures_are_counted(self):
+        class _FailingWriter(SpanWriter):
+            def write_span(self, serialized_spans: bytes) -> None:
+                raise IOError("broken sink")
+
+        batching_writer = BatchingWriter(_FailingWriter())
+        with self.assertLogs(level="ERROR"):
+            batching_writer.write_span(b"span")
+            self.assertTrue(batching_writer.force_flush())
+        self.assertEqual(batching_writer.failed_payloads, 1)
+
+    def test_exporters_propagate_flush_and_shutdown(self):
+        writer = _BlockingWriter(blocked=False)
+        batching_writer = BatchingWriter(writer)
+        span_exporter = ProtoSpanExporter(batching_writer)
+        metric_exporter = ProtoMetricExporter(batching_writer)
+        self.assertTrue(span_exporter.force_flush())
+        self.assertTrue(metric_exporter.force_flush())
+        self.assertTrue(writer.flushed)
+        span_exporter.shutdown()
+        self.assertTrue(writer.shut_down)
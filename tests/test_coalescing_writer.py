@@ -0,0 +1,190 @@
+import threading
+import unittest
+
+from opentelemetry.sdk.metrics.export import (
+    MetricsData,
+    ResourceMetrics,
+    ScopeMetrics,
+)
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.util.instrumentation import InstrumentationScope
+from snowflake.telemetry._internal.exporter.otlp.proto.metrics import (
+    MetricWriter,
+    ProtoMetricExporter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import (
+    ProtoSpanExporter,
+    SpanWriter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.writers import (
+    CoalescingWriter,
+)
+from snowflake.telemetry._internal.serialize.wire import merge_otlp_data
+from snowflake.telemetry.test.metrics_test_utils import (
+    InMemoryMetricWriter,
+)
+from snowflake.telemetry.test.metrictestutil import _generate_gauge, _generate_sum
+from snowflake.telemetry.test.traces_test_utils import (
+    InMemorySpanWriter,
+)
+
+
+class _NotifyingSpanWriter(InMemorySpanWriter):
+    def __init__(self):
+        super().__init__()
+        self.written = threading.Event()
+
+    def write_span(self, serialized_spans: bytes) -> None:
+        super().write_span(serialized_spans)
+        self.written.set()
+
+
+def _export_spans(writer, names, resource=None):
+    tracer_provider = TracerProvider(resource=resource or Resource({"service.name": "test"}))
+    tracer_provider.add_span_processor(SimpleSpanProcessor(ProtoSpanExporter(writer)))
+    for name in names:
+        scope = "scope_a" if name.startswith("a") else "scope_b"
+        with tracer_provider.get_tracer(scope).start_as_current_span(name):
+            pass
+
+
+def _metrics_data(scope, *metrics):
+    return MetricsData(
+        resource_metrics=[
+            ResourceMetrics(
+                resource=Resource({"service.name": "test"}),
+                scope_metrics=[
+                    ScopeMetrics(
+                        scope=InstrumentationScope(scope),
+                        metrics=list(metrics),
+                        schema_url="",
+                    )
+                ],
+                schema_url="",
+            )
+        ]
+    )
+
+
+class TestCoalescingWriter(unittest.TestCase):
+    def test_merges_spans_under_shared_headers(self):
+        writer = InMemorySpanWriter()
+        coalescing_writer = CoalescingWriter(writer)
+        _export_spans(coalescing_writer, ["a1", "b1", "a2", "b2"])
+        self.assertEqual(writer.get_finished_protos(), ())
+        self.assertTrue(coalescing_writer.force_flush())
+
+        (proto,) = writer.get_finished_protos()
+        (resource_spans,) = proto.resource_spans
+        self.assertEqual(
+            [
+                (scope_spans.scope.name, [span.name for span in scope_spans.spans])
+                for scope_spans in resource_spans.scope_spans
+            ],
+            [("scope_a", ["a1", "a2"]), ("scope_b", ["b1", "b2"])],
+        )
+        coalescing_writer.shutdown()
+
+    def test_without_deduplication(self):
+        writer = InMemorySpanWriter()
+        coalescing_writer = CoalescingWriter(writer, deduplicate=False)
+        _export_spans(coalescing_writer, ["a1", "a2", "a3"])
+        coalescing_writer.force_flush()
+        (proto,) = writer.get_finished_protos()
+        self.assertEqual(len(proto.resource_spans), 3)
+        self.assertEqual(
+            [resource_spans.scope_spans[0].spans[0].name for resource_spans in proto.resource_spans],
+            ["a1", "a2", "a3"],
+        )
+        coalescing_writer.shutdown()
+
+    def test_distinct_resources_are_kept_apart(self):
+        writer = InMemorySpanWriter()
+        coalescing_writer = CoalescingWriter(writer)
+        _export_spans(coalescing_writer, ["a1"], Resource({"service.name": "one"}))
+        _export_spans(coalescing_writer, ["a2"], Resource({"service.name": "two"}))
+        _export_spans(coalescing_writer, ["a3"], Resource({"service.name": "one"}))
+        coalescing_writer.force_flush()
+        (proto,) = writer.get_finished_protos()
+        self.assertEqual(
+            [
+                [span.name for span in resource_spans.scope_spans[0].spans]
+                for resource_spans in proto.resource_spans
+            ],
+            [["a1", "a3"], ["a2"]],
+        )
+        coalescing_writer.shutdown()
+
+    def test_max_bytes(self):
+        writer = InMemorySpanWriter()
+        probe = InMemorySpanWriter()
+        _export_spans(probe, ["a1"])
+        (payload,) = probe.get_finished_protos()
+        coalescing_writer = CoalescingWriter(writer, max_bytes=3 * payload.ByteSize())
+        _export_spans(coalescing_writer, ["a%d" % i for i in range(7)])
+        self.assertEqual(len(writer.get_finished_protos()), 2)
+        coalescing_writer.shutdown()
+        protos = writer.get_finished_protos()
+        self.assertEqual(len(protos), 3)
+        self.assertEqual(
+            [span.name for proto in protos for span in proto.resource_spans[0].scope_spans[0].spans],
+            ["a%d" % i for i in range(7)],
+        )
+
+    def test_max_delay(self):
+        writer = _NotifyingSpanWriter()
+        coalescing_writer = CoalescingWriter(writer, max_delay_millis=10)
+        _export_spans(coalescing_writer, ["a1", "a2"])
+        self.assertTrue(writer.written.wait(5))
+        (proto,) = writer.get_finished_protos()
+        self.assertEqual(len(proto.resource_spans[0].scope_spans[0].spans), 2)
+        coalescing_writer.shutdown()
+
+    def test_merges_metrics(self):
+        writer = InMemoryMetricWriter()
+        coalescing_writer = CoalescingWriter(writer)
+        exporter = ProtoMetricExporter(coalescing_writer)
+        exporter.export(_metrics_data("scope_a", _generate_sum("sum", 1)))
+        exporter.export(_metrics_data("scope_b", _generate_gauge("gauge", 2)))
+        exporter.export(_metrics_data("scope_a", _generate_sum("sum", 3)))
+        exporter.force_flush()
+
+        (proto,) = writer.get_finished_protos()
+        (resource_metrics,) = proto.resource_metrics
+        self.assertEqual(
+            [
+                (scope_metrics.scope.name, [metric.name for metric in scope_metrics.metrics])
+                for scope_metrics in resource_metrics.scope_metrics
+            ],
+            [("scope_a", ["sum", "sum"]), ("scope_b", ["gauge"])],
+        )
+        exporter.shutdown()
+
+    def test_failures_are_counted(self):
+        class _FailingWriter(SpanWriter, MetricWriter):
+            def write_span(self, serialized_spans: bytes) -> None:
+                raise IOError("broken sink")
+
+            def write_metrics(self, serialized_metrics: bytes) -> None:
+                pass
+
+        coalescing_writer = CoalescingWriter(_FailingWriter())
+        coalescing_writer.write_span(b"")
+        coalescing_writer.write_span(b"")
+        with self.assertLogs(level="ERROR"):
+            self.assertFalse(coalescing_writer.force_flush())
+        self.assertEqual(coalescing_writer.failed_payloads, 2)
+        coalescing_writer.shutdown()
+
+
+class TestMergeOtlpData(unittest.TestCase):
+    def test_unknown_fields_are_copied(self):
+        # A resource entry with an unknown varint field 4 cannot be split.
+        unknown = b"\n\x02\x20\x01"
+        self.assertEqual(merge_otlp_data([unknown, unknown]), unknown + unknown)
+
+    def test_truncated_payload(self):
+        with self.assertRaises(ValueError):
+            merge_otlp_data([b"\n\x05\x12"])
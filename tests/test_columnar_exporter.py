@@ -0,0 +1,139 @@
+import unittest
+
+from opentelemetry._logs import SeverityNumber
+from opentelemetry.sdk._logs import LogData, LogRecord
+from opentelemetry.sdk._logs.export import LogExportResult
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.util.instrumentation import InstrumentationScope
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from snowflake.telemetry._internal.exporter.columnar import (
+    ColumnarLogExporter,
+    ColumnarSpanExporter,
+    LogColumns,
+    SpanColumns,
+    decode_columnar,
+    iter_columnar,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.logs import LogWriter
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import SpanWriter
+
+
+class _InMemoryWriter(SpanWriter, LogWriter):
+    def __init__(self):
+        self.payloads = []
+
+    def write_span(self, serialized_spans: bytes) -> None:
+        self.payloads.append(serialized_spans)
+
+    def write_logs(self, serialized_logs: bytes) -> None:
+        self.payloads.append(serialized_logs)
+
+
+class TestColumnarExporter(unittest.TestCase):
+    def test_spans(self):
+        writer = _InMemoryWriter()
+        tracer_provider = TracerProvider(resource=Resource({"service.name": "columns"}))
+        tracer_provider.add_span_processor(SimpleSpanProcessor(ColumnarSpanExporter(writer)))
+        tracer = tracer_provider.get_tracer("scope", "2.0")
+        with tracer.start_as_current_span("parent", kind=SpanKind.CLIENT) as parent:
+            parent.set_attributes({"rows": 1 << 40, "ratio": 0.5, "ok": True, "tags": ("a", "b")})
+            with tracer.start_as_current_span("child") as child:
+                child.set_attribute("rows", 2)
+                child.set_status(Status(StatusCode.ERROR, "failed"))
+
+        columns = [decode_columnar(payload) for payload in writer.payloads]
+        self.assertEqual(
+            [batch.to_bytes() for batch in iter_columnar(b"".join(writer.payloads))], writer.payloads,
+        )
+        child_columns, parent_columns = columns
+        self.assertIsInstance(child_columns, SpanColumns)
+        self.assertEqual(len(parent_columns), 1)
+        self.assertEqual(parent_columns.trace_id(0), parent.context.trace_id)
+        self.assertEqual(parent_columns.span_id[0], parent.context.span_id)
+        self.assertEqual(parent_columns.parent_span_id[0], 0)
+        self.assertEqual(child_columns.parent_span_id[0], parent.context.span_id)
+        self.assertEqual(parent_columns.span_name(0), "parent")
+        self.assertEqual(parent_columns.kind[0], SpanKind.CLIENT.value)
+        self.assertEqual(parent_columns.status_message[0], -1)
+        self.assertEqual(child_columns.status_code[0], StatusCode.ERROR.value)
+        self.assertEqual(child_columns.strings[child_columns.status_message[0]], "failed")
+        self.assertEqual(parent_columns.end_time[0], parent.end_time)
+        self.assertEqual(
+            parent_columns.attributes(0), {"rows": 1 << 40, "ratio": 0.5, "ok": True, "tags": ("a", "b")},
+        )
+        self.assertEqual(child_columns.attributes(0), {"rows": 2})
+        self.assertEqual(parent_columns.resource(0)["service.name"], "columns")
+        self.assertEqual(parent_columns.scope(0), {"name": "scope", "version": "2.0"})
+
+    def test_interning(self):
+        tracer_provider = TracerProvider()
+        tracer = tracer_provider.get_tracer(__name__)
+        spans = []
+        for i in range(100):
+            with tracer.start_as_current_span(f"span{i % 2}", attributes={"key": "value", "index": i}) as span:
+                pass
+            spans.append(span)
+        columns = decode_columnar(SpanColumns.from_spans(spans).to_bytes())
+        self.assertEqual(len(columns), 100)
+        self.assertEqual(columns.names, ["span0", "span1"])
+        self.assertEqual(columns.keys, ["key", "index"])
+        self.assertEqual(columns.strings, ["value"])
+        self.assertEqual(len(columns.resources), 1)
+        self.assertEqual(list(columns.attribute_offsets), list(range(0, 202, 2)))
+        self.assertEqual(columns.attributes(99), {"key": "value", "index": 99})
+
+    def test_sequence_attributes(self):
+        tracer_provider = TracerProvider()
+        tracer = tracer_provider.get_tracer(__name__)
+        with tracer.start_as_current_span("span") as span:
+            span.set_attributes({
+                "tags": ["a", "b", "a"], "ids": (1, 2), "ratios": [0.5], "flags": [True, False], "empty": [],
+            })
+        columns = decode_columnar(SpanColumns.from_spans([span]).to_bytes())
+        self.assertEqual(columns.attributes(0), dict(span.attributes))
+        self.assertEqual(
+            columns.attributes(0),
+            {"tags": ("a", "b", "a"), "ids": (1, 2), "ratios": (0.5,), "flags": (True, False), "empty": ()},
+        )
+        # The elements are interned and typed like other attribute values.
+        self.assertEqual(columns.strings, ["a", "b"])
+        self.assertEqual(list(columns.floats), [0.5])
+        self.assertEqual(list(columns.array_offsets), [0, 3, 5, 6, 8, 8])
+
+    def test_logs(self):
+        writer = _InMemoryWriter()
+        exporter = ColumnarLogExporter(writer)
+        scope = InstrumentationScope("logger")
+        resource = Resource({"service.name": "logs"})
+        batch = [
+            LogData(LogRecord(
+                timestamp=1, observed_timestamp=2, severity_text="ERROR",
+                severity_number=SeverityNumber.ERROR, body={"message": "boom"},
+                resource=resource, attributes={"code.lineno": 7},
+            ), scope),
+            LogData(LogRecord(observed_timestamp=3, body=b"\x00\x01", resource=resource), scope),
+            LogData(LogRecord(observed_timestamp=4, resource=resource), scope),
+        ]
+        self.assertIs(exporter.export(batch), LogExportResult.SUCCESS)
+        (payload,) = writer.payloads
+        columns = decode_columnar(payload)
+        self.assertIsInstance(columns, LogColumns)
+        self.assertEqual(list(columns.timestamp), [1, 0, 0])
+        self.assertEqual(list(columns.observed_timestamp), [2, 3, 4])
+        self.assertEqual(list(columns.severity_number), [SeverityNumber.ERROR.value, 0, 0])
+        self.assertEqual(columns.strings[columns.severity_text[0]], "ERROR")
+        self.assertEqual(columns.severity_text[1], -1)
+        self.assertEqual([columns.body(row) for row in range(3)], [{"message": "boom"}, b"\x00\x01", None])
+        self.assertEqual(columns.attributes(0), {"code.lineno": 7})
+        self.assertEqual(columns.attributes(1), {})
+        self.assertEqual(list(columns.resource_index), [0, 0, 0])
+
+    def test_corrupt(self):
+        payload = SpanColumns.from_spans([]).to_bytes()
+        self.assertEqual(len(decode_columnar(payload)), 0)
+        with self.assertRaises(ValueError):
+            decode_columnar(payload[:-1])
+        with self.assertRaises(ValueError):
+            decode_columnar(b"XXXX" + payload[4:])
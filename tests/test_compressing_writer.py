@@ -0,0 +1,96 @@
+import unittest
+
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import (
+    ProtoSpanExporter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.writers import (
+    Compression,
+    CompressingWriter,
+    decompress,
+)
+from snowflake.telemetry.test.traces_test_utils import (
+    InMemorySpanWriter,
+)
+
+
+class _DecompressingSpanWriter(InMemorySpanWriter):
+    def __init__(self, compression=Compression.ZLIB, zdict=None):
+        super().__init__()
+        self.compression = compression
+        self.zdict = zdict
+        self.compressed_sizes = []
+
+    def write_span(self, serialized_span: bytes) -> None:
+        self.compressed_sizes.append(len(serialized_span))
+        super().write_span(decompress(serialized_span, self.compression, self.zdict))
+
+
+def _finished_spans():
+    memory_exporter = InMemorySpanExporter()
+    tracer_provider = TracerProvider(
+        resource=Resource(
+            {
+                "snow.executable.name": "MY_PROCEDURE(X VARCHAR)",
+                "snow.executable.type": "PROCEDURE",
+                "snow.query.id": "01b42d80-0002-65f7-0045-80070015d8d2",
+                "snow.database.name": "DB",
+                "snow.schema.name": "PUBLIC",
+                "telemetry.sdk.language": "python",
+            }
+        )
+    )
+    tracer_provider.add_span_processor(SimpleSpanProcessor(memory_exporter))
+    tracer = tracer_provider.get_tracer("snow.telemetry")
+    for i in range(3):
+        with tracer.start_as_current_span(f"root{i}"):
+            for name in ("b", "a", "b"):
+                with tracer.start_as_current_span(name, attributes={"code.lineno": i}):
+                    pass
+    return memory_exporter.get_finished_spans()
+
+
+class TestCompressingWriter(unittest.TestCase):
+    def test_round_trip(self):
+        spans = _finished_spans()
+        for compression, level in (
+            (Compression.ZLIB, 6),
+            (Compression.GZIP, 9),
+            (Compression.LZMA, 1),
+        ):
+            with self.subTest(compression=compression):
+                writer = _DecompressingSpanWriter(compression)
+                ProtoSpanExporter(CompressingWriter(writer, compression, level)).export(spans)
+                expected = InMemorySpanWriter()
+                ProtoSpanExporter(expected).export(spans)
+                self.assertEqual(writer.get_finished_protos(), expected.get_finished_protos())
+
+    def test_dictionary_improves_small_payloads(self):
+        spans = _finished_spans()[:1]
+        with_dictionary = _DecompressingSpanWriter()
+        ProtoSpanExporter(CompressingWriter(with_dictionary)).export(spans)
+        without_dictionary = _DecompressingSpanWriter(zdict=b"")
+        ProtoSpanExporter(CompressingWriter(without_dictionary, zdict=b"")).export(spans)
+        self.assertLess(with_dictionary.compressed_sizes[0], without_dictionary.compressed_sizes[0])
+        self.assertEqual(with_dictionary.get_finished_protos(), without_dictionary.get_finished_protos())
+
+    def test_custom_dictionary(self):
+        zdict = b"my custom dictionary"
+        writer = _DecompressingSpanWriter(zdict=zdict)
+        ProtoSpanExporter(CompressingWriter(writer, zdict=zdict)).export(_finished_spans())
+        self.assertEqual(len(writer.get_finished_protos()), 1)
+
+    def test_group_similar_spans(self):
+        spans = _finished_spans()
+        writer = InMemorySpanWriter()
+        ProtoSpanExporter(writer, group_similar_spans=True).export(spans)
+        (proto,) = writer.get_finished_protos()
+        encoded = list(proto.resource_spans[0].scope_spans[0].spans)
+        self.assertEqual(len(encoded), len(spans))
+        keys = [(span.trace_id, span.name) for span in encoded]
+        self.assertEqual(keys, sorted(keys))
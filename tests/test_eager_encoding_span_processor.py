@@ -0,0 +1,96 @@
+import unittest
+
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+from opentelemetry.trace import SpanKind
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import (
+    EagerEncodingSpanProcessor,
+    ProtoSpanExporter,
+    SpanWriter,
+)
+from snowflake.telemetry.test.traces_test_utils import (
+    InMemorySpanWriter,
+)
+
+
+class _BytesSpanWriter(SpanWriter):
+    def __init__(self):
+        self.payloads = []
+
+    def write_span(self, serialized_spans: bytes) -> None:
+        self.payloads.append(serialized_spans)
+
+
+class TestEagerEncodingSpanProcessor(unittest.TestCase):
+    def _generate_spans(self, *processors, count=3):
+        memory_exporter = InMemorySpanExporter()
+        providers = [
+            TracerProvider(resource=Resource({"service.name": "first"}, "resource_schema")),
+            TracerProvider(resource=Resource({"service.name": "second"})),
+        ]
+        for tracer_provider in providers:
+            for processor in processors:
+                tracer_provider.add_span_processor(processor)
+            tracer_provider.add_span_processor(SimpleSpanProcessor(memory_exporter))
+            tracers = [
+                tracer_provider.get_tracer("scope1", "1.0", schema_url="scope_schema"),
+                tracer_provider.get_tracer("scope2", attributes={"a": "b"}),
+            ]
+            for i in range(count):
+                for tracer in tracers:
+                    with tracer.start_as_current_span("parent", kind=SpanKind.SERVER) as parent:
+                        parent.set_attribute("i", i)
+                        with tracer.start_as_current_span("child") as child:
+                            child.add_event("event", {"e": True})
+        return memory_exporter.get_finished_spans()
+
+    def test_output_matches_proto_span_exporter(self):
+        writer = _BytesSpanWriter()
+        processor = EagerEncodingSpanProcessor(writer)
+        spans = self._generate_spans(processor)
+        self.assertEqual(writer.payloads, [])
+        self.assertTrue(processor.force_flush())
+        self.assertEqual(writer.payloads, [ProtoSpanExporter._serialize_traces_data(spans)])
+
+    def test_flush_on_batch_size(self):
+        writer = InMemorySpanWriter()
+        processor = EagerEncodingSpanProcessor(writer, max_export_batch_size=5)
+        spans = self._generate_spans(processor, count=5)
+        self.assertEqual(len(spans), 40)
+        protos = writer.get_finished_protos()
+        self.assertEqual(len(protos), 8)
+        for proto in protos:
+            self.assertEqual(
+                sum(len(scope_spans.spans) for resource_spans in proto.resource_spans for scope_spans in resource_spans.scope_spans),
+                5,
+            )
+
+    def test_flush_on_buffer_bytes(self):
+        writer = _BytesSpanWriter()
+        processor = EagerEncodingSpanProcessor(writer, max_buffer_bytes=1)
+        spans = self._generate_spans(processor, count=1)
+        self.assertEqual(len(writer.payloads), len(spans))
+
+    def test_shutdown_flushes_and_drops_later_spans(self):
+        writer = _BytesSpanWriter()
+        processor = EagerEncodingSpanProcessor(writer)
+        self._generate_spans(processor, count=1)
+        processor.shutdown()
+        self.assertEqual(len(writer.payloads), 1)
+        self._generate_spans(processor, count=1)
+        processor.force_flush()
+        self.assertEqual(len(writer.payloads), 1)
+
+    def test_writer_failure_does_not_raise(self):
+        class _FailingSpanWriter(SpanWriter):
+            def write_span(self, serialized_spans: bytes) -> None:
+                raise IOError("broken sink")
+
+        processor = EagerEncodingSpanProcessor(_FailingSpanWriter(), max_export_batch_size=1)
+        with self.assertLogs(level="ERROR"):
+            self._generate_spans(processor, count=1)
+        self.assertTrue(processor.force_flush())
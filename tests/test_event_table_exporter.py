@@ -0,0 +1,205 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from opentelemetry._logs import SeverityNumber
+from opentelemetry.sdk._logs import LogData, LogRecord
+from opentelemetry.sdk._logs.export import LogExportResult
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor, SpanExportResult
+from opentelemetry.sdk.util.instrumentation import InstrumentationScope
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from snowflake.telemetry._internal.exporter.event_table import (
+    EventTableLogExporter,
+    EventTableSpanExporter,
+    EventTableWriter,
+    NDJSONFileWriter,
+    SQLiteEventTableWriter,
+)
+
+
+class _InMemoryEventTableWriter(EventTableWriter):
+    def __init__(self):
+        self.payloads = []
+
+    def write_rows(self, rows: bytes) -> None:
+        self.payloads.append(rows)
+
+    def rows(self):
+        return [json.loads(line) for payload in self.payloads for line in payload.splitlines()]
+
+
+_RESOURCE = Resource({"snow.executable.type": "PROCEDURE", "snow.query.id": "01b42d80"})
+
+
+def _export_spans(exporter):
+    tracer_provider = TracerProvider(resource=_RESOURCE)
+    tracer_provider.add_span_processor(SimpleSpanProcessor(exporter))
+    tracer = tracer_provider.get_tracer("scope", "1.0")
+    with tracer.start_as_current_span("parent", kind=SpanKind.SERVER) as parent:
+        parent.set_attribute("rows", 3)
+        parent.set_attribute("ratio", float("nan"))
+        parent.set_attribute("tags", ["a", "b\n"])
+        with tracer.start_as_current_span("child") as child:
+            child.add_event("retry", {"attempt": 2}, timestamp=1_700_000_000_000_000_001)
+            child.set_status(Status(StatusCode.ERROR, "failed \"badly\""))
+    return parent, child
+
+
+class TestEventTableExporter(unittest.TestCase):
+    def test_spans(self):
+        writer = _InMemoryEventTableWriter()
+        parent, child = _export_spans(EventTableSpanExporter(writer))
+        child_row, event_row, parent_row = writer.rows()
+
+        self.assertEqual(parent_row["RECORD_TYPE"], "SPAN")
+        self.assertEqual(parent_row["TRACE"], {
+            "trace_id": f"{parent.context.trace_id:032x}",
+            "span_id": f"{parent.context.span_id:016x}",
+        })
+        self.assertEqual(parent_row["RESOURCE_ATTRIBUTES"], dict(_RESOURCE.attributes))
+        self.assertEqual(parent_row["SCOPE"], {"name": "scope", "version": "1.0"})
+        self.assertEqual(parent_row["RECORD"], {
+            "name": "parent",
+            "kind": "SPAN_KIND_SERVER",
+            "status": {"code": "STATUS_CODE_UNSET"},
+        })
+        self.assertEqual(parent_row["RECORD_ATTRIBUTES"], {"rows": 3, "ratio": "NaN", "tags": ["a", "b\n"]})
+
+        self.assertEqual(child_row["RECORD"]["parent_span_id"], f"{parent.context.span_id:016x}")
+        self.assertEqual(
+            child_row["RECORD"]["status"],
+            {"code": "STATUS_CODE_ERROR", "message": "failed \"badly\""},
+        )
+        self.assertNotIn("RECORD_ATTRIBUTES", child_row)
+        self.assertEqual(event_row["RECORD_TYPE"], "SPAN_EVENT")
+        self.assertEqual(event_row["TRACE"], child_row["TRACE"])
+        self.assertEqual(event_row["RECORD"], {"name": "retry"})
+        self.assertEqual(event_row["RECORD_ATTRIBUTES"], {"attempt": 2})
+        self.assertEqual(event_row["TIMESTAMP"], "2023-11-14 22:13:20.000000001")
+
+        self.assertEqual(child_row["TIMESTAMP"][-9:], f"{child.end_time % 1_000_000_000:09d}")
+        self.assertLessEqual(child_row["START_TIMESTAMP"], child_row["TIMESTAMP"])
+
+    def test_logs(self):
+        writer = _InMemoryEventTableWriter()
+        exporter = EventTableLogExporter(writer)
+        scope = InstrumentationScope("logger")
+        batch = [
+            LogData(LogRecord(
+                timestamp=1_700_000_000_000_000_000,
+                observed_timestamp=1_700_000_001_000_000_000,
+                trace_id=1,
+                span_id=2,
+                severity_text="WARN",
+                severity_number=SeverityNumber.WARN,
+                body={"message": "hello", "count": 1},
+                resource=_RESOURCE,
+                attributes={"code.lineno": 7},
+            ), scope),
+            LogData(LogRecord(
+                observed_timestamp=1_700_000_001_000_000_000,
+                body="plain",
+                resource=_RESOURCE,
+            ), scope),
+        ]
+        self.assertIs(exporter.export(batch), LogExportResult.SUCCESS)
+        first, second = writer.rows()
+        self.assertEqual(first, {
+            "TIMESTAMP": "2023-11-14 22:13:20.000000000",
+            "OBSERVED_TIMESTAMP": "2023-11-14 22:13:21.000000000",
+            "TRACE": {"trace_id": f"{1:032x}", "span_id": f"{2:016x}"},
+            "RESOURCE_ATTRIBUTES": dict(_RESOURCE.attributes),
+            "SCOPE": {"name": "logger"},
+            "RECORD_TYPE": "LOG",
+            "RECORD": {"severity_text": "WARN", "severity_number": 13},
+            "RECORD_ATTRIBUTES": {"code.lineno": 7},
+            "VALUE": {"message": "hello", "count": 1},
+        })
+        self.assertEqual(second["TIMESTAMP"], second["OBSERVED_TIMESTAMP"])
+        self.assertNotIn("TRACE", second)
+        self.assertEqual(second["VALUE"], "plain")
+
+    def test_failure(self):
+        class _FailingWriter(EventTableWriter):
+            def write_rows(self, rows: bytes) -> None:
+                raise OSError("disk full")
+
+        tracer_provider = TracerProvider()
+        with tracer_provider.get_tracer(__name__).start_as_current_span("span") as span:
+            pass
+        self.assertIs(EventTableSpanExporter(_FailingWriter()).export([span]), SpanExportResult.FAILURE)
+
+    def test_file_writer(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "events.ndjson")
+            exporter = EventTableSpanExporter(NDJSONFileWriter(path))
+            _export_spans(exporter)
+            exporter.shutdown()
+            with open(path, encoding="utf-8") as file:
+                rows = [json.loads(line) for line in file]
+        self.assertEqual([row["RECORD"]["name"] for row in rows], ["child", "retry", "parent"])
+
+
+class TestSQLiteEventTableWriter(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._directory.name, "events.db")
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_queries(self):
+        writer = SQLiteEventTableWriter(self.path, batch_size=2)
+        parent, child = _export_spans(EventTableSpanExporter(writer))
+        trace_id = f"{parent.context.trace_id:032x}"
+        parent_id = f"{parent.context.span_id:016x}"
+        self.assertEqual(writer.query("SELECT journal_mode FROM pragma_journal_mode")[0][0], "wal")
+        self.assertEqual(writer.trace_id_for_query("01B42D80"), trace_id)
+        self.assertIsNone(writer.trace_id_for_query("01b42d81"))
+        self.assertEqual([span["RECORD"]["name"] for span in writer.spans(trace_id)], ["parent", "child"])
+        self.assertEqual(writer.span(parent_id)["RECORD"]["kind"], "SPAN_KIND_SERVER")
+        (only_child,) = writer.children(parent_id)
+        self.assertEqual(only_child["TRACE"]["span_id"], f"{child.context.span_id:016x}")
+        (event,) = writer.events(trace_id)
+        self.assertEqual(event["RECORD"], {"name": "retry"})
+        self.assertEqual(
+            [row["RECORD_TYPE"] for row in writer.between("2023-11-14", "2023-11-15")], ["SPAN_EVENT"],
+        )
+        self.assertEqual(writer.count(), 3)
+        self.assertEqual(writer.count("SPAN"), 2)
+        writer.shutdown()
+
+    def test_failed_insert_keeps_rows(self):
+        writer = SQLiteEventTableWriter(self.path, batch_size=2)
+        writer._connection.execute("PRAGMA busy_timeout = 0")
+        row = b'{"TIMESTAMP": "2023-11-14 22:13:20", "RECORD_TYPE": "LOG"}\n'
+        writer.write_rows(row)
+        blocker = sqlite3.connect(self.path, isolation_level=None)
+        blocker.execute("BEGIN IMMEDIATE")
+        with self.assertRaises(sqlite3.OperationalError):
+            writer.write_rows(row)
+        blocker.execute("ROLLBACK")
+        blocker.close()
+        self.assertTrue(writer.force_flush())
+        self.assertEqual(writer.count(), 2)
+        writer.shutdown()
+
+    def test_batches_and_ndjson(self):
+        ndjson = os.path.join(self._directory.name, "events.ndjson")
+        exporter = EventTableSpanExporter(NDJSONFileWriter(ndjson))
+        for _ in range(3):
+            _export_spans(exporter)
+        exporter.shutdown()
+
+        writer = SQLiteEventTableWriter(self.path, batch_size=4)
+        writer.load_ndjson(ndjson)
+        writer.shutdown()
+        # Another connection sees everything once the writer flushed.
+        reader = SQLiteEventTableWriter(self.path)
+        self.assertEqual(reader.count(), 9)
+        self.assertEqual(reader.count("SPAN_EVENT"), 3)
+        reader.shutdown()
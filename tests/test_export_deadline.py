@@ -0,0 +1,202 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from opentelemetry.proto.metrics.v1.metrics_pb2 import MetricsData as PB2MetricsData
+from opentelemetry.proto.trace.v1.trace_pb2 import TracesData as PB2TracesData
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import (
+    InMemoryMetricReader,
+    MetricExportResult,
+    MetricsData,
+    ResourceMetrics,
+    ScopeMetrics,
+)
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor, SpanExportResult
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+from opentelemetry.sdk.util.instrumentation import InstrumentationScope
+from snowflake.telemetry._internal.exporter.otlp.proto._deadline import (
+    Deadline,
+    DeadlineExceeded,
+    serialize_shards,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto._parallel import (
+    serialize_spans_parallel,
+    span_shards,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.metrics import (
+    MetricWriter,
+    ProtoMetricExporter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import (
+    ProtoSpanExporter,
+)
+from snowflake.telemetry.test.metrics_test_utils import InMemoryMetricWriter
+from snowflake.telemetry.test.metrictestutil import _generate_sum
+from snowflake.telemetry.test.traces_test_utils import InMemorySpanWriter
+
+
+class _ExpiringDeadline(Deadline):
+    """A deadline that expires after it was checked checks times."""
+
+    def __init__(self, checks):
+        super().__init__(60_000)
+        self._checks = checks
+
+    def expired(self) -> bool:
+        self._checks -= 1
+        return self._checks < 0
+
+
+def _finished_spans(count):
+    memory_exporter = InMemorySpanExporter()
+    tracer_provider = TracerProvider()
+    tracer_provider.add_span_processor(SimpleSpanProcessor(memory_exporter))
+    tracer = tracer_provider.get_tracer(__name__)
+    for i in range(count):
+        with tracer.start_as_current_span(f"span{i}"):
+            pass
+    return memory_exporter.get_finished_spans()
+
+
+def _span_names(serialized):
+    traces_data = PB2TracesData()
+    traces_data.ParseFromString(serialized)
+    return [
+        span.name
+        for resource_spans in traces_data.resource_spans
+        for scope_spans in resource_spans.scope_spans
+        for span in scope_spans.spans
+    ]
+
+
+def _metrics_data(count):
+    return MetricsData(
+        resource_metrics=[
+            ResourceMetrics(
+                resource=Resource({"service.name": "metrics"}),
+                scope_metrics=[
+                    ScopeMetrics(
+                        scope=InstrumentationScope("scope"),
+                        metrics=[_generate_sum(f"sum{i}", i) for i in range(count)],
+                        schema_url="",
+                    )
+                ],
+                schema_url="",
+            )
+        ]
+    )
+
+
+def _collected_metrics_data():
+    """Three counters with 5 attribute sets each, collected by the SDK."""
+    reader = InMemoryMetricReader()
+    meter_provider = MeterProvider(
+        metric_readers=[reader], resource=Resource({"service.name": "metrics"})
+    )
+    meter = meter_provider.get_meter("scope")
+    for i in range(3):
+        counter = meter.create_counter(f"counter{i}")
+        for key in range(5):
+            counter.add(1, {"key": key})
+    data = reader.get_metrics_data()
+    meter_provider.shutdown()
+    return data
+
+
+class _RecordingMetricWriter(MetricWriter):
+    def __init__(self):
+        self.payloads = []
+
+    def write_metrics(self, serialized_metrics: bytes) -> None:
+        self.payloads.append(serialized_metrics)
+
+
+class TestDeadline(unittest.TestCase):
+    def test_unbounded(self):
+        deadline = Deadline(None)
+        self.assertFalse(deadline.bounded)
+        self.assertFalse(deadline.expired())
+        self.assertIsNone(deadline.remaining())
+        self.assertEqual(deadline.remaining_millis(123), 123)
+
+    def test_expired(self):
+        deadline = Deadline(0)
+        self.assertTrue(deadline.bounded)
+        self.assertTrue(deadline.expired())
+        self.assertEqual(deadline.remaining(), 0)
+
+    def test_partial_payload(self):
+        spans = _finished_spans(10)
+        shards = span_shards(spans, 3)
+        with self.assertRaises(DeadlineExceeded) as context:
+            serialize_shards(shards, ProtoSpanExporter._serialize_traces_data, len, _ExpiringDeadline(2))
+        self.assertEqual(context.exception.dropped, 4)
+        self.assertEqual(_span_names(context.exception.payload), [f"span{i}" for i in range(6)])
+
+    def test_parallel_expired(self):
+        spans = _finished_spans(10)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            with self.assertRaises(DeadlineExceeded) as context:
+                serialize_spans_parallel(executor, spans, 3, Deadline(0))
+        self.assertEqual(context.exception.dropped, 10)
+        self.assertEqual(context.exception.payload, b"")
+
+
+class TestExportDeadline(unittest.TestCase):
+    def test_span_exporter_timeout(self):
+        writer = InMemorySpanWriter()
+        exporter = ProtoSpanExporter(writer, export_timeout_millis=0)
+        self.assertIs(exporter.export(_finished_spans(3)), SpanExportResult.FAILURE)
+        self.assertEqual(writer.get_finished_protos(), ())
+        self.assertEqual(exporter.dropped_spans, 3)
+
+    def test_span_exporter_in_time(self):
+        spans = _finished_spans(10)
+        writer = InMemorySpanWriter()
+        exporter = ProtoSpanExporter(writer, shard_size=3, export_timeout_millis=60_000)
+        self.assertIs(exporter.export(spans), SpanExportResult.SUCCESS)
+        (proto,) = writer.get_finished_protos()
+        self.assertEqual(_span_names(proto.SerializeToString()), [f"span{i}" for i in range(10)])
+        self.assertEqual(exporter.dropped_spans, 0)
+
+    def test_metric_exporter_timeout(self):
+        writer = InMemoryMetricWriter()
+        exporter = ProtoMetricExporter(writer)
+        self.assertIs(exporter.export(_metrics_data(5), timeout_millis=0), MetricExportResult.FAILURE)
+        self.assertEqual(writer.get_finished_protos(), ())
+        self.assertEqual(exporter.dropped_data_points, 5)
+
+    def test_metric_exporter_in_time(self):
+        data = _metrics_data(5)
+        writer = InMemoryMetricWriter()
+        exporter = ProtoMetricExporter(writer, shard_size=2)
+        self.assertIs(exporter.export(data, timeout_millis=60_000), MetricExportResult.SUCCESS)
+        (proto,) = writer.get_finished_protos()
+        self.assertEqual(
+            [metric.name for resource_metrics in proto.resource_metrics
+             for scope_metrics in resource_metrics.scope_metrics for metric in scope_metrics.metrics],
+            [f"sum{i}" for i in range(5)],
+        )
+
+    def test_metric_exporter_payload_unchanged(self):
+        data = _collected_metrics_data()
+        writer = _RecordingMetricWriter()
+        exporter = ProtoMetricExporter(writer, shard_size=4)
+        self.assertIs(exporter.export(data), MetricExportResult.SUCCESS)
+        self.assertEqual(writer.payloads, [ProtoMetricExporter._serialize_metrics_data(data)])
+
+    def test_metric_exporter_timeout_between_shards(self):
+        data = _collected_metrics_data()
+        with self.assertRaises(DeadlineExceeded) as context:
+            ProtoMetricExporter(InMemoryMetricWriter(), shard_size=4)._serialize(data, _ExpiringDeadline(2))
+        # The first shard holds the first metric and its 5 data points.
+        self.assertEqual(context.exception.dropped, 10)
+        partial = PB2MetricsData()
+        partial.ParseFromString(context.exception.payload)
+        (resource_metrics,) = partial.resource_metrics
+        (scope_metrics,) = resource_metrics.scope_metrics
+        self.assertEqual([metric.name for metric in scope_metrics.metrics], ["counter0"])
@@ -0,0 +1,106 @@
+import unittest
+
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor, SpanExportResult
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import (
+    ProtoSpanExporter,
+    SpanWriter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.writers import (
+    BatchingWriter,
+    ExporterStats,
+)
+from snowflake.telemetry.test.traces_test_utils import InMemorySpanWriter
+
+
+class _FailingWriter(SpanWriter):
+    def write_span(self, serialized_spans: bytes) -> None:
+        raise ConnectionError("sink is down")
+
+
+def _export_spans(exporter, count):
+    tracer_provider = TracerProvider()
+    tracer_provider.add_span_processor(SimpleSpanProcessor(exporter))
+    tracer = tracer_provider.get_tracer(__name__)
+    for i in range(count):
+        with tracer.start_as_current_span(f"span{i}"):
+            pass
+    return tracer_provider
+
+
+class TestExporterStats(unittest.TestCase):
+    def test_histogram(self):
+        stats = ExporterStats()
+        for seconds in (0.001, 0.002, 0.003, 2.0):
+            stats.record_encode(seconds)
+        histogram = stats.snapshot()["encode_seconds"]
+        self.assertEqual(histogram.count, 4)
+        self.assertAlmostEqual(histogram.sum, 2.006)
+        self.assertEqual((histogram.min, histogram.max), (0.001, 2.0))
+        self.assertEqual(sum(histogram.counts), 4)
+        self.assertEqual(histogram.quantile(0.5), 0.0025)
+        self.assertEqual(histogram.quantile(1.0), 2.0)
+
+    def test_span_exporter(self):
+        stats = ExporterStats()
+        writer = InMemorySpanWriter()
+        _export_spans(ProtoSpanExporter(writer, stats=stats), 3)
+        snapshot = stats.snapshot()
+        self.assertEqual(snapshot["exported_payloads"], 3)
+        self.assertEqual(snapshot["exported_items"], 3)
+        self.assertEqual(snapshot["encode_seconds"].count, 3)
+        self.assertEqual(snapshot["serialize_seconds"].count, 3)
+        self.assertEqual(snapshot["write_seconds"].count, 3)
+        self.assertEqual(
+            snapshot["payload_bytes"].sum,
+            sum(len(proto.SerializeToString()) for proto in writer.get_finished_protos()),
+        )
+        self.assertEqual(snapshot["failures"], {})
+
+    def test_failures_and_drops(self):
+        stats = ExporterStats()
+        exporter = ProtoSpanExporter(_FailingWriter(), stats=stats)
+        tracer_provider = TracerProvider()
+        tracer = tracer_provider.get_tracer(__name__)
+        with tracer.start_as_current_span("span") as span:
+            pass
+        self.assertIs(exporter.export([span]), SpanExportResult.FAILURE)
+        exporter = ProtoSpanExporter(InMemorySpanWriter(), export_timeout_millis=0, stats=stats)
+        self.assertIs(exporter.export([span]), SpanExportResult.FAILURE)
+        snapshot = stats.snapshot()
+        self.assertEqual(snapshot["failures"], {"ConnectionError": 1, "DeadlineExceeded": 1})
+        self.assertEqual(snapshot["dropped_items"], 1)
+        self.assertEqual(snapshot["exported_items"], 0)
+
+    def test_queue_depth(self):
+        stats = ExporterStats()
+        writer = BatchingWriter(InMemorySpanWriter())
+        stats.add_queue(lambda: writer.queue_depth)
+        stats.add_queue(lambda: 2)
+        self.assertEqual(stats.snapshot()["queue_depth"], 2)
+        writer.shutdown()
+
+    def test_otel_metrics(self):
+        reader = InMemoryMetricReader()
+        stats = ExporterStats(MeterProvider(metric_readers=[reader]), {"signal": "spans"})
+        stats.add_queue(lambda: 5)
+        _export_spans(ProtoSpanExporter(InMemorySpanWriter(), stats=stats), 2)
+        stats.record_failure(ValueError())
+        metrics = {
+            metric.name: metric.data.data_points
+            for resource_metrics in reader.get_metrics_data().resource_metrics
+            for scope_metrics in resource_metrics.scope_metrics
+            for metric in scope_metrics.metrics
+        }
+        prefix = "snowflake.telemetry.exporter."
+        (items,) = metrics[prefix + "items"]
+        self.assertEqual(items.value, 2)
+        self.assertEqual(dict(items.attributes), {"signal": "spans"})
+        (write_duration,) = metrics[prefix + "write.duration"]
+        self.assertEqual(write_duration.count, 2)
+        (queue_depth,) = metrics[prefix + "queue.depth"]
+        self.assertEqual(queue_depth.value, 5)
+        (failures,) = metrics[prefix + "failures"]
+        self.assertEqual(dict(failures.attributes), {"signal": "spans", "error.type": "ValueError"})
@@ -0,0 +1,202 @@
+import os
+import tempfile
+import threading
+import unittest
+import warnings
+
+from snowflake.telemetry._internal.exporter.event_table import NDJSONFileWriter
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import SpanWriter
+from snowflake.telemetry._internal.exporter.otlp.proto.writers import (
+    BatchingWriter,
+    CoalescingWriter,
+    SharedMemoryRingWriter,
+    SpillingWriter,
+)
+from snowflake.telemetry.trace import SnowflakeTraceIdGenerator
+
+
+class _BlockingWriter(SpanWriter):
+    """Records payloads, blocking the writes of the process that created it."""
+
+    def __init__(self):
+        self.spans = []
+        self.pid = os.getpid()
+        self.release = threading.Event()
+        self.writing = threading.Event()
+
+    def write_span(self, serialized_spans: bytes) -> None:
+        if os.getpid() == self.pid:
+            self.writing.set()
+            self.release.wait()
+        self.spans.append(serialized_spans)
+
+
+class _ChildFailingWriter(SpanWriter):
+    """Records payloads, failing the writes of forked children."""
+
+    def __init__(self):
+        self.spans = []
+        self.pid = os.getpid()
+
+    def write_span(self, serialized_spans: bytes) -> None:
+        if os.getpid() != self.pid:
+            raise IOError("sink unavailable")
+        self.spans.append(serialized_spans)
+
+
+def _run_in_child(test):
+    """
+    Runs test in a forked child and returns what it wrote to the pipe it is
+    given, failing if it raised.
+    """
+    read_fd, write_fd = os.pipe()
+    with warnings.catch_warnings():
+        # Python 3.12+ warns about forking a process with threads, which is
+        # what is tested here.
+        warnings.simplefilter("ignore", DeprecationWarning)
+        pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            os.close(read_fd)
+            with os.fdopen(write_fd, "wb") as pipe:
+                test(pipe)
+            status = 0
+        finally:
+            os._exit(status)  # pylint: disable=protected-access
+    os.close(write_fd)
+    with os.fdopen(read_fd, "rb") as pipe:
+        output = pipe.read()
+    _, status = os.waitpid(pid, 0)
+    if status != 0:
+        raise AssertionError(f"child failed: {output!r}")
+    return output
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "requires os.fork")
+class TestForkSafety(unittest.TestCase):
+    def test_batching_writer(self):
+        inner = _BlockingWriter()
+        writer = BatchingWriter(inner)
+        writer.write_span(b"parent 1")
+        self.assertTrue(inner.writing.wait(5))
+        writer.write_span(b"parent 2")
+
+        def child(pipe):
+            assert writer.queue_depth == 0, writer.queue_depth
+            writer.write_span(b"child")
+            assert writer.force_flush(5_000)
+            pipe.write(b",".join(inner.spans))
+
+        self.assertEqual(_run_in_child(child), b"child")
+        inner.release.set()
+        self.assertTrue(writer.force_flush(5_000))
+        self.assertEqual(inner.spans, [b"parent 1", b"parent 2"])
+        writer.shutdown()
+
+    def test_coalescing_writer(self):
+        inner = _BlockingWriter()
+        inner.release.set()
+        writer = CoalescingWriter(inner, max_delay_millis=60_000)
+        writer.write_span(b"")
+        writer.write_span(b"\n\x00")
+
+        def child(pipe):
+            writer.write_span(b"\n\x01")
+            assert writer.force_flush(5_000)
+            pipe.write(b",".join(inner.spans))
+
+        self.assertEqual(_run_in_child(child), b"\n\x01")
+        writer.shutdown()
+        self.assertEqual(inner.spans, [b"\n\x00"])
+
+    def test_spilling_writer(self):
+        with tempfile.TemporaryDirectory() as directory:
+            inner = _BlockingWriter()
+            writer = SpillingWriter(inner, directory, max_memory_payloads=1)
+            writer.write_span(b"parent 1")
+            self.assertTrue(inner.writing.wait(5))
+            writer.write_span(b"parent 2")
+            self.assertEqual(writer.disk_payloads, 2)
+
+            def child(pipe):
+                assert writer.disk_payloads == 0, writer.disk_payloads
+                writer.write_span(b"child")
+                assert writer.force_flush(5_000)
+                writer.shutdown(5_000)
+                pipe.write(b",".join(inner.spans))
+
+            self.assertEqual(_run_in_child(child), b"child")
+            # The child did not spill, so it left no directory of its own.
+            self.assertEqual([name for name in os.listdir(directory) if name.startswith("fork-")], [])
+            inner.release.set()
+            self.assertTrue(writer.force_flush(5_000))
+            writer.shutdown()
+            self.assertEqual(inner.spans, [b"parent 1", b"parent 2"])
+
+    def test_spilling_writer_replays_children(self):
+        with tempfile.TemporaryDirectory() as directory:
+            inner = _ChildFailingWriter()
+            writer = SpillingWriter(inner, directory, max_memory_payloads=1)
+
+            def child(pipe):
+                with self.assertLogs(level="WARNING"):
+                    for i in range(3):
+                        writer.write_span(b"child %d" % i)
+                    writer.shutdown(50)
+                pipe.write(b"%d" % os.getpid())
+
+            child_pid = int(_run_in_child(child))
+            self.assertEqual(
+                [name for name in os.listdir(directory) if name.startswith("fork-")], [f"fork-{child_pid}"]
+            )
+            writer.shutdown()
+
+            recovered = _BlockingWriter()
+            recovered.release.set()
+            with self.assertLogs(level="INFO"):
+                writer = SpillingWriter(recovered, directory)
+            self.assertTrue(writer.force_flush(5_000))
+            self.assertEqual(recovered.spans, [b"child 0", b"child 1", b"child 2"])
+            self.assertEqual([name for name in os.listdir(directory) if name.startswith("fork-")], [])
+            writer.shutdown()
+
+    def test_ndjson_file_writer(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "events.ndjson")
+            writer = NDJSONFileWriter(path)
+            writer.write_rows(b'{"parent":1}\n')
+
+            def child(pipe):
+                writer.write_rows(b'{"child":1}\n')
+                writer.shutdown()
+
+            _run_in_child(child)
+            writer.write_rows(b'{"parent":2}\n')
+            writer.shutdown()
+            with open(path, "rb") as file:
+                self.assertEqual(file.read(), b'{"parent":1}\n{"child":1}\n{"parent":2}\n')
+
+    def test_shared_memory_ring_writer(self):
+        writer = SharedMemoryRingWriter(capacity=1024)
+
+        def child(pipe):
+            writer.write_span(b"child")
+            writer.shutdown()
+            pipe.write(str(writer.dropped_payloads).encode())
+
+        self.assertEqual(_run_in_child(child), b"1")
+        # The child did not unlink the ring.
+        writer.write_span(b"parent")
+        self.assertEqual(writer.dropped_payloads, 0)
+        writer.shutdown()
+
+    def test_trace_id_generator(self):
+        id_generator = SnowflakeTraceIdGenerator()
+
+        def child(pipe):
+            pipe.write(b"%d %d" % (id_generator.generate_trace_id(), id_generator.generate_span_id()))
+
+        trace_id, span_id = map(int, _run_in_child(child).split())
+        self.assertNotEqual(trace_id, id_generator.generate_trace_id())
+        self.assertNotEqual(span_id, id_generator.generate_span_id())
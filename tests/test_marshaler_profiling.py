@@ -0,0 +1,67 @@
+import unittest
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import (
+    ProtoSpanExporter,
+)
+from snowflake.telemetry._internal.opentelemetry.proto.common.v1.common_marshaler import (
+    KeyValue,
+)
+from snowflake.telemetry._internal.opentelemetry.proto.trace.v1.trace_marshaler import (
+    Span,
+    TracesData,
+)
+from snowflake.telemetry._internal.serialize import profiling
+
+
+def _finished_spans(count):
+    memory_exporter = InMemorySpanExporter()
+    tracer_provider = TracerProvider()
+    tracer_provider.add_span_processor(SimpleSpanProcessor(memory_exporter))
+    tracer = tracer_provider.get_tracer(__name__)
+    for i in range(count):
+        with tracer.start_as_current_span(f"span{i}", attributes={"index": i}):
+            pass
+    return memory_exporter.get_finished_spans()
+
+
+class TestMarshalerProfiling(unittest.TestCase):
+    def tearDown(self):
+        profiling.disable()
+        profiling.reset()
+
+    def test_counts(self):
+        spans = _finished_spans(3)
+        with profiling.profile():
+            self.assertTrue(profiling.is_enabled())
+            payload = ProtoSpanExporter._serialize_traces_data(spans)
+        snapshot = profiling.snapshot()
+        self.assertEqual(snapshot["Span"].objects, 3)
+        self.assertEqual(snapshot["Span"].size_calls, 3)
+        self.assertEqual(snapshot["Span"].write_calls, 3)
+        self.assertGreaterEqual(snapshot["KeyValue"].objects, 3)
+        self.assertEqual(snapshot["TracesData"].bytes_written, len(payload))
+        self.assertGreater(snapshot["ScopeSpans"].bytes_written, snapshot["Span"].bytes_written)
+        for profile in snapshot.values():
+            self.assertLessEqual(profile.self_seconds, profile.size_seconds + profile.write_seconds + 1e-9)
+        table = profiling.report()
+        self.assertTrue(table.startswith("class"))
+        self.assertIn("TracesData", table)
+        self.assertEqual(len(profiling.report(limit=2).splitlines()), 3)
+
+    def test_disabled(self):
+        init, write_to = Span.__init__, TracesData.write_to
+        profiling.enable()
+        self.assertIsNot(Span.__init__, init)
+        profiling.disable()
+        self.assertFalse(profiling.is_enabled())
+        self.assertIs(Span.__init__, init)
+        self.assertIs(TracesData.write_to, write_to)
+        ProtoSpanExporter._serialize_traces_data(_finished_spans(1))
+        self.assertEqual(profiling.snapshot(), {})
+        KeyValue(key="key")
+        self.assertEqual(profiling.snapshot(), {})
@@ -0,0 +1,189 @@
+import logging
+import unittest
+
+from opentelemetry.sdk._logs import LoggerProvider, LoggingHandler
+from opentelemetry.sdk._logs.export import SimpleLogRecordProcessor
+from opentelemetry.sdk.trace import SpanLimits, TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+from opentelemetry.trace import Link, Status, StatusCode
+from snowflake.telemetry._internal.exporter.otlp.proto._memory_pressure import (
+    current_rss_bytes,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.logs import ProtoLogExporter
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import (
+    EagerEncodingSpanProcessor,
+    ProtoSpanExporter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.writers import (
+    MemoryPressure,
+    MemoryPressureMonitor,
+)
+from snowflake.telemetry.test.logs_test_utils import InMemoryLogWriter
+from snowflake.telemetry.test.traces_test_utils import InMemorySpanWriter
+
+_NO_RSS_LIMIT = (1 << 62, 1 << 62, 1 << 62)
+
+
+class _FlushCountingLogWriter(InMemoryLogWriter):
+    def __init__(self):
+        super().__init__()
+        self.flushes = 0
+
+    def force_flush(self, timeout_millis: float = 30_000) -> bool:
+        self.flushes += 1
+        return True
+
+
+def _monitor(buffered):
+    monitor = MemoryPressureMonitor(rss_watermarks=_NO_RSS_LIMIT, buffer_watermarks=(100, 200, 300))
+    monitor.add_buffer(lambda: buffered[0])
+    return monitor
+
+
+def _span_names(writer):
+    return [
+        span.name
+        for traces_data in writer.get_finished_protos()
+        for resource_spans in traces_data.resource_spans
+        for scope_spans in resource_spans.scope_spans
+        for span in scope_spans.spans
+    ]
+
+
+def _end_spans(processor, names, error_names=()):
+    tracer_provider = TracerProvider()
+    tracer_provider.add_span_processor(processor)
+    tracer = tracer_provider.get_tracer(__name__)
+    for name in names:
+        with tracer.start_as_current_span(name, record_exception=False, set_status_on_exception=False) as span:
+            span.set_attribute("query", "x" * 2000)
+            if name in error_names:
+                span.set_status(Status(StatusCode.ERROR))
+    return tracer_provider
+
+
+class TestMemoryPressureMonitor(unittest.TestCase):
+    def test_levels(self):
+        buffered = [0]
+        monitor = _monitor(buffered)
+        self.assertIs(monitor.level(), MemoryPressure.NORMAL)
+        buffered[0] = 150
+        with self.assertLogs(level="WARNING"):
+            self.assertIs(monitor.level(), MemoryPressure.ELEVATED)
+        buffered[0] = 1000
+        self.assertIs(monitor.level(), MemoryPressure.CRITICAL)
+        buffered[0] = 0
+        self.assertIs(monitor.level(), MemoryPressure.NORMAL)
+
+    def test_rss_watermarks(self):
+        rss = current_rss_bytes()
+        self.assertGreater(rss, 0)
+        monitor = MemoryPressureMonitor(rss_watermarks=(1, rss * 100, rss * 200))
+        self.assertIs(monitor.level(), MemoryPressure.ELEVATED)
+
+    def test_invalid_watermarks(self):
+        with self.assertRaises(ValueError):
+            MemoryPressureMonitor(buffer_watermarks=(1, 2))
+
+
+class TestMemoryPressureDegradation(unittest.TestCase):
+    def test_log_exporter(self):
+        buffered = [250]
+        monitor = _monitor(buffered)
+        writer = _FlushCountingLogWriter()
+        logger_provider = LoggerProvider()
+        logger_provider.add_log_record_processor(SimpleLogRecordProcessor(ProtoLogExporter(writer, monitor)))
+        logger = logging.getLogger("test_memory_pressure")
+        logger.propagate = False
+        logger.setLevel(logging.DEBUG)
+        handler = LoggingHandler(logger_provider=logger_provider)
+        logger.addHandler(handler)
+        try:
+            logger.debug("debug")
+            logger.info("info")
+            logger.warning("w" * 2000, extra={"key": "v" * 2000})
+            buffered[0] = 0
+            logger.info("info after")
+        finally:
+            logger.removeHandler(handler)
+            logger_provider.shutdown()
+        records = [
+            record
+            for logs_data in writer.get_finished_protos()
+            for resource_logs in logs_data.resource_logs
+            for scope_logs in resource_logs.scope_logs
+            for record in scope_logs.log_records
+        ]
+        self.assertEqual([record.body.string_value for record in records], ["w" * 1024, "info after"])
+        attributes = {attribute.key: attribute.value.string_value for attribute in records[0].attributes}
+        self.assertEqual(attributes["key"], "v" * 1024)
+        self.assertEqual(monitor.degradations["dropped_logs"], 2)
+        self.assertEqual(monitor.degradations["truncated_attributes"], 1)
+        self.assertEqual(monitor.degradations["early_flushes"], 3)
+        self.assertEqual(writer.flushes, 3)
+
+    def test_span_exporter_keeps_error_spans(self):
+        monitor = _monitor([1000])
+        writer = InMemorySpanWriter()
+        tracer_provider = _end_spans(
+            SimpleSpanProcessor(ProtoSpanExporter(writer, memory_monitor=monitor)),
+            [f"span{i}" for i in range(20)],
+            error_names={"span3"},
+        )
+        tracer_provider.shutdown()
+        self.assertEqual(_span_names(writer), ["span3"])
+        self.assertEqual(monitor.degradations["sampled_out_spans"], 19)
+        span = writer.get_finished_protos()[0].resource_spans[0].scope_spans[0].spans[0]
+        self.assertEqual(span.attributes[0].value.string_value, "x" * 128)
+
+    def test_truncation_keeps_drop_counts(self):
+        memory_exporter = InMemorySpanExporter()
+        tracer_provider = TracerProvider(
+            span_limits=SpanLimits(max_span_attributes=1, max_events=1, max_links=1)
+        )
+        tracer_provider.add_span_processor(SimpleSpanProcessor(memory_exporter))
+        tracer = tracer_provider.get_tracer(__name__)
+        with tracer.start_as_current_span("linked") as linked:
+            pass
+        links = [Link(linked.get_span_context()), Link(linked.get_span_context())]
+        with tracer.start_as_current_span("span", links=links) as span:
+            span.set_attributes({"other": 1, "query": "x" * 2000})
+            span.add_event("first")
+            span.add_event("second")
+        monitor = MemoryPressureMonitor(rss_watermarks=_NO_RSS_LIMIT, span_sample_ratios=(1.0, 1.0, 1.0))
+        (degraded,) = monitor.degrade_spans([memory_exporter.get_finished_spans()[1]], MemoryPressure.HIGH)
+        self.assertEqual(degraded.attributes["query"], "x" * 1024)
+        self.assertEqual(degraded.dropped_attributes, 1)
+        self.assertEqual([event.name for event in degraded.events], ["second"])
+        self.assertEqual(degraded.dropped_events, 1)
+        self.assertEqual(len(degraded.links), 1)
+        self.assertEqual(degraded.dropped_links, 1)
+
+    def test_span_exporter_without_pressure(self):
+        monitor = _monitor([0])
+        writer = InMemorySpanWriter()
+        _end_spans(
+            SimpleSpanProcessor(ProtoSpanExporter(writer, memory_monitor=monitor)), ["a", "b"]
+        ).shutdown()
+        self.assertEqual(_span_names(writer), ["a", "b"])
+        self.assertEqual(sum(monitor.degradations.values()), 0)
+
+    def test_eager_encoding_flushes_early(self):
+        monitor = MemoryPressureMonitor(
+            rss_watermarks=_NO_RSS_LIMIT,
+            buffer_watermarks=(1, 1 << 40, 1 << 40),
+            max_attribute_lengths=(16, 16, 16),
+        )
+        writer = InMemorySpanWriter()
+        processor = EagerEncodingSpanProcessor(writer, memory_monitor=monitor)
+        tracer_provider = _end_spans(processor, ["a"])
+        # Nothing is buffered, so the pressure is still normal.
+        self.assertEqual(writer.get_finished_protos(), ())
+        _end_spans(processor, ["b"])
+        self.assertEqual(_span_names(writer), ["a", "b"])
+        self.assertEqual(monitor.degradations["early_flushes"], 1)
+        self.assertEqual(monitor.degradations["truncated_attributes"], 1)
+        tracer_provider.shutdown()
@@ -0,0 +1,225 @@
+import unittest
+
+from opentelemetry.sdk.metrics.export import (
+    AggregationTemporality,
+    Buckets,
+    ExponentialHistogram,
+    ExponentialHistogramDataPoint,
+    Histogram,
+    HistogramDataPoint,
+    Metric,
+    MetricsData,
+    NumberDataPoint,
+    ResourceMetrics,
+    ScopeMetrics,
+    Sum,
+)
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.util.instrumentation import InstrumentationScope
+from snowflake.telemetry._internal.exporter.otlp.proto.metrics import (
+    ProtoMetricExporter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.metrics._cardinality import (
+    CardinalityLimiter,
+)
+from snowflake.telemetry.test.metrics_test_utils import (
+    InMemoryMetricWriter,
+)
+
+
+def _metrics_data(data) -> MetricsData:
+    return MetricsData(
+        resource_metrics=[
+            ResourceMetrics(
+                resource=Resource({"service.name": "test"}),
+                scope_metrics=[
+                    ScopeMetrics(
+                        scope=InstrumentationScope("scope"),
+                        metrics=[Metric(name="metric", description="", unit="", data=data)],
+                        schema_url="",
+                    )
+                ],
+                schema_url="",
+            )
+        ]
+    )
+
+
+def _sum(row_ids, value=1) -> MetricsData:
+    return _metrics_data(
+        Sum(
+            data_points=[
+                NumberDataPoint(
+                    attributes={"row": row_id},
+                    start_time_unix_nano=1,
+                    time_unix_nano=2,
+                    value=value,
+                )
+                for row_id in row_ids
+            ],
+            aggregation_temporality=AggregationTemporality.DELTA,
+            is_monotonic=True,
+        )
+    )
+
+
+def _points(data: MetricsData):
+    return data.resource_metrics[0].scope_metrics[0].metrics[0].data.data_points
+
+
+class TestCardinalityLimiter(unittest.TestCase):
+    def test_under_limit_is_unchanged(self):
+        limiter = CardinalityLimiter(4)
+        data = _sum(range(3))
+        self.assertIs(limiter.apply(data), data)
+        self.assertEqual(limiter.overflow_count, 0)
+
+    def test_sum_overflow(self):
+        limiter = CardinalityLimiter(3)
+        points = _points(limiter.apply(_sum(range(5), value=2)))
+        self.assertEqual(len(points), 3)
+        overflow = points[-1]
+        self.assertEqual(dict(overflow.attributes), {"otel.metric.overflow": True})
+        self.assertEqual(overflow.value, 6)
+        self.assertEqual(sum(p.value for p in points), 10)
+        self.assertEqual(limiter.overflow_count, 3)
+
+    def test_overflow_count_counts_attribute_sets_once(self):
+        limiter = CardinalityLimiter(3)
+        # Cumulative temporality reports the same attribute sets every time.
+        for _ in range(3):
+            limiter.apply(_sum(range(5)))
+        self.assertEqual(limiter.overflow_count, 3)
+        limiter.apply(_sum(range(6)))
+        self.assertEqual(limiter.overflow_count, 4)
+
+    def test_known_attribute_sets_keep_their_slot(self):
+        limiter = CardinalityLimiter(3)
+        limiter.apply(_sum([0, 1]))
+        points = _points(limiter.apply(_sum([5, 6, 7, 0, 1])))
+        self.assertEqual(
+            [dict(p.attributes) for p in points],
+            [{"row": 0}, {"row": 1}, {"otel.metric.overflow": True}],
+        )
+
+    def test_least_recently_seen_are_evicted(self):
+        limiter = CardinalityLimiter(3)
+        limiter.apply(_sum([0, 1]))
+        limiter.apply(_sum([1, 2]))
+        points = _points(limiter.apply(_sum([0, 1, 2])))
+        self.assertEqual(
+            [dict(p.attributes) for p in points],
+            [{"row": 1}, {"row": 2}, {"otel.metric.overflow": True}],
+        )
+
+    def test_histogram_overflow(self):
+        limiter = CardinalityLimiter(1)
+        data = _metrics_data(
+            Histogram(
+                data_points=[
+                    HistogramDataPoint(
+                        attributes={"row": i},
+                        start_time_unix_nano=1,
+                        time_unix_nano=2,
+                        count=2,
+                        sum=3 + i,
+                        bucket_counts=[1, 1],
+                        explicit_bounds=[10.0],
+                        min=i,
+                        max=10 + i,
+                    )
+                    for i in range(3)
+                ],
+                aggregation_temporality=AggregationTemporality.DELTA,
+            )
+        )
+        points = _points(limiter.apply(data))
+        self.assertEqual(len(points), 1)
+        self.assertEqual(points[0].count, 6)
+        self.assertEqual(points[0].sum, 12)
+        self.assertEqual(points[0].bucket_counts, [3, 3])
+        self.assertEqual((points[0].min, points[0].max), (0, 12))
+
+    def test_histogram_with_different_boundaries_is_not_folded(self):
+        limiter = CardinalityLimiter(1)
+
+        def point(row, explicit_bounds):
+            return HistogramDataPoint(
+                attributes={"row": row},
+                start_time_unix_nano=1,
+                time_unix_nano=2,
+                count=1,
+                sum=1,
+                bucket_counts=[1] + [0] * len(explicit_bounds),
+                explicit_bounds=explicit_bounds,
+                min=1,
+                max=1,
+            )
+
+        data = _metrics_data(
+            Histogram(
+                data_points=[point(0, [10.0]), point(1, [5.0]), point(2, [10.0])],
+                aggregation_temporality=AggregationTemporality.DELTA,
+            )
+        )
+        with self.assertLogs(level="WARNING"):
+            points = _points(limiter.apply(data))
+        self.assertEqual(
+            [(dict(p.attributes), p.count) for p in points],
+            [({"row": 1}, 1), ({"otel.metric.overflow": True}, 2)],
+        )
+        self.assertEqual(limiter.overflow_count, 2)
+
+    def test_exponential_histogram_overflow_downscales(self):
+        limiter = CardinalityLimiter(1)
+
+        def point(scale, offset, counts):
+            return ExponentialHistogramDataPoint(
+                attributes={"scale": scale},
+                start_time_unix_nano=1,
+                time_unix_nano=2,
+                count=sum(counts),
+                sum=1.0,
+                scale=scale,
+                zero_count=1,
+                positive=Buckets(offset=offset, bucket_counts=counts),
+                negative=Buckets(offset=0, bucket_counts=[]),
+                flags=0,
+                min=0.0,
+                max=1.0,
+            )
+
+        data = _metrics_data(
+            ExponentialHistogram(
+                data_points=[point(1, 2, [1, 1, 1]), point(0, 1, [5])],
+                aggregation_temporality=AggregationTemporality.DELTA,
+            )
+        )
+        (merged,) = _points(limiter.apply(data))
+        self.assertEqual(merged.scale, 0)
+        self.assertEqual(merged.zero_count, 2)
+        # indexes 2, 3, 4 at scale 1 are 1, 1, 2 at scale 0
+        self.assertEqual(merged.positive.offset, 1)
+        self.assertEqual(merged.positive.bucket_counts, [7, 1])
+
+
+class TestProtoMetricExporterCardinalityLimit(unittest.TestCase):
+    def test_export_with_cardinality_limit(self):
+        writer = InMemoryMetricWriter()
+        exporter = ProtoMetricExporter(writer, cardinality_limit=10)
+        exporter.export(_sum(range(100)))
+        (proto,) = writer.get_finished_protos()
+        data_points = proto.resource_metrics[0].scope_metrics[0].metrics[0].sum.data_points
+        self.assertEqual(len(data_points), 10)
+        self.assertEqual(data_points[-1].attributes[0].key, "otel.metric.overflow")
+        self.assertTrue(data_points[-1].attributes[0].value.bool_value)
+        self.assertEqual(sum(p.as_int for p in data_points), 100)
+        self.assertEqual(exporter.overflow_count, 91)
+
+    def test_export_without_cardinality_limit(self):
+        writer = InMemoryMetricWriter()
+        exporter = ProtoMetricExporter(writer)
+        exporter.export(_sum(range(100)))
+        (proto,) = writer.get_finished_protos()
+        self.assertEqual(len(proto.resource_metrics[0].scope_metrics[0].metrics[0].sum.data_points), 100)
+        self.assertEqual(exporter.overflow_count, 0)
@@ -0,0 +1,195 @@
+import io
+import logging
+import os
+import tempfile
+import time
+import unittest
+
+from opentelemetry.sdk._logs import LoggerProvider, LoggingHandler
+from opentelemetry.sdk._logs.export import SimpleLogRecordProcessor
+from opentelemetry.sdk.metrics.export import (
+    MetricsData,
+    ResourceMetrics,
+    ScopeMetrics,
+)
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.util.instrumentation import InstrumentationScope
+from snowflake.telemetry._internal.exporter.otlp.proto.logs import (
+    LogWriter,
+    ProtoLogExporter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.metrics import (
+    MetricWriter,
+    ProtoMetricExporter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import (
+    ProtoSpanExporter,
+    SpanWriter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.writers import (
+    MultiplexedStreamReader,
+    MultiplexingWriter,
+)
+from snowflake.telemetry.test.metrictestutil import _generate_sum
+
+_RESOURCE = Resource({"service.name": "test", "snow.executable.name": "udf(x INT)" * 10})
+
+
+class _RecordingWriter(SpanWriter, MetricWriter, LogWriter):
+    def __init__(self):
+        self.payloads = []
+
+    def write_span(self, serialized_spans: bytes) -> None:
+        self.payloads.append(("spans", serialized_spans))
+
+    def write_metrics(self, serialized_metrics: bytes) -> None:
+        self.payloads.append(("metrics", serialized_metrics))
+
+    def write_logs(self, serialized_logs: bytes) -> None:
+        self.payloads.append(("logs", serialized_logs))
+
+
+def _generate_payloads(count=3):
+    writer = _RecordingWriter()
+    tracer_provider = TracerProvider(resource=_RESOURCE)
+    tracer_provider.add_span_processor(SimpleSpanProcessor(ProtoSpanExporter(writer)))
+    logger_provider = LoggerProvider(resource=_RESOURCE)
+    logger_provider.add_log_record_processor(SimpleLogRecordProcessor(ProtoLogExporter(writer)))
+    logger = logging.getLogger("test_multiplexing_writer")
+    logger.propagate = False
+    handler = LoggingHandler(logger_provider=logger_provider)
+    logger.addHandler(handler)
+    metric_exporter = ProtoMetricExporter(writer)
+    try:
+        for i in range(count):
+            with tracer_provider.get_tracer("scope").start_as_current_span(f"span{i}"):
+                logger.warning("log %d", i)
+            metric_exporter.export(
+                MetricsData(
+                    resource_metrics=[
+                        ResourceMetrics(
+                            resource=_RESOURCE,
+                            scope_metrics=[
+                                ScopeMetrics(
+                                    scope=InstrumentationScope("scope"),
+                                    metrics=[_generate_sum(f"sum{i}", i)],
+                                    schema_url="",
+                                )
+                            ],
+                            schema_url="",
+                        )
+                    ]
+                )
+            )
+    finally:
+        logger.removeHandler(handler)
+        logger_provider.shutdown()
+        tracer_provider.shutdown()
+    return writer.payloads
+
+
+def _write(writer, payloads):
+    methods = {"spans": writer.write_span, "metrics": writer.write_metrics, "logs": writer.write_logs}
+    for signal, payload in payloads:
+        methods[signal](payload)
+
+
+class TestMultiplexingWriter(unittest.TestCase):
+    def test_round_trip(self):
+        payloads = _generate_payloads()
+        self.assertEqual({signal for signal, _ in payloads}, {"spans", "metrics", "logs"})
+        stream = io.BytesIO()
+        writer = MultiplexingWriter(stream)
+        _write(writer, payloads)
+        self.assertEqual(stream.getvalue(), b"")
+        self.assertTrue(writer.force_flush())
+        stream.seek(0)
+        self.assertEqual(list(MultiplexedStreamReader(stream)), payloads)
+        # The resource is only written once for all signals.
+        resource_size = len(_RESOURCE.attributes["snow.executable.name"])
+        self.assertLess(
+            len(stream.getvalue()),
+            sum(len(payload) for _, payload in payloads) - resource_size * (len(payloads) - 1),
+        )
+
+    def test_without_resource_deduplication(self):
+        payloads = _generate_payloads(1)
+        stream = io.BytesIO()
+        writer = MultiplexingWriter(stream, deduplicate_resources=False)
+        _write(writer, payloads)
+        writer.shutdown()
+        self.assertGreater(len(stream.getvalue()), sum(len(payload) for _, payload in payloads))
+        stream.seek(0)
+        self.assertEqual(list(MultiplexedStreamReader(stream)), payloads)
+
+    def test_flushes_start_new_resource_table(self):
+        payloads = _generate_payloads(2)
+        stream = io.BytesIO()
+        writer = MultiplexingWriter(stream)
+        _write(writer, payloads[:3])
+        writer.force_flush()
+        first_flush = len(stream.getvalue())
+        _write(writer, payloads[3:])
+        writer.force_flush()
+        # Every flush can be read on its own.
+        stream.seek(first_flush)
+        self.assertEqual(list(MultiplexedStreamReader(stream)), payloads[3:])
+        stream.seek(0)
+        self.assertEqual(list(MultiplexedStreamReader(stream)), payloads)
+
+    def test_max_bytes(self):
+        payloads = _generate_payloads(1)
+        stream = io.BytesIO()
+        writer = MultiplexingWriter(stream, max_bytes=1)
+        _write(writer, payloads[:1])
+        self.assertNotEqual(stream.getvalue(), b"")
+
+    def test_max_delay(self):
+        payloads = _generate_payloads(1)
+        stream = io.BytesIO()
+        writer = MultiplexingWriter(stream, max_delay_millis=10)
+        _write(writer, payloads)
+        deadline = time.monotonic() + 5
+        while not stream.getvalue() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        stream.seek(0)
+        self.assertEqual(list(MultiplexedStreamReader(stream)), payloads)
+        writer.shutdown()
+
+    def test_path_and_truncated_stream(self):
+        payloads = _generate_payloads(1)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "telemetry.stream")
+            writer = MultiplexingWriter(path)
+            _write(writer, payloads)
+            writer.shutdown()
+            with self.assertRaises(ValueError):
+                writer.write_span(payloads[0][1])
+            with open(path, "r+b") as file:
+                file.truncate(os.path.getsize(path) - 1)
+            with MultiplexedStreamReader(path) as reader:
+                self.assertEqual(list(reader), payloads[:-1])
+
+    def test_drain(self):
+        payloads = _generate_payloads(1)
+        stream = io.BytesIO()
+        writer = MultiplexingWriter(stream)
+        _write(writer, payloads)
+        writer.force_flush()
+        stream.seek(0)
+        recorder = _RecordingWriter()
+        self.assertEqual(MultiplexedStreamReader(stream).drain(recorder), len(payloads))
+        self.assertEqual(recorder.payloads, payloads)
+
+    def test_failed_write(self):
+        class _FailingStream(io.BytesIO):
+            def write(self, data):
+                raise OSError("disk full")
+
+        writer = MultiplexingWriter(_FailingStream())
+        writer.write_logs(_generate_payloads(1)[0][1])
+        with self.assertLogs(level="ERROR"):
+            self.assertFalse(writer.force_flush())
+        self.assertEqual(writer.failed_payloads, 1)
@@ -0,0 +1,80 @@
+import unittest
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from snowflake.telemetry._internal.exporter.otlp.proto.http import (
+    OTLPHTTPReceiver,
+    OTLPHTTPWriter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import (
+    ProtoSpanExporter,
+)
+from snowflake.telemetry.test.traces_test_utils import (
+    InMemorySpanWriter,
+)
+
+
+class TestOTLPHTTPWriter(unittest.TestCase):
+    def test_exports_spans(self):
+        received = InMemorySpanWriter()
+        with OTLPHTTPReceiver(received) as receiver:
+            writer = OTLPHTTPWriter(receiver.endpoint)
+            tracer_provider = TracerProvider()
+            tracer_provider.add_span_processor(
+                BatchSpanProcessor(ProtoSpanExporter(writer), max_export_batch_size=10)
+            )
+            tracer = tracer_provider.get_tracer("test")
+            for i in range(50):
+                with tracer.start_as_current_span(f"span{i}"):
+                    pass
+            tracer_provider.shutdown()
+        names = sorted(
+            span.name
+            for proto in received.get_finished_protos()
+            for span in proto.resource_spans[0].scope_spans[0].spans
+        )
+        self.assertEqual(names, sorted(f"span{i}" for i in range(50)))
+        self.assertEqual(writer.failed_payloads, 0)
+
+    def test_reuses_connections(self):
+        with OTLPHTTPReceiver() as receiver:
+            writer = OTLPHTTPWriter(receiver.endpoint, compression=False, max_in_flight=1)
+            for i in range(5):
+                writer.write_metrics(b"metrics%d" % i)
+                writer.write_logs(b"logs")
+            self.assertTrue(writer.force_flush())
+            self.assertEqual(receiver.requests, {"/v1/metrics": 5, "/v1/logs": 5})
+            self.assertEqual(receiver.received_bytes["/v1/logs"], 20)
+            self.assertEqual(writer._pool._idle.qsize(), 1)
+            writer.shutdown()
+
+    def test_retries_retryable_status(self):
+        with OTLPHTTPReceiver() as receiver:
+            receiver.fail_next = [503, 429]
+            writer = OTLPHTTPWriter(receiver.endpoint, initial_backoff_millis=1)
+            writer.write_span(b"spans")
+            self.assertTrue(writer.force_flush())
+            self.assertEqual(receiver.requests, {"/v1/traces": 1})
+            self.assertEqual(writer.failed_payloads, 0)
+            writer.shutdown()
+
+    def test_does_not_retry_other_errors(self):
+        with OTLPHTTPReceiver() as receiver:
+            receiver.fail_next = [400]
+            writer = OTLPHTTPWriter(receiver.endpoint, initial_backoff_millis=1)
+            with self.assertLogs(level="ERROR"):
+                writer.write_span(b"spans")
+                self.assertTrue(writer.force_flush())
+            self.assertEqual(writer.failed_payloads, 1)
+            self.assertEqual(receiver.fail_next, [])
+            writer.shutdown()
+
+    def test_gives_up_after_max_retries(self):
+        with OTLPHTTPReceiver() as receiver:
+            endpoint = receiver.endpoint
+        writer = OTLPHTTPWriter(endpoint, max_retries=2, initial_backoff_millis=1)
+        with self.assertLogs(level="ERROR"):
+            writer.write_span(b"spans")
+            self.assertTrue(writer.force_flush())
+        self.assertEqual(writer.failed_payloads, 1)
+        writer.shutdown()
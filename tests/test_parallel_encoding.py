@@ -0,0 +1,138 @@
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from opentelemetry.proto.metrics.v1.metrics_pb2 import MetricsData as PB2MetricsData
+from opentelemetry.proto.trace.v1.trace_pb2 import TracesData as PB2TracesData
+from opentelemetry.sdk.metrics.export import (
+    MetricsData,
+    ResourceMetrics,
+    ScopeMetrics,
+)
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+from opentelemetry.sdk.util.instrumentation import InstrumentationScope
+from snowflake.telemetry._internal.exporter.otlp.proto._parallel import (
+    serialize_metrics_parallel,
+    serialize_spans_parallel,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.metrics import (
+    ProtoMetricExporter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import (
+    ProtoSpanExporter,
+)
+from snowflake.telemetry.test.metrictestutil import _generate_gauge, _generate_sum
+from snowflake.telemetry.test.traces_test_utils import (
+    InMemorySpanWriter,
+)
+
+
+def _finished_spans(count):
+    memory_exporter = InMemorySpanExporter()
+    for resource_name in ("first", "second"):
+        tracer_provider = TracerProvider(resource=Resource({"service.name": resource_name}))
+        tracer_provider.add_span_processor(SimpleSpanProcessor(memory_exporter))
+        for scope_name in ("scope1", "scope2"):
+            tracer = tracer_provider.get_tracer(scope_name, attributes={"scope": scope_name})
+            for i in range(count):
+                with tracer.start_as_current_span(f"span{i}", attributes={"i": i, "list": [1, 2]}) as span:
+                    span.add_event("event", {"e": i})
+    return memory_exporter.get_finished_spans()
+
+
+def _flatten_spans(traces_data):
+    return sorted(
+        (
+            resource_spans.resource.SerializeToString(),
+            scope_spans.scope.SerializeToString(),
+            span.SerializeToString(),
+        )
+        for resource_spans in traces_data.resource_spans
+        for scope_spans in resource_spans.scope_spans
+        for span in scope_spans.spans
+    )
+
+
+def _flatten_metrics(metrics_data):
+    return sorted(
+        (
+            resource_metrics.resource.SerializeToString(),
+            scope_metrics.scope.SerializeToString(),
+            metric.SerializeToString(),
+        )
+        for resource_metrics in metrics_data.resource_metrics
+        for scope_metrics in resource_metrics.scope_metrics
+        for metric in scope_metrics.metrics
+    )
+
+
+class TestParallelEncoding(unittest.TestCase):
+    def setUp(self):
+        self.spans = _finished_spans(25)
+        self.expected_spans = PB2TracesData()
+        self.expected_spans.ParseFromString(ProtoSpanExporter._serialize_traces_data(self.spans))
+        self.metrics_data = MetricsData(
+            resource_metrics=[
+                ResourceMetrics(
+                    resource=Resource({"service.name": "metrics"}),
+                    scope_metrics=[
+                        ScopeMetrics(
+                            scope=InstrumentationScope("scope"),
+                            metrics=[_generate_sum(f"sum{i}", i) for i in range(10)]
+                            + [_generate_gauge(f"gauge{i}", i * 0.5) for i in range(10)],
+                            schema_url="",
+                        )
+                    ],
+                    schema_url="",
+                )
+            ]
+        )
+        self.expected_metrics = PB2MetricsData()
+        self.expected_metrics.ParseFromString(ProtoMetricExporter._serialize_metrics_data(self.metrics_data))
+
+    def _assert_spans(self, serialized):
+        actual = PB2TracesData()
+        actual.ParseFromString(serialized)
+        self.assertEqual(_flatten_spans(actual), _flatten_spans(self.expected_spans))
+
+    def _assert_metrics(self, serialized):
+        actual = PB2MetricsData()
+        actual.ParseFromString(serialized)
+        self.assertEqual(_flatten_metrics(actual), _flatten_metrics(self.expected_metrics))
+
+    def test_spans_thread_pool(self):
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            serialized = serialize_spans_parallel(executor, self.spans, shard_size=10)
+        self._assert_spans(serialized)
+
+    def test_spans_process_pool(self):
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            serialized = serialize_spans_parallel(executor, self.spans, shard_size=10)
+        self._assert_spans(serialized)
+
+    def test_single_shard_matches_sequential(self):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            serialized = serialize_spans_parallel(executor, self.spans[:10], shard_size=100)
+        self.assertEqual(serialized, ProtoSpanExporter._serialize_traces_data(self.spans[:10]))
+
+    def test_metrics_thread_pool(self):
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            serialized = serialize_metrics_parallel(executor, self.metrics_data, shard_size=3)
+        self._assert_metrics(serialized)
+
+    def test_metrics_process_pool(self):
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            serialized = serialize_metrics_parallel(executor, self.metrics_data, shard_size=3)
+        self._assert_metrics(serialized)
+
+    def test_proto_span_exporter_with_executor(self):
+        span_writer = InMemorySpanWriter()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            exporter = ProtoSpanExporter(span_writer, executor=executor, shard_size=10)
+            exporter.export(self.spans)
+        (proto,) = span_writer.get_finished_protos()
+        self.assertEqual(_flatten_spans(proto), _flatten_spans(self.expected_spans))
@@ -0,0 +1,107 @@
+import logging
+import unittest
+
+from opentelemetry._logs import SeverityNumber
+from opentelemetry.sdk._logs import LoggerProvider, LoggingHandler
+from opentelemetry.sdk._logs.export import (
+    BatchLogRecordProcessor,
+    InMemoryLogExporter,
+    LogExportResult,
+    SimpleLogRecordProcessor,
+)
+from opentelemetry.sdk.resources import Resource
+
+from snowflake.telemetry._internal.exporter.otlp.proto.logs import (
+    LogWriter,
+    ProtoLogExporter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.writers import BatchingWriter
+from snowflake.telemetry.test.logs_test_utils import InMemoryLogWriter
+
+
+class _FailingWriter(LogWriter):
+    def write_logs(self, serialized_logs: bytes) -> None:
+        raise OSError("disk full")
+
+
+class TestProtoLogExporter(unittest.TestCase):
+    def setUp(self):
+        self.writer = InMemoryLogWriter()
+        self.provider = LoggerProvider(resource=Resource.create({"service.name": "test"}))
+        self.provider.add_log_record_processor(
+            BatchLogRecordProcessor(ProtoLogExporter(self.writer))
+        )
+        self.logger = logging.getLogger("test_proto_log_exporter")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+        self.handler = LoggingHandler(logger_provider=self.provider)
+        self.logger.addHandler(self.handler)
+
+    def tearDown(self):
+        self.logger.removeHandler(self.handler)
+        self.provider.shutdown()
+
+    def test_export_with_batch_processor(self):
+        self.logger.warning("first", extra={"key": "value"})
+        self.logger.info("second")
+        self.assertTrue(self.provider.force_flush())
+
+        records = [
+            record
+            for logs_data in self.writer.get_finished_protos()
+            for resource_logs in logs_data.resource_logs
+            for scope_logs in resource_logs.scope_logs
+            for record in scope_logs.log_records
+        ]
+        self.assertEqual([record.body.string_value for record in records], ["first", "second"])
+        self.assertEqual(records[0].severity_number, SeverityNumber.WARN.value)
+        self.assertEqual(records[1].severity_number, SeverityNumber.INFO.value)
+        self.assertIn("key", [attribute.key for attribute in records[0].attributes])
+        resource_logs = self.writer.get_finished_protos()[0].resource_logs[0]
+        self.assertIn(
+            "test",
+            [
+                attribute.value.string_value
+                for attribute in resource_logs.resource.attributes
+                if attribute.key == "service.name"
+            ],
+        )
+
+    def test_export_failure(self):
+        memory_exporter = InMemoryLogExporter()
+        provider = LoggerProvider()
+        provider.add_log_record_processor(SimpleLogRecordProcessor(memory_exporter))
+        handler = LoggingHandler(logger_provider=provider)
+        self.logger.addHandler(handler)
+        try:
+            self.logger.info("lost")
+        finally:
+            self.logger.removeHandler(handler)
+            provider.shutdown()
+        batch = memory_exporter.get_finished_logs()
+        self.assertEqual(len(batch), 1)
+        exporter = ProtoLogExporter(_FailingWriter())
+        self.assertEqual(exporter.export(batch), LogExportResult.FAILURE)
+
+    def test_batching_writer_forwards_logs(self):
+        self.logger.removeHandler(self.handler)
+        batching_writer = BatchingWriter(self.writer)
+        exporter = ProtoLogExporter(batching_writer)
+        provider = LoggerProvider()
+        provider.add_log_record_processor(BatchLogRecordProcessor(exporter))
+        handler = LoggingHandler(logger_provider=provider)
+        self.logger.addHandler(handler)
+        try:
+            self.logger.error("queued")
+            self.assertTrue(provider.force_flush())
+        finally:
+            self.logger.removeHandler(handler)
+            provider.shutdown()
+        bodies = [
+            record.body.string_value
+            for logs_data in self.writer.get_finished_protos()
+            for resource_logs in logs_data.resource_logs
+            for scope_logs in resource_logs.scope_logs
+            for record in scope_logs.log_records
+        ]
+        self.assertEqual(bodies, ["queued"])
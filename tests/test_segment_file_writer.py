@@ -0,0 +1,132 @@
+import os
+import tempfile
+import time
+import unittest
+
+from opentelemetry.proto.trace.v1.trace_pb2 import TracesData
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import (
+    ProtoSpanExporter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.writers import (
+    SegmentFileWriter,
+    SegmentReader,
+    SyncPolicy,
+    segment_files,
+)
+from snowflake.telemetry._internal.serialize import Varint
+
+
+def _read_all(directory, signal):
+    payloads = []
+    for path in segment_files(directory, signal):
+        with SegmentReader(path) as reader:
+            payloads.extend(bytes(payload) for payload in reader)
+    return payloads
+
+
+class TestSegmentFileWriter(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_round_trip_spans(self):
+        writer = SegmentFileWriter(self.directory)
+        tracer_provider = TracerProvider()
+        tracer_provider.add_span_processor(SimpleSpanProcessor(ProtoSpanExporter(writer)))
+        tracer = tracer_provider.get_tracer("test")
+        for name in ("a", "b", "c"):
+            with tracer.start_as_current_span(name):
+                pass
+        tracer_provider.shutdown()
+
+        (path,) = segment_files(self.directory, "spans")
+        payloads = _read_all(self.directory, "spans")
+        self.assertEqual(
+            [TracesData.FromString(payload).resource_spans[0].scope_spans[0].spans[0].name for payload in payloads],
+            ["a", "b", "c"],
+        )
+        # Closed segments are trimmed to the written frames.
+        self.assertEqual(os.path.getsize(path), sum(Varint.size_varint_u32(len(payload)) + len(payload) for payload in payloads))
+
+    def test_close_with_payloads_referenced(self):
+        writer = SegmentFileWriter(self.directory)
+        path, _ = writer.append("traces", b"payload")
+        writer.shutdown()
+        reader = SegmentReader(path)
+        payload = next(iter(reader))
+        with self.assertRaisesRegex(BufferError, "still referenced"):
+            reader.close()
+        self.assertEqual(bytes(payload), b"payload")
+        payload.release()
+        reader.close()
+
+    def test_signals_are_written_separately(self):
+        writer = SegmentFileWriter(self.directory, sync_policy=SyncPolicy.ALWAYS)
+        writer.write_span(b"span")
+        writer.write_metrics(b"metric")
+        writer.write_logs(b"log")
+        writer.write_logs(b"")
+        writer.shutdown()
+        self.assertEqual(_read_all(self.directory, "spans"), [b"span"])
+        self.assertEqual(_read_all(self.directory, "metrics"), [b"metric"])
+        self.assertEqual(_read_all(self.directory, "logs"), [b"log"])
+
+    def test_size_rotation(self):
+        writer = SegmentFileWriter(self.directory, segment_size=250)
+        payloads = [bytes([i]) * 100 for i in range(5)] + [b"x" * 1000]
+        locations = [writer.append("spans", payload) for payload in payloads]
+        writer.shutdown()
+        paths = segment_files(self.directory, "spans")
+        self.assertEqual(len(paths), 4)
+        self.assertEqual([offset for _, offset in locations], [0, 101, 0, 101, 0, 0])
+        self.assertEqual(_read_all(self.directory, "spans"), payloads)
+        with SegmentReader(locations[3][0]) as reader:
+            self.assertEqual(bytes(reader.read(locations[3][1])), payloads[3])
+
+    def test_age_rotation(self):
+        writer = SegmentFileWriter(self.directory, max_segment_age_millis=10)
+        writer.write_span(b"first")
+        time.sleep(0.02)
+        writer.write_span(b"second")
+        writer.shutdown()
+        self.assertEqual(len(segment_files(self.directory, "spans")), 2)
+
+    def test_reads_segment_being_written(self):
+        writer = SegmentFileWriter(self.directory, segment_size=4096)
+        writer.write_span(b"first")
+        writer.write_span(b"second")
+        self.assertTrue(writer.force_flush())
+        (path,) = segment_files(self.directory, "spans")
+        self.assertEqual(os.path.getsize(path), 4096)
+        with SegmentReader(path) as reader:
+            self.assertEqual([bytes(payload) for payload in reader], [b"first", b"second"])
+        writer.shutdown()
+
+    def test_new_writer_continues_sequence(self):
+        for payload in (b"first", b"second"):
+            writer = SegmentFileWriter(self.directory)
+            writer.write_span(payload)
+            writer.shutdown()
+        self.assertEqual(len(segment_files(self.directory, "spans")), 2)
+        self.assertEqual(_read_all(self.directory, "spans"), [b"first", b"second"])
+
+    def test_truncated_segment(self):
+        writer = SegmentFileWriter(self.directory)
+        writer.write_span(b"first")
+        writer.write_span(b"second")
+        writer.shutdown()
+        (path,) = segment_files(self.directory, "spans")
+        with open(path, "r+b") as file:
+            file.truncate(os.path.getsize(path) - 1)
+        self.assertEqual(_read_all(self.directory, "spans"), [b"first"])
+
+    def test_empty_segment(self):
+        path = os.path.join(self.directory, "spans-000000000000.segment")
+        open(path, "wb").close()
+        with SegmentReader(path) as reader:
+            self.assertEqual(list(reader), [])
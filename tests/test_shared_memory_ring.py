@@ -0,0 +1,89 @@
+import multiprocessing
+import unittest
+
+from snowflake.telemetry._internal.exporter.otlp.proto.metrics import (
+    MetricWriter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import (
+    SpanWriter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.writers import (
+    SharedMemoryRingReader,
+    SharedMemoryRingWriter,
+)
+
+
+class _RecordingWriter(SpanWriter, MetricWriter):
+    def __init__(self):
+        self.written = []
+
+    def write_span(self, serialized_spans: bytes) -> None:
+        self.written.append(("spans", serialized_spans))
+
+    def write_metrics(self, serialized_metrics: bytes) -> None:
+        self.written.append(("metrics", serialized_metrics))
+
+
+def _produce(name, count):
+    writer = SharedMemoryRingWriter(name, create=False)
+    sent = 0
+    while sent < count:
+        dropped = writer.dropped_payloads
+        writer.write_span(b"span%d" % sent * 10)
+        if writer.dropped_payloads == dropped:
+            sent += 1
+    writer.shutdown()
+
+
+class TestSharedMemoryRing(unittest.TestCase):
+    def test_round_trip(self):
+        writer = SharedMemoryRingWriter(capacity=1024)
+        with SharedMemoryRingReader(writer.name) as reader:
+            self.assertIsNone(reader.read())
+            writer.write_span(b"span")
+            writer.write_metrics(b"metric")
+            writer.write_logs(b"log")
+            self.assertEqual(reader.read(), ("spans", b"span"))
+            self.assertEqual(reader.read(), ("metrics", b"metric"))
+            self.assertEqual(reader.read(), ("logs", b"log"))
+            self.assertIsNone(reader.read())
+        writer.shutdown()
+
+    def test_wraps_around_and_drops_when_full(self):
+        writer = SharedMemoryRingWriter(capacity=100)
+        with SharedMemoryRingReader(writer.name) as reader:
+            for i in range(20):
+                writer.write_span(bytes([i]) * 30)
+                writer.write_span(bytes([i + 100]) * 30)
+                # The ring only holds two 35 byte records.
+                writer.write_span(b"dropped" * 5)
+                recording_writer = _RecordingWriter()
+                self.assertEqual(reader.drain(recording_writer), 2)
+                self.assertEqual(
+                    recording_writer.written,
+                    [("spans", bytes([i]) * 30), ("spans", bytes([i + 100]) * 30)],
+                )
+            self.assertEqual(writer.dropped_payloads, 20)
+        writer.shutdown()
+
+    def test_reader_creates_ring_for_another_process(self):
+        count = 2000
+        with SharedMemoryRingReader(capacity=4096, create=True) as reader:
+            process = multiprocessing.get_context("spawn").Process(target=_produce, args=(reader.name, count))
+            process.start()
+            recording_writer = _RecordingWriter()
+            while len(recording_writer.written) < count and process.is_alive():
+                reader.drain(recording_writer)
+            process.join()
+            reader.drain(recording_writer)
+            self.assertEqual(process.exitcode, 0)
+            self.assertEqual(
+                recording_writer.written,
+                [("spans", b"span%d" % i * 10) for i in range(count)],
+            )
+
+    def test_attach_to_unknown_memory(self):
+        writer = SharedMemoryRingWriter(capacity=1024)
+        writer.shutdown()
+        with self.assertRaises(FileNotFoundError):
+            SharedMemoryRingReader(writer.name)
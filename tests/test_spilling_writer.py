@@ -0,0 +1,167 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from snowflake.telemetry._internal.exporter.otlp.proto.metrics import (
+    MetricWriter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import (
+    SpanWriter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.writers import (
+    SpillingWriter,
+    segment_files,
+)
+
+
+class _FlakyWriter(SpanWriter, MetricWriter):
+    """Records payloads, failing or blocking writes on demand."""
+
+    def __init__(self):
+        self.written = []
+        self.failing = False
+        self.release = threading.Event()
+        self.release.set()
+        self.writing = threading.Event()
+
+    def _write(self, payload):
+        self.writing.set()
+        self.release.wait()
+        if self.failing:
+            raise IOError("sink unavailable")
+        self.written.append(payload)
+
+    def write_span(self, serialized_spans: bytes) -> None:
+        self._write(b"span:" + serialized_spans)
+
+    def write_metrics(self, serialized_metrics: bytes) -> None:
+        self._write(b"metric:" + serialized_metrics)
+
+    def write_logs(self, serialized_logs: bytes) -> None:
+        self._write(b"log:" + serialized_logs)
+
+
+class TestSpillingWriter(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_writes_from_memory(self):
+        writer = _FlakyWriter()
+        spilling_writer = SpillingWriter(writer, self.directory)
+        spilling_writer.write_span(b"1")
+        spilling_writer.write_metrics(b"2")
+        self.assertTrue(spilling_writer.force_flush())
+        self.assertEqual(writer.written, [b"span:1", b"metric:2"])
+        self.assertEqual(segment_files(self.directory, "wal"), [])
+        spilling_writer.shutdown()
+
+    def test_spills_and_replays_in_order(self):
+        writer = _FlakyWriter()
+        writer.release.clear()
+        spilling_writer = SpillingWriter(writer, self.directory, max_memory_payloads=2)
+        spilling_writer.write_span(b"0")
+        self.assertTrue(writer.writing.wait(5))
+        for i in range(1, 20):
+            spilling_writer.write_span(b"%d" % i)
+        spilling_writer.write_logs(b"20")
+        # The payload being written is in the log too, ahead of the others.
+        self.assertEqual(spilling_writer.disk_payloads, 21)
+        self.assertEqual(len(segment_files(self.directory, "wal")), 1)
+        writer.release.set()
+        self.assertTrue(spilling_writer.force_flush())
+        self.assertEqual(writer.written, [b"span:%d" % i for i in range(20)] + [b"log:20"])
+        self.assertEqual(spilling_writer.disk_payloads, 0)
+        self.assertEqual(spilling_writer.disk_bytes, 0)
+        spilling_writer.shutdown()
+
+    def test_retries_failed_writes(self):
+        writer = _FlakyWriter()
+        writer.failing = True
+        spilling_writer = SpillingWriter(writer, self.directory, max_memory_payloads=1)
+        with self.assertLogs(level="ERROR"):
+            for i in range(5):
+                spilling_writer.write_span(b"%d" % i)
+            self.assertFalse(spilling_writer.force_flush(timeout_millis=50))
+        writer.failing = False
+        self.assertTrue(spilling_writer.force_flush())
+        self.assertEqual(writer.written, [b"span:%d" % i for i in range(5)])
+        spilling_writer.shutdown()
+
+    def test_recovers_after_restart(self):
+        writer = _FlakyWriter()
+        writer.failing = True
+        spilling_writer = SpillingWriter(writer, self.directory, max_memory_payloads=1)
+        with self.assertLogs(level="WARNING"):
+            for i in range(5):
+                spilling_writer.write_span(b"%d" % i)
+            spilling_writer.shutdown(timeout_millis=50)
+        self.assertEqual(writer.written, [])
+
+        recovered = _FlakyWriter()
+        spilling_writer = SpillingWriter(recovered, self.directory)
+        spilling_writer.write_span(b"5")
+        self.assertTrue(spilling_writer.force_flush())
+        self.assertEqual(recovered.written, [b"span:%d" % i for i in range(6)])
+        spilling_writer.shutdown()
+        self.assertEqual(SpillingWriter(_FlakyWriter(), self.directory).disk_payloads, 0)
+
+    def test_recovers_in_flight_payload_in_order(self):
+        writer = _FlakyWriter()
+        writer.failing = True
+        writer.release.clear()
+        spilling_writer = SpillingWriter(writer, self.directory, max_memory_payloads=1)
+        spilling_writer.write_span(b"0")
+        self.assertTrue(writer.writing.wait(5))
+        for i in range(1, 4):
+            spilling_writer.write_span(b"%d" % i)
+        with self.assertLogs(level="WARNING"):
+            spilling_writer.shutdown(timeout_millis=50)
+            writer.release.set()
+
+        recovered = _FlakyWriter()
+        spilling_writer = SpillingWriter(recovered, self.directory)
+        self.assertTrue(spilling_writer.force_flush())
+        self.assertEqual(recovered.written, [b"span:%d" % i for i in range(4)])
+        spilling_writer.shutdown()
+
+    def test_max_disk_bytes(self):
+        writer = _FlakyWriter()
+        writer.release.clear()
+        spilling_writer = SpillingWriter(writer, self.directory, max_memory_payloads=1, max_disk_bytes=100)
+        spilling_writer.write_span(b"first")
+        self.assertTrue(writer.writing.wait(5))
+        for _ in range(5):
+            spilling_writer.write_span(b"x" * 40)
+        # The first payload is in the log too, while it is being written.
+        self.assertEqual(spilling_writer.disk_payloads, 3)
+        self.assertEqual(spilling_writer.dropped_payloads, 3)
+        writer.release.set()
+        self.assertTrue(spilling_writer.force_flush())
+        self.assertEqual(len(writer.written), 3)
+        spilling_writer.shutdown()
+
+    def test_max_age(self):
+        writer = _FlakyWriter()
+        writer.failing = True
+        spilling_writer = SpillingWriter(writer, self.directory, max_memory_payloads=1)
+        with self.assertLogs(level="WARNING"):
+            for i in range(3):
+                spilling_writer.write_span(b"%d" % i)
+            spilling_writer.shutdown(timeout_millis=50)
+        past = time.time() - 60
+        for segment in segment_files(self.directory, "wal"):
+            os.utime(segment, (past, past))
+
+        recovered = _FlakyWriter()
+        with self.assertLogs(level="WARNING"):
+            spilling_writer = SpillingWriter(recovered, self.directory, max_age_millis=10_000)
+            self.assertTrue(spilling_writer.force_flush())
+        self.assertEqual(recovered.written, [])
+        self.assertEqual(spilling_writer.dropped_payloads, 3)
+        spilling_writer.shutdown()
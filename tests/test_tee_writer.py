@@ -0,0 +1,98 @@
+import threading
+import unittest
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from snowflake.telemetry._internal.exporter.otlp.proto.metrics import (
+    MetricWriter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import (
+    ProtoSpanExporter,
+    SpanWriter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.writers import (
+    BackpressurePolicy,
+    BatchingWriter,
+    TeeWriter,
+)
+from snowflake.telemetry.test.traces_test_utils import (
+    InMemorySpanWriter,
+)
+
+
+class _RecordingWriter(SpanWriter, MetricWriter):
+    def __init__(self, release=None):
+        self.spans = []
+        self.metrics = []
+        self.release = release
+        self.writing = threading.Event()
+        self.shut_down = False
+
+    def write_span(self, serialized_spans: bytes) -> None:
+        self.writing.set()
+        if self.release is not None:
+            self.release.wait()
+        self.spans.append(serialized_spans)
+
+    def write_metrics(self, serialized_metrics: bytes) -> None:
+        self.metrics.append(serialized_metrics)
+
+    def shutdown(self, timeout_millis: float = 30_000) -> None:
+        self.shut_down = True
+
+
+class TestTeeWriter(unittest.TestCase):
+    def test_shares_serialized_payload(self):
+        first = _RecordingWriter()
+        second = _RecordingWriter()
+        tee = TeeWriter([first, second])
+        payload = b"spans"
+        tee.write_span(payload)
+        tee.write_metrics(b"metrics")
+        self.assertTrue(tee.force_flush())
+        self.assertIs(first.spans[0], payload)
+        self.assertIs(second.spans[0], payload)
+        self.assertEqual(first.metrics, [b"metrics"])
+        self.assertEqual(second.metrics, [b"metrics"])
+        tee.shutdown()
+        self.assertTrue(first.shut_down and second.shut_down)
+
+    def test_slow_writer_does_not_delay_others(self):
+        release = threading.Event()
+        primary = _RecordingWriter()
+        slow = _RecordingWriter(release)
+        tee = TeeWriter([BatchingWriter(primary, policy=BackpressurePolicy.BLOCK), slow], max_queue_size=2)
+        tee.write_span(b"span0")
+        self.assertTrue(slow.writing.wait(5))
+        for i in range(1, 5):
+            tee.write_span(b"span%d" % i)
+        self.assertTrue(tee.sinks[0].force_flush())
+        self.assertEqual(primary.spans, [b"span%d" % i for i in range(5)])
+        self.assertFalse(tee.force_flush(timeout_millis=10))
+        release.set()
+        self.assertTrue(tee.force_flush())
+        # One payload was being written and two were queued.
+        self.assertEqual(len(slow.spans), 3)
+        self.assertEqual(tee.sinks[1].dropped_payloads, 2)
+        tee.shutdown()
+
+    def test_failing_writer_is_isolated(self):
+        class _FailingWriter(SpanWriter):
+            def write_span(self, serialized_spans: bytes) -> None:
+                raise IOError("broken sink")
+
+        primary = InMemorySpanWriter()
+        tee = TeeWriter([BatchingWriter(primary, policy=BackpressurePolicy.BLOCK), _FailingWriter()])
+        tracer_provider = TracerProvider()
+        tracer_provider.add_span_processor(SimpleSpanProcessor(ProtoSpanExporter(tee)))
+        with self.assertLogs(level="ERROR"):
+            with tracer_provider.get_tracer("test").start_as_current_span("span"):
+                pass
+            self.assertTrue(tee.force_flush())
+        self.assertEqual(len(primary.get_finished_protos()), 1)
+        self.assertEqual(tee.sinks[1].failed_payloads, 1)
+        tracer_provider.shutdown()
+
+    def test_requires_writers(self):
+        with self.assertRaises(ValueError):
+            TeeWriter([])
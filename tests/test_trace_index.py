@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+
+from opentelemetry.proto.trace.v1.trace_pb2 import TracesData
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from snowflake.telemetry._internal.exporter.otlp.proto.traces import (
+    ProtoSpanExporter,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.writers import (
+    TraceIndex,
+    TraceIndexingWriter,
+    segment_files,
+)
+from snowflake.telemetry._internal.exporter.otlp.proto.writers._trace_index import (
+    index_path,
+)
+
+
+class TestTraceIndex(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write_traces(self, writer, count):
+        tracer_provider = TracerProvider(resource=Resource({"service.name": "test"}))
+        tracer_provider.add_span_processor(SimpleSpanProcessor(ProtoSpanExporter(writer)))
+        tracer = tracer_provider.get_tracer("test")
+        trace_ids = []
+        for i in range(count):
+            with tracer.start_as_current_span(f"root{i}") as root:
+                trace_ids.append(root.get_span_context().trace_id)
+                for j in range(3):
+                    with tracer.start_as_current_span(f"child{i}.{j}"):
+                        pass
+        tracer_provider.shutdown()
+        return trace_ids
+
+    def test_read_trace(self):
+        writer = TraceIndexingWriter(self.directory, segment_size=2048)
+        trace_ids = self._write_traces(writer, 10)
+        segments = segment_files(self.directory, "spans")
+        self.assertGreater(len(segments), 1)
+        self.assertTrue(all(os.path.exists(index_path(segment)) for segment in segments))
+
+        index = TraceIndex(self.directory)
+        for i, trace_id in enumerate(trace_ids):
+            self.assertEqual(len(index.locate(trace_id)), 4)
+            proto = TracesData.FromString(index.read_trace(trace_id))
+            (resource_spans,) = proto.resource_spans
+            (scope_spans,) = resource_spans.scope_spans
+            self.assertEqual(
+                [span.name for span in scope_spans.spans],
+                [f"child{i}.0", f"child{i}.1", f"child{i}.2", f"root{i}"],
+            )
+        self.assertEqual(index.locate(0), [])
+        self.assertEqual(index.read_trace(0), b"")
+
+    def test_open_segment_is_indexed_on_force_flush(self):
+        writer = TraceIndexingWriter(self.directory)
+        tracer_provider = TracerProvider()
+        tracer_provider.add_span_processor(SimpleSpanProcessor(ProtoSpanExporter(writer)))
+        with tracer_provider.get_tracer("test").start_as_current_span("span") as span:
+            trace_id = span.get_span_context().trace_id
+        (segment,) = segment_files(self.directory, "spans")
+        self.assertFalse(os.path.exists(index_path(segment)))
+        writer.force_flush()
+        self.assertTrue(os.path.exists(index_path(segment)))
+        self.assertEqual(TraceIndex(self.directory).locate(trace_id), [(segment, 0)])
+        writer.shutdown()
+
+    def test_spans_written_after_force_flush_are_located(self):
+        writer = TraceIndexingWriter(self.directory)
+        tracer_provider = TracerProvider()
+        tracer_provider.add_span_processor(SimpleSpanProcessor(ProtoSpanExporter(writer)))
+        tracer = tracer_provider.get_tracer("test")
+        with tracer.start_as_current_span("a") as a:
+            pass
+        writer.force_flush()
+        with tracer.start_as_current_span("b") as b:
+            pass
+        (segment,) = segment_files(self.directory, "spans")
+        index = TraceIndex(self.directory)
+        self.assertEqual(index.locate(a.get_span_context().trace_id), [(segment, 0)])
+        (location,) = index.locate(b.get_span_context().trace_id)
+        self.assertEqual(location[0], segment)
+        proto = TracesData.FromString(index.read_trace(b.get_span_context().trace_id))
+        self.assertEqual(proto.resource_spans[0].scope_spans[0].spans[0].name, "b")
+        writer.shutdown()
+        self.assertEqual(index.locate(b.get_span_context().trace_id), [location])
+
+    def test_segments_without_index_are_scanned(self):
+        writer = TraceIndexingWriter(self.directory)
+        trace_ids = self._write_traces(writer, 3)
+        (segment,) = segment_files(self.directory, "spans")
+        os.remove(index_path(segment))
+        proto = TracesData.FromString(TraceIndex(self.directory).read_trace(trace_ids[1]))
+        self.assertEqual(len(proto.resource_spans[0].scope_spans[0].spans), 4)
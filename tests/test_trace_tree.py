@@ -0,0 +1,98 @@
+import unittest
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+from snowflake.telemetry._internal.opentelemetry.proto.trace.v1.trace_marshaler import (
+    ResourceSpans,
+    ScopeSpans,
+    Span,
+    TracesData,
+)
+from snowflake.telemetry._internal.trace_tree import NameStats, TraceForest
+
+_TRACE = 0x0102030405060708090A0B0C0D0E0F10
+
+
+def _traces_data(spans):
+    """spans are (span_id, parent_span_id, name, start, end) tuples."""
+    return TracesData(resource_spans=[ResourceSpans(scope_spans=[ScopeSpans(spans=[
+        Span(
+            trace_id=_TRACE.to_bytes(16, "big"),
+            span_id=span_id.to_bytes(8, "big"),
+            parent_span_id=parent_span_id.to_bytes(8, "big") if parent_span_id else b"",
+            name=name,
+            start_time_unix_nano=start,
+            end_time_unix_nano=end,
+        )
+        for span_id, parent_span_id, name, start, end in spans
+    ])])]).SerializeToString()
+
+
+class TestTraceForest(unittest.TestCase):
+    def test_from_spans(self):
+        memory_exporter = InMemorySpanExporter()
+        tracer_provider = TracerProvider()
+        tracer_provider.add_span_processor(SimpleSpanProcessor(memory_exporter))
+        tracer = tracer_provider.get_tracer(__name__)
+        with tracer.start_as_current_span("root") as root:
+            with tracer.start_as_current_span("first"):
+                pass
+            with tracer.start_as_current_span("second"):
+                with tracer.start_as_current_span("leaf"):
+                    pass
+        with tracer.start_as_current_span("other"):
+            pass
+        # Children end, and arrive, before their parents.
+        forest = TraceForest.from_spans(memory_exporter.get_finished_spans())
+        self.assertEqual(len(forest), 5)
+        self.assertEqual([forest.name(span) for span in forest.roots], ["root", "other"])
+        self.assertEqual(len(forest.orphans), 0)
+        (root_index,) = [span for span in forest.roots if forest.name(span) == "root"]
+        self.assertEqual(forest.span_id(root_index), root.context.span_id)
+        self.assertEqual(forest.trace_id(root_index), root.context.trace_id)
+        self.assertEqual(
+            [(forest.name(span), depth) for span, depth in forest.walk(root_index)],
+            [("root", 0), ("first", 1), ("second", 1), ("leaf", 2)],
+        )
+        self.assertEqual([forest.name(span) for span in forest.critical_path(root_index)], ["root", "second", "leaf"])
+
+    def test_self_time_and_stats(self):
+        forest = TraceForest.from_traces_data(_traces_data([
+            (3, 1, "query", 20, 60),
+            (2, 1, "query", 10, 40),
+            (4, 1, "late", 90, 130),
+            (1, 0, "request", 0, 100),
+            (5, 3, "fetch", 30, 35),
+        ]))
+        by_name = {forest.name(span): span for span in range(len(forest))}
+        self.assertEqual([forest.name(span) for span in forest.children(by_name["request"])], ["query", "query", "late"])
+        self_times = forest.self_times()
+        # The queries overlap from 10 to 60, the late child is clipped at 100.
+        self.assertEqual(self_times[by_name["request"]], 100 - 50 - 10)
+        self.assertEqual(self_times[by_name["fetch"]], 5)
+        self.assertEqual(forest.name_stats()["query"], NameStats(2, 70, 30 + 35, 40))
+        self.assertEqual(
+            [forest.name(span) for span in forest.critical_path(by_name["request"])], ["request", "late"],
+        )
+
+    def test_orphans_and_cycles(self):
+        forest = TraceForest.from_traces_data([
+            _traces_data([(1, 9, "orphan", 0, 10), (2, 1, "child", 1, 2)]),
+            _traces_data([(3, 4, "a", 0, 10), (4, 3, "b", 0, 10), (5, 5, "self", 0, 1)]),
+        ])
+        self.assertEqual([forest.name(span) for span in forest.orphans], ["orphan", "a", "self"])
+        self.assertEqual(list(forest.roots), list(forest.orphans))
+        self.assertEqual([forest.name(span) for span, _ in forest.walk(forest.roots[1])], ["a", "b"])
+
+    def test_deep_trace(self):
+        depth = 50_000
+        forest = TraceForest.from_traces_data(_traces_data(
+            [(i + 1, i, f"span{i % 3}", i, 2 * depth - i) for i in reversed(range(depth))]
+        ))
+        (root,) = forest.roots
+        self.assertEqual(len(forest.critical_path(root)), depth)
+        self.assertEqual(sum(1 for _ in forest.walk(root)), depth)
+        self.assertEqual(forest.self_times()[root], 2)